@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from decouple import config
+from decouple import Csv, config
 
 
 class Settings:
@@ -24,15 +24,136 @@ class Settings:
             "LLM_TIMEOUT_SECONDS", cast=float, default=6.0
         )
         self.retry_attempts: int = 3
+        # End-to-end budgets; Twilio abandons webhooks after ~15s
+        self.request_budget_seconds: float = config(
+            "REQUEST_BUDGET_SECONDS", cast=float, default=20.0
+        )
+        self.webhook_budget_seconds: float = config(
+            "WEBHOOK_BUDGET_SECONDS", cast=float, default=12.0
+        )
+        # Kept back from the budget for the knowledge-base fallback
+        self.deadline_reserve_seconds: float = config(
+            "DEADLINE_RESERVE_SECONDS", cast=float, default=0.5
+        )
+        # Chat-history writes run after the reply, outside the request budget
+        self.chat_history_timeout_seconds: float = config(
+            "CHAT_HISTORY_TIMEOUT_SECONDS", cast=float, default=5.0
+        )
+        self.disconnect_poll_seconds: float = config(
+            "DISCONNECT_POLL_SECONDS", cast=float, default=0.5
+        )
+        # Upper bound on how long a coalesced caller waits for the shared answer
+        self.single_flight_timeout_seconds: float = config(
+            "SINGLE_FLIGHT_TIMEOUT_SECONDS", cast=float, default=30.0
+        )
         self.cache_ttl_seconds: int = config(
             "CACHE_TTL_SECONDS", cast=int, default=600
         )
+        self.cache_max_items: int = config("CACHE_MAX_ITEMS", cast=int, default=256)
+        self.cache_policy: str = config("CACHE_POLICY", default="lru")
+        self.cache_sweep_interval_seconds: float = config(
+            "CACHE_SWEEP_INTERVAL_SECONDS", cast=float, default=60.0
+        )
+        # "memory" is per worker; "sqlite" shares entries across workers on a node
+        self.cache_backend: str = config("CACHE_BACKEND", default="memory")
+        self.cache_sqlite_path: Path = Path(
+            config("CACHE_SQLITE_PATH", default=".cache/pipeline_cache.sqlite3")
+        )
+        self.cache_serializer: str = config("CACHE_SERIALIZER", default="json")
+        # Serve expired answers while refreshing them, up to a hard staleness cap
+        self.cache_stale_while_revalidate: bool = config(
+            "CACHE_STALE_WHILE_REVALIDATE", cast=bool, default=False
+        )
+        self.cache_max_stale_seconds: float = config(
+            "CACHE_MAX_STALE_SECONDS", cast=float, default=3600.0
+        )
+        # Memory caches are written here on shutdown and restored on boot
+        # (empty disables the snapshot)
+        self.cache_snapshot_path: str = config(
+            "CACHE_SNAPSHOT_PATH", default=".cache/cache_snapshot.json"
+        )
+        # Pre-answer the most frequent recent queries before reporting ready
+        self.cache_warmup_enabled: bool = config(
+            "CACHE_WARMUP_ENABLED", cast=bool, default=False
+        )
+        self.cache_warmup_top_n: int = config("CACHE_WARMUP_TOP_N", cast=int, default=50)
+        self.cache_warmup_lookback_days: int = config(
+            "CACHE_WARMUP_LOOKBACK_DAYS", cast=int, default=7
+        )
+        self.cache_warmup_concurrency: int = config(
+            "CACHE_WARMUP_CONCURRENCY", cast=int, default=4
+        )
+
+        # Tracing: stage timings in meta when debugging, sampled slow-request log
+        self.trace_debug: bool = config("TRACE_DEBUG", cast=bool, default=False)
+        self.slow_request_threshold_ms: float = config(
+            "SLOW_REQUEST_THRESHOLD_MS", cast=float, default=3000.0
+        )
+        self.slow_request_sample_rate: float = config(
+            "SLOW_REQUEST_SAMPLE_RATE", cast=float, default=1.0
+        )
+
+        # WhatsApp replies: "sync" answers inside the webhook, "async" acks
+        # immediately and delivers through the Twilio Messages API
+        self.whatsapp_reply_mode: str = config("WHATSAPP_REPLY_MODE", default="sync")
+        self.reply_workers: int = config("REPLY_WORKERS", cast=int, default=4)
+        self.reply_queue_maxsize: int = config("REPLY_QUEUE_MAXSIZE", cast=int, default=1000)
+        self.reply_send_retries: int = config("REPLY_SEND_RETRIES", cast=int, default=3)
 
         # Retrieval settings
+        # "chroma", "numpy" (in-process index), "auto" (Chroma when installed)
+        # or "none" (BM25 only)
+        self.retrieval_backend: str = config("RETRIEVAL_BACKEND", default="auto")
+        # Queries only scan their own language; with fewer than MIN_HITS the
+        # listed languages (symptom file names) are consulted in order
+        self.retrieval_min_hits: int = config("RETRIEVAL_MIN_HITS", cast=int, default=1)
+        self.retrieval_fallback_languages: List[str] = config(
+            "RETRIEVAL_FALLBACK_LANGUAGES", cast=Csv(), default="english"
+        )
+        # Fuse vector and BM25 rankings with reciprocal-rank fusion
+        self.retrieval_hybrid: bool = config("RETRIEVAL_HYBRID", cast=bool, default=True)
+        self.rrf_k: int = config("RRF_K", cast=int, default=60)
+        # "azure" (AZURE_OPENAI_EMBEDDING_DEPLOYMENT), "hashing" (offline,
+        # deterministic) or "auto" (Azure when configured); remote document
+        # vectors are cached on disk by content hash
+        self.embedding_provider: str = config("EMBEDDING_PROVIDER", default="auto")
+        self.embedding_batch_size: int = config("EMBEDDING_BATCH_SIZE", cast=int, default=64)
+        self.embedding_cache_dir: Path = Path(
+            config("EMBEDDING_CACHE_DIR", default=".cache/embeddings")
+        )
+        # Memory cap for query embeddings kept in each worker (LRU)
+        self.embedding_memory_cache_mb: float = config(
+            "EMBEDDING_MEMORY_CACHE_MB", cast=float, default=8.0
+        )
+        # Hashing vectorizer width; the built index is memory-mapped from here
+        self.hashing_vector_dim: int = config("HASHING_VECTOR_DIM", cast=int, default=256)
+        self.vector_index_dir: Path = Path(
+            config("VECTOR_INDEX_DIR", default=".cache/vector_index")
+        )
         self.chroma_persist_dir: Path = Path(
             config("CHROMA_PERSIST_DIR", default=".chroma")
         )
         self.chroma_top_k: int = config("CHROMA_TOP_K", cast=int, default=3)
+        # Threads running blocking index lookups, and how many more calls may
+        # wait for one before new lookups are rejected
+        self.retrieval_workers: int = config("RETRIEVAL_WORKERS", cast=int, default=4)
+        self.retrieval_queue_maxsize: int = config(
+            "RETRIEVAL_QUEUE_MAXSIZE", cast=int, default=32
+        )
+        # Trained router (scripts/train_intent.py); without the file every
+        # query without a routing keyword goes to retrieval + LLM
+        self.intent_model_path: Path = Path(
+            config("INTENT_MODEL_PATH", default=".cache/intent_model.npz")
+        )
+        # Classifier confidence needed to answer from a template instead
+        self.intent_min_confidence: float = config(
+            "INTENT_MIN_CONFIDENCE", cast=float, default=0.7
+        )
+        # Chat-history documents per cursor round trip and scoring batch when
+        # re-triaging (scripts/retriage.py, /api/retriage)
+        self.retriage_batch_size: int = config("RETRIAGE_BATCH_SIZE", cast=int, default=2000)
+        # Shared secret for admin endpoints (X-Admin-Token); unset disables them
+        self.admin_api_token: str = config("ADMIN_API_TOKEN", default="")
 
         # UI / prompt behaviour
         self.max_history: int = config("MAX_HISTORY_MESSAGES", cast=int, default=3)
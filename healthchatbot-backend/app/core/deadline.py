@@ -0,0 +1,68 @@
+"""
+Request deadlines
+Absolute per-request time budgets propagated from the HTTP entry points
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Monotonic point in time by which a request must have answered.
+
+    ``Deadline(None)`` is unbounded, so callers can always pass one along.
+    """
+
+    def __init__(self, budget_seconds: Optional[float]):
+        self.budget_seconds = budget_seconds
+        self.expires_at = (
+            math.inf if budget_seconds is None else time.monotonic() + budget_seconds
+        )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, seconds: Optional[float], reserve: float = 0.0) -> Optional[float]:
+        """Shrink a timeout to what is left after keeping ``reserve`` seconds
+        back for fallbacks; ``None`` means no limit at all."""
+        if self.expires_at == math.inf:
+            return seconds
+        left = max(0.0, self.remaining() - reserve)
+        return left if seconds is None else min(seconds, left)
+
+    async def run(self, awaitable: Awaitable[T], reserve: float = 0.0) -> T:
+        """Await within the remaining budget; raises ``asyncio.TimeoutError``."""
+        return await asyncio.wait_for(awaitable, timeout=self.cap(None, reserve))
+
+
+class ClientDisconnected(Exception):
+    """Raised when the HTTP client went away before the answer was ready."""
+
+
+async def run_until_disconnect(
+    request: Request, awaitable: Awaitable[T], poll_seconds: float
+) -> T:
+    """Await ``awaitable`` but cancel it as soon as the client disconnects."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
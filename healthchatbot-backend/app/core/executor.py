@@ -0,0 +1,143 @@
+"""
+Blocking-work executor
+Bounded thread pool that keeps synchronous calls off the event loop
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.deadline import Deadline
+from app.core.tracing import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class BoundedExecutor:
+    """Run blocking callables on ``max_workers`` threads.
+
+    At most ``max_workers + max_queue`` calls are admitted at once; further
+    submissions fail fast with ``ExecutorSaturated`` instead of piling up
+    behind a slow backend. Calls still queued when their deadline expires
+    are cancelled before they start; a call that is already running cannot
+    be interrupted, so its result is simply discarded.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_wait = LatencyRecorder()
+        self.run_time = LatencyRecorder()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            return self._pool
+
+    def _admit(self):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor saturated")
+            self.pending += 1
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        deadline: Optional[Deadline] = None,
+        reserve: float = 0.0,
+    ) -> T:
+        """Await ``fn(*args)`` on the pool within the remaining budget.
+
+        Raises ``asyncio.TimeoutError`` when the deadline (minus ``reserve``)
+        runs out first and ``ExecutorSaturated`` when the call is rejected.
+        """
+        deadline = deadline or Deadline(None)
+        if deadline.expired:
+            raise asyncio.TimeoutError()
+        self._admit()
+        submitted = time.perf_counter()
+
+        def task() -> T:
+            started = time.perf_counter()
+            self.queue_wait.record((started - submitted) * 1000)
+            if deadline.expired:
+                # Expired while queued: don't start work nobody will read.
+                raise asyncio.TimeoutError()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                self.run_time.record((time.perf_counter() - started) * 1000)
+                with self._lock:
+                    self.running -= 1
+
+        future = self._get_pool().submit(task)
+        future.add_done_callback(self._finished)
+        try:
+            # Cancelling the wrapped future also cancels a still-queued call.
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=deadline.cap(None, reserve)
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queued": max(0, self.pending - self.running),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+        return {
+            **counters,
+            "queue_wait": self.queue_wait.stats(),
+            "run_time": self.run_time.stats(),
+        }
@@ -0,0 +1,94 @@
+"""
+Request tracing
+Lightweight per-request stage timings for the query pipeline
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+
+class RequestTrace:
+    """Collect wall-clock milliseconds spent in each named pipeline stage."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            # Stages that run more than once (e.g. retries) accumulate.
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def finish(self) -> float:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        return self.total_ms
+
+    @property
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "stages": {name: round(ms, 2) for name, ms in self.stages.items()},
+        }
+
+
+class LatencyRecorder:
+    """Rolling window of latency samples (ms) with percentile summaries."""
+
+    def __init__(self, window: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, ms: float):
+        self.samples.append(ms)
+        self.count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+
+        def percentile(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+        return {
+            "count": self.count,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+
+def log_if_slow(trace: RequestTrace, **context: Any) -> bool:
+    """Log the full stage breakdown of a sampled request over the threshold."""
+    total = trace.finish()
+    if total < settings.slow_request_threshold_ms:
+        return False
+    if random.random() >= settings.slow_request_sample_rate:
+        return False
+    slow_request_logger.warning(
+        "Slow request: %s",
+        json.dumps({**context, **trace.as_dict()}, ensure_ascii=False, default=str),
+    )
+    return True
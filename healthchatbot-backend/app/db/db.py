@@ -4,14 +4,37 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from decouple import config
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List, Set
+import asyncio
 import re
+from app.core.config import settings
+from app.services.keyword_matcher import KeywordMatches, keyword_matcher, keyword_table
+from app.services.script_detector import ScriptDetection, detect_script
+
+if TYPE_CHECKING:
+    from app.services.message_context import MessageContext
+
+# Chat-history intent labels; the first label with a keyword hit wins
+INTENT_KEYWORDS = {
+    "symptom_fever": ['fever', 'ଜ୍ୱର', 'बुखार'],
+    "symptom_cough": ['cough', 'କାଶ', 'खांसी'],
+    "symptom_headache": ['headache', 'ମୁଣ୍ଡବିନ୍ଧା', 'सिरदर्द'],
+    "appointment_booking": ['appointment', 'ଆପଏଣ୍ଟମେଣ୍ଟ', 'अपॉइंटमेंट'],
+    "emergency": ['emergency', 'chest pain', 'ଛାତି ଯନ୍ତ୍ରଣା'],
+}
+keyword_matcher.register(
+    "intent",
+    keyword_table({f"intent:{intent}": words for intent, words in INTENT_KEYWORDS.items()}),
+)
 
 class Database:
     client: AsyncIOMotorClient = None
     
 db = Database()
 
+# Detached chat-history writes still in flight; drained at shutdown
+_pending_writes: Set[asyncio.Task] = set()
+
 async def get_database():
     """Get database instance with error handling"""
     try:
@@ -67,63 +90,53 @@ async def create_indexes():
     except Exception as e:
         logging.error(f"Failed to create indexes: {str(e)}")
 
+# Script-detector codes -> chat_history language names
+DB_LANGUAGE_NAMES = {"or": "odia", "hi": "hindi", "en": "english"}
+
 def detect_language(text: str) -> str:
     """Enhanced language detection for Odia, Hindi, and English"""
     if not text:
         return "unknown"
     
-    text = text.strip().lower()
-    
-    # Odia script detection (Odia characters)
-    odia_chars = ['ଅ', 'ଆ', 'ଇ', 'ଈ', 'ଉ', 'ଊ', 'ଏ', 'ଐ', 'ଓ', 'ଔ', 
-                  'କ', 'ଖ', 'ଗ', 'ଘ', 'ଙ', 'ଚ', 'ଛ', 'ଜ', 'ଝ', 'ଞ',
-                  'ଟ', 'ଠ', 'ଡ', 'ଢ', 'ଣ', 'ତ', 'ଥ', 'ଦ', 'ଧ', 'ନ',
-                  'ପ', 'ଫ', 'ବ', 'ଭ', 'ମ', 'ଯ', 'ର', 'ଲ', 'ଵ', 'ଶ',
-                  'ଷ', 'ସ', 'ହ', 'ଳ', 'ଜ୍ୱର', 'ମୁଣ୍ଡବିନ୍ଧା', 'କାଶ']
-    
-    if any(char in text for char in odia_chars):
-        return "odia"
-    
-    # Hindi script detection (Devanagari characters)
-    hindi_chars = ['अ', 'आ', 'इ', 'ई', 'उ', 'ऊ', 'ए', 'ऐ', 'ओ', 'औ',
-                   'क', 'ख', 'ग', 'घ', 'ङ', 'च', 'छ', 'ज', 'झ', 'ञ',
-                   'ट', 'ठ', 'ड', 'ढ', 'ण', 'त', 'थ', 'द', 'ध', 'न',
-                   'प', 'फ', 'ब', 'भ', 'म', 'य', 'र', 'ल', 'व', 'श',
-                   'ष', 'स', 'ह', 'बुखार', 'खांसी', 'दर्द']
-    
-    if any(char in text for char in hindi_chars):
-        return "hindi"
-    
-    # English detection (basic ASCII + common English health terms)
-    english_terms = ['fever', 'cough', 'headache', 'pain', 'appointment', 
-                     'doctor', 'hospital', 'medicine', 'emergency', 'help']
-    
-    if any(term in text for term in english_terms) or text.isascii():
-        return "english"
+    # One pass over the code points; romanized Hindi/Odia count as Hindi/Odia
+    return language_name(detect_script(text.strip()), text)
+
+def language_name(detection: ScriptDetection, text: str) -> str:
+    """chat_history language name for a script detection of ``text``"""
+    if detection.script is None:
+        # No letters at all (digits, punctuation, emoji)
+        return "english" if text.isascii() else "mixed"
+    if detection.script == "other":
+        return "mixed"
     
-    return "mixed"
+    return DB_LANGUAGE_NAMES[detection.language]
+
+def detect_intent(user_message: str, matches: Optional[KeywordMatches] = None) -> str:
+    """Chat-history intent label from one keyword scan (``matches`` if already scanned)"""
+    hit = (matches or keyword_matcher.scan(user_message)).first(
+        f"intent:{intent}" for intent in INTENT_KEYWORDS
+    )
+    return hit.split(":", 1)[1] if hit else "general"
 
-async def save_chat_history(user_phone: str, user_message: str, bot_response: str):
+async def save_chat_history(
+    user_phone: str,
+    user_message: str,
+    bot_response: str,
+    context: Optional["MessageContext"] = None,
+    timeout: Optional[float] = None,
+):
     """Save chat conversation to database with enhanced metadata"""
     try:
         database = await get_database()
         chat_collection = database.chat_history
         
-        # Detect language and extract basic intent
-        detected_language = detect_language(user_message)
-        
-        # Basic intent detection
-        intent = "general"
-        if any(word in user_message.lower() for word in ['fever', 'ଜ୍ୱର', 'बुखार']):
-            intent = "symptom_fever"
-        elif any(word in user_message.lower() for word in ['cough', 'କାଶ', 'खांसी']):
-            intent = "symptom_cough"
-        elif any(word in user_message.lower() for word in ['headache', 'ମୁଣ୍ଡବିନ୍ଧା', 'सिरदर्द']):
-            intent = "symptom_headache"
-        elif any(word in user_message.lower() for word in ['appointment', 'ଆପଏଣ୍ଟମେଣ୍ଟ', 'अपॉइंटमेंट']):
-            intent = "appointment_booking"
-        elif any(word in user_message.lower() for word in ['emergency', 'chest pain', 'ଛାତି ଯନ୍ତ୍ରଣା']):
-            intent = "emergency"
+        # Reuse the pipeline's analysis of the message when the caller has it
+        if context is not None:
+            detected_language = language_name(context.script, user_message) if user_message else "unknown"
+            intent = detect_intent(user_message, context.matches)
+        else:
+            detected_language = detect_language(user_message)
+            intent = detect_intent(user_message)
         
         chat_data = {
             "user_phone": user_phone,
@@ -137,15 +150,44 @@ async def save_chat_history(user_phone: str, user_message: str, bot_response: st
             "session_id": f"{user_phone}_{datetime.now().strftime('%Y%m%d')}"  # Daily session
         }
         
-        result = await chat_collection.insert_one(chat_data)
+        result = await asyncio.wait_for(chat_collection.insert_one(chat_data), timeout)
         logging.info(f"✅ Chat history saved: {result.inserted_id} | User: {user_phone} | Language: {detected_language}")
         
         return result.inserted_id
         
+    except asyncio.TimeoutError:
+        logging.error(f"❌ Chat history not saved: insert took longer than {timeout}s")
+        return None
     except Exception as e:
         logging.error(f"❌ Failed to save chat history: {str(e)}")
         return None
 
+def persist_chat_history(
+    user_phone: str,
+    user_message: str,
+    bot_response: str,
+    context: Optional["MessageContext"] = None,
+) -> asyncio.Task:
+    """Save chat history in a detached task, so a request deadline never
+    cancels the write; it gets CHAT_HISTORY_TIMEOUT_SECONDS of its own"""
+    task = asyncio.create_task(
+        save_chat_history(
+            user_phone,
+            user_message,
+            bot_response,
+            context=context,
+            timeout=settings.chat_history_timeout_seconds,
+        )
+    )
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+    return task
+
+async def drain_chat_history(timeout: float):
+    """Wait up to ``timeout`` for detached chat-history writes (shutdown)"""
+    if _pending_writes:
+        await asyncio.wait(set(_pending_writes), timeout=timeout)
+
 async def save_appointment(appointment_data: dict):
     """Save appointment to database with enhanced validation and metadata"""
     try:
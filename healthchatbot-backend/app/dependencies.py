@@ -1 +1,15 @@
 # 🚦 Person A - Enhanced dependencies
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    """Guard for admin endpoints; they stay disabled until ADMIN_API_TOKEN is set"""
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=403, detail="admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_api_token):
+        raise HTTPException(status_code=401, detail="invalid admin token")
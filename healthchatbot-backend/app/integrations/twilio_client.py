@@ -1 +1,35 @@
 # 🚦 Person A - Twilio API wrapper
+# app/integrations/twilio_client.py
+import logging
+
+from decouple import config
+from twilio.rest import Client
+
+logger = logging.getLogger(__name__)
+
+try:
+    client = Client(config("TWILIO_ACCOUNT_SID"), config("TWILIO_AUTH_TOKEN"))
+except Exception:
+    client = None
+    logger.warning("Twilio credentials not configured; outbound WhatsApp disabled.")
+
+
+class TwilioNotConfigured(RuntimeError):
+    """Raised when an outbound message is attempted without credentials."""
+
+
+def send_whatsapp_message(to_phone: str, body: str) -> str:
+    """Send a WhatsApp message through the Messages API; returns the SID.
+
+    Blocking (Twilio's client is synchronous) - call it from a thread when
+    inside the event loop. Raises on failure so callers can retry.
+    """
+    if not client:
+        raise TwilioNotConfigured("Twilio not configured")
+    to = to_phone if to_phone.startswith("whatsapp:") else f"whatsapp:{to_phone}"
+    message = client.messages.create(
+        body=body,
+        from_=config("TWILIO_WHATSAPP_NUMBER", default=""),
+        to=to,
+    )
+    return message.sid
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.deadline import ClientDisconnected, Deadline, run_until_disconnect
 from app.core.session_manager import session_manager
+from app.db.db import drain_chat_history
+from app.dependencies import require_admin_token
+from app.services.cache_service import (
+    cache_stats,
+    load_snapshot,
+    run_expiry_sweeper,
+    save_snapshot,
+)
+from app.services.cache_warmup import cache_warmer
 from app.services.pipeline import assistant_orchestrator
+from app.services.reply_queue import reply_queue
+from app.services.retrieval_service import retrieval_service
+from app.services.retriage import RetriageRun, TriageConfig, chat_records, count_records
+from app.services.single_flight import flight_stats
+from app.services.task_router import task_router
 from app.routes import whatsapp
 
 logger = logging.getLogger(__name__)
@@ -27,6 +45,45 @@ if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 app.include_router(whatsapp.router)
 
+_background_tasks: Set[asyncio.Task] = set()
+# The latest bulk re-triage; one runs at a time.
+_retriage: Optional[RetriageRun] = None
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    if settings.cache_snapshot_path:
+        try:
+            restored = load_snapshot(Path(settings.cache_snapshot_path))
+            logger.info(f"Restored {restored} cache entries from snapshot")
+        except Exception as e:
+            logger.error(f"Could not restore cache snapshot: {e}")
+    if settings.cache_warmup_enabled:
+        _background_tasks.add(asyncio.create_task(cache_warmer.run()))
+    else:
+        cache_warmer.disable()
+    _background_tasks.add(
+        asyncio.create_task(run_expiry_sweeper(settings.cache_sweep_interval_seconds))
+    )
+    if settings.whatsapp_reply_mode == "async":
+        await reply_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await reply_queue.stop()
+    await drain_chat_history(settings.chat_history_timeout_seconds)
+    retrieval_service.executor.shutdown()
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    if settings.cache_snapshot_path:
+        try:
+            saved = save_snapshot(Path(settings.cache_snapshot_path))
+            logger.info(f"Saved {saved} cache entries to snapshot")
+        except Exception as e:
+            logger.error(f"Could not save cache snapshot: {e}")
+
 
 class HistoryTurn(BaseModel):
     role: str = Field(default="user")
@@ -38,6 +95,15 @@ class HealthQuery(BaseModel):
     language: Optional[str] = None
     user_id: Optional[str] = "web"
     history: Optional[List[HistoryTurn]] = None
+    debug: bool = False
+
+
+class RetriageRequest(BaseModel):
+    threshold: Optional[int] = None
+    # Phrase -> weight overrides of SYMPTOM_WEIGHTS; 0 removes a phrase
+    weights: Dict[str, int] = Field(default_factory=dict)
+    since: Optional[datetime] = None
+    limit: int = 0
 
 
 class HealthResponse(BaseModel):
@@ -63,27 +129,113 @@ async def health_check():
         "status": "healthy",
         "sessions": stats,
         "cache_ttl": settings.cache_ttl_seconds,
+        "caches": cache_stats(),
+        "single_flight": flight_stats(),
+        "reply_queue": reply_queue.stats(),
+        "retrieval_pool": retrieval_service.executor.stats(),
+        "embedding_cache": retrieval_service.embedding_cache.stats(),
+        "streaming_ttft": assistant_orchestrator.ttft.stats(),
+        "router": task_router.stats(),
         "llm_configured": bool(settings.azure_api_key and settings.azure_endpoint),
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Ready once the cache warm-up has finished (or is disabled)."""
+    body = {"ready": cache_warmer.ready, "warmup": cache_warmer.progress()}
+    if not cache_warmer.ready:
+        return JSONResponse(body, status_code=503)
+    return body
+
+
+async def _answer(query: HealthQuery, request: Request):
+    deadline = Deadline(settings.request_budget_seconds)
+    try:
+        return await run_until_disconnect(
+            request,
+            assistant_orchestrator.handle_query(
+                message=query.message,
+                user_id=query.user_id or "web",
+                language=query.language,
+                history=[turn.model_dump() for turn in query.history or []],
+                debug=query.debug,
+                deadline=deadline,
+            ),
+            settings.disconnect_poll_seconds,
+        )
+    except ClientDisconnected:
+        logger.info("Client disconnected; query cancelled")
+        return Response(status_code=499)
+
+
 @app.post("/api/query", response_model=HealthResponse)
-async def api_query(query: HealthQuery):
-    result = await assistant_orchestrator.handle_query(
-        message=query.message,
-        user_id=query.user_id or "web",
-        language=query.language,
-        history=[turn.model_dump() for turn in query.history or []],
+async def api_query(query: HealthQuery, request: Request):
+    return await _answer(query, request)
+
+
+@app.post("/api/query/stream")
+async def api_query_stream(query: HealthQuery):
+    """Server-sent events: ``token`` events as the answer is generated, then
+    one ``done`` event carrying the full response payload."""
+    deadline = Deadline(settings.request_budget_seconds)
+
+    async def events():
+        async for event, data in assistant_orchestrator.stream_query(
+            message=query.message,
+            user_id=query.user_id or "web",
+            language=query.language,
+            history=[turn.model_dump() for turn in query.history or []],
+            debug=query.debug,
+            deadline=deadline,
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    # Starlette cancels the generator when the client disconnects.
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return result
 
 
 @app.post("/api/retry", response_model=HealthResponse)
-async def api_retry(query: HealthQuery):
+async def api_retry(query: HealthQuery, request: Request):
     """Explicit retry endpoint in case the client wants to bypass cache."""
-    return await assistant_orchestrator.handle_query(
-        message=query.message,
-        user_id=query.user_id or "web",
-        language=query.language,
-        history=[turn.model_dump() for turn in query.history or []],
+    return await _answer(query, request)
+
+
+@app.post("/api/retriage", status_code=202, dependencies=[Depends(require_admin_token)])
+async def start_retriage(body: RetriageRequest):
+    """Re-score chat history under a candidate emergency config in the
+    background; poll ``GET /api/retriage`` for progress and the report."""
+    global _retriage
+    if _retriage and _retriage.state in ("pending", "running"):
+        return JSONResponse({"detail": "a re-triage is already running"}, status_code=409)
+
+    baseline = TriageConfig.from_engine()
+    query = {"timestamp": {"$gte": body.since}} if body.since else {}
+    run = RetriageRun(
+        baseline,
+        baseline.with_overrides(body.weights, body.threshold),
+        settings.retriage_batch_size,
+    )
+    try:
+        total = await count_records(query, body.limit)
+    except Exception as e:
+        logger.error(f"Re-triage could not reach chat history: {e}")
+        return JSONResponse({"detail": "chat history unavailable"}, status_code=503)
+    _retriage, run.total = run, total
+    task = asyncio.create_task(
+        run.run(chat_records(query, settings.retriage_batch_size, body.limit), total)
     )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return run.progress()
+
+
+@app.get("/api/retriage", dependencies=[Depends(require_admin_token)])
+async def retriage_report():
+    if _retriage is None:
+        return JSONResponse({"detail": "no re-triage has run"}, status_code=404)
+    return _retriage.report()
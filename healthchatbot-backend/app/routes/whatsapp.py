@@ -3,12 +3,16 @@
 # 🚦 Person A - WhatsApp webhook integration
 # app/routes/whatsapp.py
 # app/routes/whatsapp.py
-from fastapi import APIRouter, Form, Response
+from fastapi import APIRouter, Form, Request, Response
 from twilio.rest import Client
 from twilio.twiml.messaging_response import MessagingResponse
 from decouple import config
-from app.db.db import save_chat_history
+from app.core.config import settings
+from app.core.deadline import ClientDisconnected, Deadline, run_until_disconnect
+from app.db.db import persist_chat_history
+from app.services.message_context import MessageContext
 from app.services.pipeline import assistant_orchestrator
+from app.services.reply_queue import reply_queue
 import logging
 
 router = APIRouter()
@@ -22,31 +26,49 @@ except Exception:
 
 @router.post("/webhook")
 async def whatsapp_webhook(
+    request: Request,
     From: str = Form(...),
     Body: str = Form(...)
 ):
     """Handle incoming WhatsApp messages with detailed logging"""
+    # Twilio gives up after ~15s; everything below shares this budget.
+    deadline = Deadline(settings.webhook_budget_seconds)
     try:
         user_message = Body.strip()
         user_phone = From.replace("whatsapp:", "")
 
         logging.info(f"📞 Received WhatsApp message: '{Body}' from {user_phone}")
 
+        # Async mode: ack Twilio right away, a worker delivers the answer.
+        # Falls through to the inline path only when the queue is stopped.
+        if settings.whatsapp_reply_mode == "async" and reply_queue.running:
+            if not reply_queue.enqueue(user_phone, user_message):
+                # Answering inline could overtake this user's queued messages;
+                # a 503 makes Twilio redeliver once the shard has drained.
+                logging.warning(f"📬 Reply queue full; asking Twilio to redeliver for {user_phone}")
+                return Response(status_code=503, headers={"Retry-After": "5"})
+            logging.info("📬 Message queued for async reply")
+            return Response(content=str(MessagingResponse()), media_type="application/xml")
+
+        # Analyse the message once; the pipeline and chat history share it
+        context = MessageContext.build(user_message)
+
         # Route through centralized orchestrator for consistency
-        orchestrated = await assistant_orchestrator.handle_query(
-            message=user_message, user_id=user_phone
+        orchestrated = await run_until_disconnect(
+            request,
+            assistant_orchestrator.handle_query(
+                message=user_message, user_id=user_phone, deadline=deadline, context=context
+            ),
+            settings.disconnect_poll_seconds,
         )
         response_text = orchestrated["response"]
         logging.info(f"🔍 Orchestrated response intent={orchestrated['intent']}")
 
         logging.info(f"📤 Prepared response: {response_text[:100]}...")
 
-        # Save conversation to database
-        try:
-            await save_chat_history(user_phone, Body, response_text)
-            logging.info("💾 Chat history saved successfully")
-        except Exception as e:
-            logging.error(f"Failed to save chat history: {str(e)}")
+        # Save conversation to database after replying; the webhook
+        # deadline is nearly spent here and must not cancel the write
+        persist_chat_history(user_phone, Body, response_text, context=context)
 
         # Create Twilio response
         resp = MessagingResponse()
@@ -56,6 +78,9 @@ async def whatsapp_webhook(
         logging.info(f"✅ TwiML response created: {response_xml[:150]}...")
         return Response(content=response_xml, media_type="application/xml")
 
+    except ClientDisconnected:
+        logging.warning("⌛ Twilio disconnected before the answer was ready; work cancelled")
+        return Response(content=str(MessagingResponse()), media_type="application/xml")
     except Exception as e:
         logging.error(f"❌ Critical error in WhatsApp webhook: {str(e)}")
         resp = MessagingResponse()
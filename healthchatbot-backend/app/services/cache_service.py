@@ -1,34 +1,516 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
 import time
-from typing import Any, Dict, Optional
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
+from app.core.config import settings
 
-class TTLCache:
-    """In-memory TTL cache with simple eviction."""
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: snapshot merges are best-effort
+    fcntl = None
 
-    def __init__(self, ttl_seconds: int = 600, max_items: int = 256):
-        self.ttl_seconds = ttl_seconds
+logger = logging.getLogger(__name__)
+
+CachePolicy = Literal["lru", "ttl"]
+Entry = Tuple[float, Any]
+
+# SQLite LRU recency is only rewritten once an entry's stamp is this old, so
+# hot keys do not turn every shared-cache read into a WAL write.
+LRU_TOUCH_SECONDS = 5.0
+
+# Named caches, so the sweeper and /health can reach every pipeline cache.
+_registry: Dict[str, "TTLCache"] = {}
+
+SERIALIZERS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (
+        lambda value: json.dumps(value, ensure_ascii=False).encode("utf-8"),
+        lambda raw: json.loads(raw),
+    ),
+    "pickle": (
+        lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+        lambda raw: pickle.loads(raw),
+    ),
+}
+
+
+class MemoryCacheBackend:
+    """Per-process store: ordered dict for eviction, min-heap for expiry.
+
+    The head of the ``OrderedDict`` is always the next eviction victim:
+    least recently used for ``policy="lru"``, earliest expiry for
+    ``policy="ttl"`` (the TTL is uniform, so insertion order is expiry order).
+    """
+
+    def __init__(self, max_items: int, policy: CachePolicy):
         self.max_items = max_items
-        self._store: Dict[str, tuple[float, Any]] = {}
+        self.policy = policy
+        self._store: "OrderedDict[str, Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
 
-    def get(self, key: str) -> Optional[Any]:
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def get(self, key: str) -> Optional[Entry]:
         entry = self._store.get(key)
-        if not entry:
-            return None
+        if entry and self.policy == "lru":
+            self._store.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, expires_at: float) -> int:
+        evicted = 0
+        if key in self._store:
+            self._store.move_to_end(key)
+        else:
+            while self._store and len(self._store) >= self.max_items:
+                self._store.popitem(last=False)
+                evicted += 1
+        self._store[key] = (expires_at, value)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._maybe_compact_heap()
+        return evicted
+
+    def delete(self, key: str):
+        self._store.pop(key, None)
+
+    def purge_expired(self, cutoff: float) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] < cutoff:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._store.get(key)
+            # Heap entries go stale when a key is re-set or evicted.
+            if entry and entry[0] == expires_at:
+                del self._store[key]
+                removed += 1
+        return removed
+
+    def _maybe_compact_heap(self):
+        # Overwrites and evictions leave dead heap entries behind; rebuild once
+        # they outnumber live ones so the heap stays O(max_items).
+        if len(self._expiry_heap) > 2 * max(len(self._store), 64):
+            self._expiry_heap = [(entry[0], key) for key, entry in self._store.items()]
+            heapq.heapify(self._expiry_heap)
 
-        expires_at, value = entry
-        if expires_at < time.time():
-            self._store.pop(key, None)
+    def items(self) -> List[Tuple[str, float, Any]]:
+        return [(key, expires_at, value) for key, (expires_at, value) in self._store.items()]
+
+    def clear(self):
+        self._store.clear()
+        self._expiry_heap.clear()
+
+
+class SQLiteCacheBackend:
+    """Node-local store shared by every worker through one SQLite-WAL file.
+
+    Each cache gets its own namespace in the file. Row counts are kept in a
+    side table by triggers, so the size check on insert is O(1) and eviction
+    is an indexed ``ORDER BY ... LIMIT`` instead of a table scan. LRU
+    recency is coarse (``LRU_TOUCH_SECONDS``) so reads stay reads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        namespace: str,
+        max_items: int,
+        policy: CachePolicy,
+        serializer: str = "json",
+    ):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_items = max_items
+        self.policy = policy
+        self._dumps, self._loads = SERIALIZERS[serializer]
+        self._order_column = "accessed_at" if policy == "lru" else "expires_at"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._init_schema()
+
+    def _init_schema(self):
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_cache_expires
+                ON cache_entries (namespace, expires_at);
+            CREATE INDEX IF NOT EXISTS idx_cache_accessed
+                ON cache_entries (namespace, accessed_at);
+            CREATE TABLE IF NOT EXISTS cache_counts (
+                namespace TEXT PRIMARY KEY,
+                n INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS cache_entries_ins AFTER INSERT ON cache_entries
+            BEGIN
+                UPDATE cache_counts SET n = n + 1 WHERE namespace = NEW.namespace;
+            END;
+            CREATE TRIGGER IF NOT EXISTS cache_entries_del AFTER DELETE ON cache_entries
+            BEGIN
+                UPDATE cache_counts SET n = n - 1 WHERE namespace = OLD.namespace;
+            END;
+            """
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO cache_counts (namespace, n) VALUES (?, 0)",
+            (self.namespace,),
+        )
+
+    def __len__(self) -> int:
+        row = self._conn.execute(
+            "SELECT n FROM cache_counts WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key: str) -> Optional[Entry]:
+        row = self._conn.execute(
+            "SELECT expires_at, value, accessed_at FROM cache_entries"
+            " WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if not row:
             return None
+        now = time.time()
+        if self.policy == "lru" and now - row[2] >= LRU_TOUCH_SECONDS:
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+        return row[0], self._loads(row[1])
+
+    def set(self, key: str, value: Any, expires_at: float) -> int:
+        payload = self._dumps(value)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT INTO cache_entries (namespace, key, value, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET
+                    value = excluded.value,
+                    expires_at = excluded.expires_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (self.namespace, key, payload, expires_at, time.time()),
+            )
+            overflow = len(self) - self.max_items
+            if overflow > 0:
+                conn.execute(
+                    f"""
+                    DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY {self._order_column} LIMIT ?
+                    )
+                    """,
+                    (self.namespace, self.namespace, overflow),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(overflow, 0)
+
+    def delete(self, key: str):
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        )
+
+    def purge_expired(self, cutoff: float) -> int:
+        cur = self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?",
+            (self.namespace, cutoff),
+        )
+        return cur.rowcount
+
+    def clear(self):
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        )
+
+
+class TTLCache:
+    """TTL cache with O(1) eviction, active expiry and a pluggable backend.
+
+    Hit/miss counters are kept per process; storage is delegated to a
+    ``MemoryCacheBackend`` (default) or a shared ``SQLiteCacheBackend``.
+    With ``stale_seconds > 0`` expired entries are retained that much longer
+    so ``lookup`` can serve them as stale while the caller refreshes them.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 600,
+        max_items: int = 256,
+        policy: CachePolicy = "lru",
+        name: Optional[str] = None,
+        backend: Optional[Any] = None,
+        stale_seconds: float = 0,
+    ):
+        if policy not in ("lru", "ttl"):
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.policy = policy
+        self.name = name
+        self.stale_seconds = stale_seconds
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_items, policy)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        if name:
+            _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def get(self, key: str) -> Optional[Any]:
+        value, stale = self.lookup(key, allow_stale=False)
         return value
 
+    def lookup(self, key: str, allow_stale: bool = True) -> Tuple[Optional[Any], bool]:
+        """Return ``(value, is_stale)``; stale values are only returned
+        within ``stale_seconds`` of expiry and when ``allow_stale`` is set."""
+        now = time.time()
+        with self._lock:
+            entry = self.backend.get(key)
+            if not entry:
+                self.misses += 1
+                return None, False
+
+            expires_at, value = entry
+            if expires_at >= now:
+                self.hits += 1
+                return value, False
+
+            if now - expires_at > self.stale_seconds:
+                self.backend.delete(key)
+                self.expirations += 1
+            elif allow_stale:
+                self.stale_hits += 1
+                return value, True
+            self.misses += 1
+            return None, False
+
     def set(self, key: str, value: Any):
-        if len(self._store) >= self.max_items:
-            # Evict oldest item
-            oldest_key = min(self._store.items(), key=lambda item: item[1][0])[0]
-            self._store.pop(oldest_key, None)
-        self._store[key] = (time.time() + self.ttl_seconds, value)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self.evictions += self.backend.set(key, value, expires_at)
+
+    def delete(self, key: str):
+        with self._lock:
+            self.backend.delete(key)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            removed = self.backend.purge_expired(now - self.stale_seconds)
+            self.expirations += removed
+        return removed
+
+    def snapshot(self) -> List[Tuple[str, float, Any]]:
+        """Live (or still servable stale) entries as ``(key, expires_at, value)``,
+        in eviction order; empty for backends that persist on their own."""
+        if not hasattr(self.backend, "items"):
+            return []
+        cutoff = time.time() - self.stale_seconds
+        with self._lock:
+            return [entry for entry in self.backend.items() if entry[1] >= cutoff]
+
+    def restore(self, entries: List[Tuple[str, float, Any]]) -> int:
+        """Load snapshot entries, keeping their original expiry times."""
+        cutoff = time.time() - self.stale_seconds
+        restored = 0
+        with self._lock:
+            for key, expires_at, value in entries:
+                if expires_at < cutoff:
+                    continue
+                self.backend.set(key, value, expires_at)
+                restored += 1
+        return restored
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "max_items": self.max_items,
+            "policy": self.policy,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
 
     def clear(self):
-        self._store.clear()
+        with self._lock:
+            self.backend.clear()
+
+
+def make_cache(name: str, ttl_seconds: Optional[int] = None) -> TTLCache:
+    """Build a named pipeline cache on the backend selected in settings."""
+    ttl = settings.cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+    backend = None
+    if settings.cache_backend == "sqlite":
+        try:
+            backend = SQLiteCacheBackend(
+                settings.cache_sqlite_path,
+                namespace=name,
+                max_items=settings.cache_max_items,
+                policy=settings.cache_policy,
+                serializer=settings.cache_serializer,
+            )
+        except Exception as e:
+            logger.error(f"SQLite cache backend unavailable for '{name}', using memory: {e}")
+    elif settings.cache_backend != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{settings.cache_backend}'; using memory.")
+    return TTLCache(
+        ttl_seconds=ttl,
+        max_items=settings.cache_max_items,
+        policy=settings.cache_policy,
+        name=name,
+        backend=backend,
+        stale_seconds=(
+            settings.cache_max_stale_seconds if settings.cache_stale_while_revalidate else 0
+        ),
+    )
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every named cache, keyed by cache name."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+@contextmanager
+def _snapshot_lock(path: Path):
+    """Serialise snapshot merges between worker processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f"{path.name}.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path: Path) -> Dict[str, List[Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("caches", {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable cache snapshot {path}, overwriting: {e}")
+        return {}
+
+
+def save_snapshot(path: Path) -> int:
+    """Merge every in-memory named cache into the JSON snapshot at ``path``;
+    returns the number of entries this process contributed. Entries that
+    are not JSON-serializable are skipped.
+
+    Every worker saves to the same path at shutdown, so each one merges into
+    what is already there (per key the later expiry wins, each cache is
+    trimmed to its ``max_items``) under a lock file, and writes through its
+    own temp file before the atomic replace.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    written = 0
+    with _snapshot_lock(path):
+        merged: Dict[str, Dict[str, List[Any]]] = {
+            name: {entry[0]: entry for entry in entries}
+            for name, entries in _read_snapshot(path).items()
+        }
+        for name, cache in _registry.items():
+            entries = merged.setdefault(name, {})
+            for key, expires_at, value in cache.snapshot():
+                try:
+                    json.dumps(value)
+                except (TypeError, ValueError):
+                    continue
+                written += 1
+                previous = entries.get(key)
+                if previous is None or previous[1] <= expires_at:
+                    entries[key] = [key, expires_at, value]
+        snapshot: Dict[str, List[Any]] = {}
+        for name, entries in merged.items():
+            cache = _registry.get(name)
+            cutoff = now - (cache.stale_seconds if cache else 0)
+            live = sorted(
+                (entry for entry in entries.values() if entry[1] >= cutoff), key=lambda e: e[1]
+            )
+            if cache:
+                live = live[-cache.max_items :]
+            if live:
+                snapshot[name] = live
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp_path.write_text(
+            json.dumps({"saved_at": now, "caches": snapshot}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+    return written
+
+
+def load_snapshot(path: Path) -> int:
+    """Restore named caches from a ``save_snapshot`` file, dropping entries
+    whose TTL ran out while the process was down."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    data = json.loads(path.read_text(encoding="utf-8"))
+    restored = 0
+    for name, entries in data.get("caches", {}).items():
+        cache = _registry.get(name)
+        if cache is None:
+            continue
+        restored += cache.restore([tuple(entry) for entry in entries])
+    return restored
+
+
+async def run_expiry_sweeper(interval_seconds: float):
+    """Periodically purge expired entries from every named cache."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for name, cache in list(_registry.items()):
+            try:
+                removed = cache.purge_expired()
+                if removed:
+                    logger.debug(f"Cache '{name}' swept {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Cache sweep failed for '{name}': {e}")
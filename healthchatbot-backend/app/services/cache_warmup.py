@@ -0,0 +1,141 @@
+"""
+Cache warm-up
+Pre-answers the most frequent recent queries so a fresh process does not
+send its first wave of users straight to the LLM
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.db import connect_to_mongo, db, get_database
+from app.services.language_detector import detect_language
+from app.services.pipeline import assistant_orchestrator
+from app.services.query_normalizer import query_normalizer
+
+logger = logging.getLogger(__name__)
+
+# chat_history stores db.detect_language names; the pipeline uses codes.
+DB_LANGUAGE_CODES = {"english": "en", "hindi": "hi", "odia": "or"}
+
+
+class QueryTally:
+    """Count messages per (language, canonical key), keeping one sample
+    phrasing per key to replay through the pipeline."""
+
+    def __init__(self):
+        self.counts: Dict[str, Counter] = {}
+        self.samples: Dict[Tuple[str, str], str] = {}
+
+    def add(self, message: str, language: Optional[str] = None):
+        if not message or not message.strip():
+            return
+        lang = DB_LANGUAGE_CODES.get(language or "") or detect_language(message)
+        key = query_normalizer.canonical_key(message)
+        self.counts.setdefault(lang, Counter())[key] += 1
+        self.samples.setdefault((lang, key), message)
+
+    def top(self, n: int) -> List[Tuple[str, str]]:
+        """``(lang, message)`` pairs for the ``n`` most frequent keys per language."""
+        plan = []
+        for lang, counter in self.counts.items():
+            for key, _ in counter.most_common(n):
+                plan.append((lang, self.samples[(lang, key)]))
+        return plan
+
+
+async def recent_messages(lookback_days: int) -> AsyncIterator[Dict[str, Any]]:
+    """Stream ``user_message``/``language`` from recent chat history."""
+    if db.client is None:
+        await connect_to_mongo()
+    database = await get_database()
+    since = datetime.now() - timedelta(days=lookback_days)
+    cursor = database.chat_history.find(
+        {"timestamp": {"$gte": since}},
+        {"user_message": 1, "language": 1, "_id": 0},
+    )
+    async for doc in cursor:
+        yield doc
+
+
+class CacheWarmer:
+    """Runs the warm-up once and exposes its progress for readiness checks."""
+
+    def __init__(self, orchestrator, top_n: int, concurrency: int):
+        self.orchestrator = orchestrator
+        self.top_n = top_n
+        self.concurrency = max(1, concurrency)
+        self.state = "pending"
+        self.total = 0
+        self.completed = 0
+        self.outcomes: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        # Warm-up is best effort: a failed run must not keep the app unready.
+        return self.state in ("done", "failed", "disabled")
+
+    def disable(self):
+        self.state = "disabled"
+
+    async def run(self, records: Optional[Iterable[Dict[str, Any]]] = None):
+        self.state = "running"
+        self.started_at = time.time()
+        try:
+            tally = QueryTally()
+            if records is None:
+                async for doc in recent_messages(settings.cache_warmup_lookback_days):
+                    tally.add(doc.get("user_message", ""), doc.get("language"))
+            else:
+                for doc in records:
+                    tally.add(doc.get("user_message", ""), doc.get("language"))
+
+            plan = tally.top(self.top_n)
+            self.total = len(plan)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def warm_one(lang: str, message: str):
+                async with semaphore:
+                    try:
+                        outcome = await self.orchestrator.warm(message, lang)
+                    except Exception as e:
+                        logger.warning(f"Warm-up failed for a {lang} query: {e}")
+                        outcome = "failed"
+                    self.outcomes[outcome] += 1
+                    self.completed += 1
+
+            await asyncio.gather(*(warm_one(lang, message) for lang, message in plan))
+            self.state = "done"
+            logger.info(f"🔥 Cache warm-up finished: {dict(self.outcomes)}")
+        except Exception as e:
+            self.state = "failed"
+            logger.error(f"❌ Cache warm-up aborted: {e}")
+        finally:
+            self.finished_at = time.time()
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "completed": self.completed,
+            "outcomes": dict(self.outcomes),
+            "duration_seconds": (
+                round((self.finished_at or time.time()) - self.started_at, 2)
+                if self.started_at
+                else None
+            ),
+        }
+
+
+cache_warmer = CacheWarmer(
+    assistant_orchestrator,
+    top_n=settings.cache_warmup_top_n,
+    concurrency=settings.cache_warmup_concurrency,
+)
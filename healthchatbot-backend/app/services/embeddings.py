@@ -0,0 +1,320 @@
+"""
+Embedding providers
+Azure OpenAI batched embeddings, a local hashing stand-in, and an on-disk cache
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from openai import AzureOpenAI
+except Exception:  # pragma: no cover - openai optional in tests
+    AzureOpenAI = None
+
+from app.core.config import settings
+from app.services.vectorizer import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider(ABC):
+    """Turns texts into a ``(len(texts), dim)`` float32 matrix.
+
+    ``signature`` names the model that produced the vectors; it is part of
+    the index manifest hashes and the cache keys, so switching providers
+    re-embeds everything instead of mixing vector spaces.
+    """
+
+    signature = "base"
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+    def embed_queries(self, texts: Sequence[str]) -> np.ndarray:
+        """``embed`` for user queries, which run inside a request budget and
+        are not worth persisting."""
+        return self.embed(texts)
+
+    def stats(self) -> Dict[str, object]:
+        return {"provider": self.signature}
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic, offline embeddings from ``HashingVectorizer``."""
+
+    def __init__(self, vectorizer: HashingVectorizer):
+        self.vectorizer = vectorizer
+
+    @property
+    def signature(self) -> str:
+        return self.vectorizer.signature
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.vectorizer.transform(list(texts))
+
+
+class AzureEmbeddingProvider(EmbeddingProvider):
+    """Azure OpenAI embeddings, ``batch_size`` texts per API call.
+
+    Synchronous on purpose: it runs inside index syncs and on the retrieval
+    thread pool, never on the event loop. Queries go through
+    ``query_client`` when given, so they can have a tighter timeout and no
+    retries.
+    """
+
+    def __init__(self, client, deployment: str, batch_size: int = 64, query_client=None):
+        self.client = client
+        self.query_client = query_client or client
+        self.deployment = deployment
+        self.batch_size = max(1, batch_size)
+        self.requests = 0
+        self.texts = 0
+
+    @property
+    def signature(self) -> str:
+        return f"azure:{self.deployment}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self._embed(self.client, texts)
+
+    def embed_queries(self, texts: Sequence[str]) -> np.ndarray:
+        return self._embed(self.query_client, texts)
+
+    def _embed(self, client, texts: Sequence[str]) -> np.ndarray:
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start : start + self.batch_size])
+            response = client.embeddings.create(model=self.deployment, input=batch)
+            self.requests += 1
+            self.texts += len(batch)
+            # The API may return items out of order; ``index`` is authoritative.
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+        return np.asarray(rows, dtype=np.float32)
+
+    def stats(self) -> Dict[str, object]:
+        return {"provider": self.signature, "requests": self.requests, "texts": self.texts}
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """Content-addressed on-disk cache in front of another provider.
+
+    Each vector is stored as ``<sha256[:2]>/<sha256>.npy`` where the hash
+    covers the provider signature and the text, so a text is embedded once
+    per model no matter how many documents repeat it. Misses are sent to
+    the inner provider as one batch. Only ``embed`` (knowledge-base
+    documents, a bounded set) is persisted; ``embed_queries`` bypasses the
+    disk, since every distinct user message would otherwise add a file and
+    queries are already kept in the retrieval ``VectorLRU``.
+    """
+
+    def __init__(self, inner: EmbeddingProvider, directory: Path):
+        self.inner = inner
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def signature(self) -> str:
+        return self.inner.signature
+
+    def _path(self, text: str) -> Path:
+        digest = hashlib.sha256(f"{self.signature}\0{text}".encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.npy"
+
+    def _read(self, path: Path) -> Optional[np.ndarray]:
+        try:
+            return np.load(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cached embedding {path}: {e}")
+            return None
+
+    def _write(self, path: Path, vector: np.ndarray):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as fh:
+                np.save(fh, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache embedding at {path}: {e}")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        paths = [self._path(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [self._read(path) for path in paths]
+        # Duplicates inside one call are embedded once.
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+        self.hits += len(texts) - sum(len(rows) for rows in missing.values())
+        self.misses += len(missing)
+        if missing:
+            fresh = self.inner.embed(list(missing))
+            for vector, rows in zip(fresh, missing.values()):
+                vector = np.asarray(vector, dtype=np.float32)
+                self._write(paths[rows[0]], vector)
+                for i in rows:
+                    vectors[i] = vector
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def embed_queries(self, texts: Sequence[str]) -> np.ndarray:
+        return self.inner.embed_queries(texts)
+
+    def stats(self) -> Dict[str, object]:
+        return {**self.inner.stats(), "disk_hits": self.hits, "disk_misses": self.misses}
+
+
+class VectorLRU:
+    """Bounded in-memory LRU of embeddings, stored as rows of one
+    preallocated float32 matrix.
+
+    The matrix is sized on the first insert to as many rows as fit in
+    ``max_bytes``; evicting the least recently used text frees its row for
+    the next one. Keys are 16-byte digests of the text, so long user
+    messages cost no more than short ones. Safe to share between the
+    retrieval pool's threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self.matrix: Optional[np.ndarray] = None
+        self.slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.matrix is None else len(self.matrix)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[List[Optional[np.ndarray]], List[str]]:
+        """Cached rows (copies) for ``texts`` with ``None`` for misses, and
+        the distinct missing texts in first-seen order."""
+        rows: List[Optional[np.ndarray]] = []
+        missing: Dict[str, None] = {}
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                slot = self.slots.get(key)
+                if slot is None:
+                    rows.append(None)
+                    missing[text] = None
+                    self.misses += 1
+                else:
+                    self.slots.move_to_end(key)
+                    rows.append(self.matrix[slot].copy())
+                    self.hits += 1
+        return rows, list(missing)
+
+    def put(self, text: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            if self.matrix is None or self.matrix.shape[1] != len(vector):
+                rows = self.max_bytes // max(1, vector.nbytes)
+                if rows == 0:
+                    return
+                self.matrix = np.zeros((rows, len(vector)), dtype=np.float32)
+                self.slots.clear()
+                self._free = list(range(rows - 1, -1, -1))
+            key = self._key(text)
+            slot = self.slots.get(key)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    _, slot = self.slots.popitem(last=False)
+                    self.evictions += 1
+            self.slots[key] = slot
+            self.slots.move_to_end(key)
+            self.matrix[slot] = vector
+
+    def clear(self):
+        with self._lock:
+            self.slots.clear()
+            self._free = list(range(self.capacity - 1, -1, -1))
+
+    def memory_bytes(self) -> int:
+        """Vector matrix plus key index, as allocated."""
+        matrix = 0 if self.matrix is None else self.matrix.nbytes
+        # Digest, slot int and OrderedDict node: ~190B per entry measured
+        # with tracemalloc on CPython 3.11.
+        return matrix + len(self.slots) * 190
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self),
+            "capacity": self.capacity,
+            "memory_bytes": self.memory_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def make_embedder(vectorizer: HashingVectorizer) -> EmbeddingProvider:
+    """Provider chosen by ``EMBEDDING_PROVIDER``; "auto" uses Azure when an
+    embedding deployment is configured and the hashing stand-in otherwise."""
+    choice = settings.embedding_provider
+    azure_ready = bool(
+        AzureOpenAI
+        and settings.azure_api_key
+        and settings.azure_endpoint
+        and settings.azure_embedding_deployment
+    )
+    if choice == "azure" or (choice == "auto" and azure_ready):
+        if not azure_ready:
+            logger.warning("Azure embeddings not configured; using hashing embeddings.")
+        else:
+            try:
+                client = AzureOpenAI(
+                    api_key=settings.azure_api_key,
+                    api_version="2024-02-15-preview",
+                    azure_endpoint=settings.azure_endpoint,
+                    timeout=settings.llm_timeout_seconds,
+                    max_retries=settings.retry_attempts,
+                )
+                # A query embedding shares the webhook budget with the LLM
+                # call: one attempt, in what the LLM leaves over.
+                query_timeout = max(
+                    0.5,
+                    settings.webhook_budget_seconds
+                    - settings.llm_timeout_seconds
+                    - settings.deadline_reserve_seconds,
+                )
+                provider = AzureEmbeddingProvider(
+                    client,
+                    settings.azure_embedding_deployment,
+                    settings.embedding_batch_size,
+                    client.with_options(
+                        timeout=min(query_timeout, settings.llm_timeout_seconds), max_retries=0
+                    ),
+                )
+                return CachedEmbeddingProvider(provider, settings.embedding_cache_dir)
+            except Exception as e:
+                logger.error(f"Failed to init Azure embeddings client: {e}")
+    elif choice not in ("auto", "hashing"):
+        logger.warning(f"Unknown EMBEDDING_PROVIDER '{choice}'; using hashing embeddings.")
+    return HashingEmbeddingProvider(vectorizer)
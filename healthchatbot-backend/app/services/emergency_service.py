@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from decouple import config
 from twilio.rest import Client
 
+from app.services.keyword_matcher import KeywordMatches, keyword_matcher, keyword_table
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -57,6 +59,14 @@ EMERGENCY_KEYWORDS = {
     "unconscious": ["unconscious", "fainted", "ବେହୋସ", "बेहोश"],
 }
 
+keyword_matcher.register(
+    "emergency",
+    [(phrase, "emergency_score", weight) for phrase, weight in SYMPTOM_WEIGHTS.items()]
+    + keyword_table(
+        {f"emergency:{kind}": keywords for kind, keywords in EMERGENCY_KEYWORDS.items()}
+    ),
+)
+
 
 class EmergencyEngine:
     """Score messages to reduce false positives while keeping urgent cases fast."""
@@ -64,18 +74,17 @@ class EmergencyEngine:
     def __init__(self, threshold: int = 6):
         self.threshold = threshold
 
-    def score(self, message: str) -> Tuple[int, List[str]]:
-        text = message.lower()
-        triggers = []
-        score = 0
-        for phrase, weight in SYMPTOM_WEIGHTS.items():
-            if phrase in text:
-                score += weight
-                triggers.append(phrase)
-        return score, triggers
-
-    def assess(self, message: str) -> Dict[str, object]:
-        score, triggers = self.score(message)
+    def score(
+        self, message: str, matches: Optional[KeywordMatches] = None
+    ) -> Tuple[int, List[str]]:
+        """Sum of ``SYMPTOM_WEIGHTS`` phrases present, each counted once."""
+        matches = matches or keyword_matcher.scan(message)
+        return matches.weight("emergency_score"), matches.keywords("emergency_score")
+
+    def assess(
+        self, message: str, matches: Optional[KeywordMatches] = None
+    ) -> Dict[str, object]:
+        score, triggers = self.score(message, matches)
         triggered = score >= self.threshold
         return {"score": score, "triggered": triggered, "triggers": triggers}
 
@@ -94,8 +103,8 @@ emergency_engine = EmergencyEngine()
 
 async def check_emergency_keywords(user_message: str, user_phone: str) -> tuple[bool, str]:
     """Check emergency keywords and scoring."""
-    score_result = emergency_engine.assess(user_message)
-    message_lower = user_message.lower()
+    matches = keyword_matcher.scan(user_message)
+    score_result = emergency_engine.assess(user_message, matches)
 
     if score_result["triggered"]:
         escalation_result = await escalate_to_asha(
@@ -103,13 +112,12 @@ async def check_emergency_keywords(user_message: str, user_phone: str) -> tuple[
         )
         return True, escalation_result
 
-    for emergency_type, keywords in EMERGENCY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword.lower() in message_lower:
-                escalation_result = await escalate_to_asha(
-                    user_phone, user_message, emergency_type
-                )
-                return True, escalation_result
+    for emergency_type in EMERGENCY_KEYWORDS:
+        if matches.has(f"emergency:{emergency_type}"):
+            escalation_result = await escalate_to_asha(
+                user_phone, user_message, emergency_type
+            )
+            return True, escalation_result
 
     return False, ""
 
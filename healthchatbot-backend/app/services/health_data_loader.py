@@ -16,6 +16,8 @@ class HealthDataLoader:
     def __init__(self, data_dir: str = None):
         base_dir = Path(__file__).resolve().parent.parent
         self.data_dir = Path(data_dir) if data_dir else base_dir / "data"
+        # Bumped on every reload so caches derived from the data can key on it
+        self.version = 0
         self.symptoms_db = {}
         self.emergency_protocols = {}
         self.asha_contacts = {}
@@ -126,6 +128,7 @@ class HealthDataLoader:
         """Reload all data from files"""
         logger.info("🔄 Reloading health data...")
         self._load_all_data()
+        self.version += 1
 
 # Global instance
 health_data = HealthDataLoader()
@@ -0,0 +1,93 @@
+"""
+Index manifest
+Content hashes of every indexed document, so re-indexing only touches what changed
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def content_hash(text: str, metadata: Dict[str, str], embedder: str) -> str:
+    """Hash of everything that determines a document's stored vector and
+    metadata; a new embedder signature invalidates every entry."""
+    payload = json.dumps([embedder, text, metadata], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestDiff:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.added or self.changed or self.deleted)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "deleted": len(self.deleted),
+            "unchanged": len(self.unchanged),
+        }
+
+
+class IndexManifest:
+    """``doc id -> content hash`` for one persisted index, stored as JSON
+    alongside it."""
+
+    def __init__(self, hashes: Optional[Dict[str, str]] = None):
+        self.hashes: Dict[str, str] = dict(hashes or {})
+
+    @classmethod
+    def load(cls, directory: Path) -> "IndexManifest":
+        path = Path(directory) / MANIFEST_FILE
+        try:
+            return cls(json.loads(path.read_text(encoding="utf-8")).get("documents", {}))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable index manifest {path}, treating as empty: {e}")
+            return cls()
+
+    def save(self, directory: Path):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+        tmp_path.write_text(
+            json.dumps({"documents": self.hashes}, ensure_ascii=False, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, directory / MANIFEST_FILE)
+
+    def digest(self) -> str:
+        """Fingerprint of the whole manifest, stamped into the saved index."""
+        payload = json.dumps(self.hashes, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def diff(self, current: Dict[str, str]) -> ManifestDiff:
+        """Compare ``current`` (id -> hash of the live documents) with what
+        was indexed."""
+        result = ManifestDiff()
+        for doc_id, digest in current.items():
+            previous = self.hashes.get(doc_id)
+            if previous is None:
+                result.added.append(doc_id)
+            elif previous != digest:
+                result.changed.append(doc_id)
+            else:
+                result.unchanged.append(doc_id)
+        result.deleted = [doc_id for doc_id in self.hashes if doc_id not in current]
+        return result
@@ -0,0 +1,136 @@
+"""
+Intent classifier
+Softmax regression over hashed word and akshara n-gram features, NumPy only
+"""
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.vectorizer import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+# "medical" is the catch-all: anything the model is unsure about still goes
+# to retrieval + LLM.
+LABELS = ("medical", "symptom", "scheme", "hospital", "greeting")
+
+
+class IntentClassifier:
+    """Linear classifier over ``HashingVectorizer`` rows.
+
+    Weights are ``(dim, len(labels))``; a batch of texts is one hashing pass
+    and one matrix product. Saved as a compressed ``.npz`` with float16
+    weights (a few KB), together with the vectorizer signature so a model
+    trained with other feature settings is refused at load time.
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        vectorizer: Optional[HashingVectorizer] = None,
+    ):
+        self.labels = list(labels)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.vectorizer = vectorizer or HashingVectorizer(self.weights.shape[0])
+        if self.weights.shape != (self.vectorizer.dim, len(self.labels)):
+            raise ValueError("weights must be (vectorizer dim, number of labels)")
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        dim: int = 1024,
+        epochs: int = 1000,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+    ) -> "IntentClassifier":
+        """Full-batch gradient descent on the softmax cross-entropy.
+
+        Classes are weighted by inverse frequency so a small label (e.g.
+        greetings) is not drowned by the medical majority.
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        classes = [label for label in LABELS if label in set(labels)]
+        classes += sorted(set(labels) - set(classes))
+        vectorizer = HashingVectorizer(dim)
+        x = vectorizer.transform(texts)
+        y = np.array([classes.index(label) for label in labels])
+        onehot = np.eye(len(classes), dtype=np.float32)[y]
+        counts = onehot.sum(axis=0)
+        sample_weight = (len(y) / (len(classes) * counts))[y][:, None].astype(np.float32)
+
+        weights = np.zeros((dim, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        scale = 1.0 / sample_weight.sum()
+        for _ in range(epochs):
+            probs = _softmax(x @ weights + bias)
+            error = (probs - onehot) * sample_weight
+            weights -= learning_rate * (x.T @ error * scale + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0) * scale
+        return cls(classes, weights, bias, vectorizer)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), len(labels))`` class probabilities."""
+        return _softmax(self.vectorizer.transform(texts) @ self.weights + self.bias)
+
+    def classify_many(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """Best label and its probability for every text."""
+        if not texts:
+            return []
+        probs = self.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        return [(self.labels[i], float(probs[row, i])) for row, i in enumerate(best)]
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        return self.classify_many([text])[0]
+
+    def save(self, path: Path):
+        """Write the model atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                labels=np.array(self.labels),
+                weights=self.weights.astype(np.float16),
+                bias=self.bias.astype(np.float16),
+                signature=np.array(self.vectorizer.signature),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IntentClassifier"]:
+        """The saved model, or ``None`` when missing or unusable."""
+        try:
+            with np.load(Path(path)) as data:
+                labels = [str(label) for label in data["labels"]]
+                weights, bias = data["weights"], data["bias"]
+                signature = str(data["signature"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"No usable intent model at {path}: {e}")
+            return None
+        vectorizer = HashingVectorizer(weights.shape[0])
+        if signature != vectorizer.signature:
+            logger.warning(
+                f"⚠️ Intent model {path} was trained with {signature}, "
+                f"expected {vectorizer.signature}; retrain it"
+            )
+            return None
+        return cls(labels, weights, bias, vectorizer)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
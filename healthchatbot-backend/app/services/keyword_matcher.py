@@ -0,0 +1,165 @@
+"""
+Keyword matcher
+One Aho-Corasick automaton over every keyword table, scanned once per message
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# (keyword, category, weight) as registered by a keyword table.
+Entry = Tuple[str, str, int]
+
+
+class KeywordHit(NamedTuple):
+    keyword: str
+    category: str
+    weight: int
+    start: int
+
+
+class KeywordMatches:
+    """Every hit in one text, with per-category views.
+
+    Matching is on substrings of the lowercased text, exactly like the
+    ``keyword in text.lower()`` loops it replaces.
+    """
+
+    def __init__(self, hits: List[KeywordHit]):
+        self.hits = hits
+        self.by_category: Dict[str, List[KeywordHit]] = {}
+        for hit in hits:
+            self.by_category.setdefault(hit.category, []).append(hit)
+
+    def has(self, category: str) -> bool:
+        return category in self.by_category
+
+    def categories(self) -> Set[str]:
+        return set(self.by_category)
+
+    def keywords(self, category: str) -> List[str]:
+        """Distinct keywords of ``category``, in order of first occurrence."""
+        return list(dict.fromkeys(hit.keyword for hit in self.by_category.get(category, [])))
+
+    def weight(self, category: str) -> int:
+        """Sum of weights, each distinct keyword counted once."""
+        weights = {hit.keyword: hit.weight for hit in self.by_category.get(category, [])}
+        return sum(weights.values())
+
+    def first(self, categories: Iterable[str]) -> Optional[str]:
+        """The first of ``categories`` (priority order) with any hit."""
+        return next((category for category in categories if self.has(category)), None)
+
+
+@dataclass
+class _Automaton:
+    goto: List[Dict[str, int]]
+    fail: List[int]
+    # Per state: indices into ``tags`` of every keyword ending there,
+    # including those inherited through failure links.
+    output: List[List[int]]
+    tags: List[Tuple[str, List[Tuple[str, int]]]]
+
+
+def _compile(entries: Iterable[Entry]) -> _Automaton:
+    tags_by_keyword: Dict[str, List[Tuple[str, int]]] = {}
+    for keyword, category, weight in entries:
+        keyword = keyword.lower()
+        if keyword:
+            tags_by_keyword.setdefault(keyword, []).append((category, weight))
+
+    goto: List[Dict[str, int]] = [{}]
+    output: List[List[int]] = [[]]
+    tags = list(tags_by_keyword.items())
+    for index, (keyword, _) in enumerate(tags):
+        state = 0
+        for char in keyword:
+            nxt = goto[state].get(char)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][char] = nxt
+                goto.append({})
+                output.append([])
+            state = nxt
+        output[state].append(index)
+
+    # Breadth-first failure links: the longest proper suffix that is also
+    # a prefix of some keyword.
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, nxt in goto[state].items():
+            queue.append(nxt)
+            back = fail[state]
+            while back and char not in goto[back]:
+                back = fail[back]
+            fail[nxt] = goto[back].get(char, 0)
+            output[nxt] = output[nxt] + output[fail[nxt]]
+    return _Automaton(goto, fail, output, tags)
+
+
+class KeywordMatcher:
+    """Registry of keyword tables compiled into one automaton.
+
+    Modules register their tables under a group name at import time (or
+    when their data reloads); re-registering a group replaces it. The
+    automaton is rebuilt lazily on the next scan, and a scan always runs
+    against one immutable compiled snapshot.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, List[Entry]] = {}
+        self._compiled: Optional[_Automaton] = None
+        self._lock = threading.Lock()
+
+    def register(self, group: str, entries: Iterable[Entry]):
+        with self._lock:
+            self.groups[group] = list(entries)
+            self._compiled = None
+
+    def _automaton(self) -> _Automaton:
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = _compile(
+                        entry for entries in self.groups.values() for entry in entries
+                    )
+                compiled = self._compiled
+        return compiled
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Every registered keyword occurring in ``text``, in one pass."""
+        automaton = self._automaton()
+        goto, fail, output, tags = (
+            automaton.goto,
+            automaton.fail,
+            automaton.output,
+            automaton.tags,
+        )
+        hits: List[KeywordHit] = []
+        state = 0
+        for end, char in enumerate(text.lower(), start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                keyword, keyword_tags = tags[index]
+                for category, weight in keyword_tags:
+                    hits.append(KeywordHit(keyword, category, weight, end - len(keyword)))
+        return KeywordMatches(hits)
+
+
+def keyword_table(categories: Dict[str, Iterable[str]], weight: int = 1) -> List[Entry]:
+    """Entries for a ``{category: [keywords]}`` table."""
+    return [
+        (keyword, category, weight)
+        for category, keywords in categories.items()
+        for keyword in keywords
+    ]
+
+
+keyword_matcher = KeywordMatcher()
@@ -4,14 +4,21 @@ import os
 from pathlib import Path
 import logging
 
+from app.services.script_detector import ScriptDetection, detect_script
+
 logger = logging.getLogger(__name__)
 
-# Language detection fallback (without langdetect dependency)
-LANGUAGE_KEYWORDS = {
-    "hi": ["बुखार", "सिरदर्द", "खांसी", "दर्द", "आपातकाल", "नमस्ते", "मुझे", "है", "के", "में"],
-    "or": ["ଜ୍ୱର", "ମୁଣ୍ଡବିନ୍ଧା", "କାଶ", "ଦରଦ", "ଜରୁରୀକାଳୀନ", "ନମସ୍କାର", "ମୋର", "ଅଛି", "ପାଇଁ"],
-    "en": ["fever", "headache", "cough", "pain", "emergency", "hello", "have", "is", "for", "help"]
-}
+# Below this confidence the detector's guess is not trusted
+MIN_CONFIDENCE = 0.2
+
+def confident_language(detection: ScriptDetection) -> tuple[str, float]:
+    """
+    Language code for a script detection, English below MIN_CONFIDENCE
+    """
+    if detection.confidence < MIN_CONFIDENCE:
+        return "en", detection.confidence
+    
+    return detection.language, detection.confidence
 
 def detect_language_with_confidence(text: str) -> tuple[str, float]:
     """
@@ -21,28 +28,8 @@ def detect_language_with_confidence(text: str) -> tuple[str, float]:
     if not text or not text.strip():
         return "en", 0.0
     
-    text_lower = text.lower()
-    scores = {"hi": 0, "or": 0, "en": 0}
-    
-    # Count matches for each language
-    for lang, keywords in LANGUAGE_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                scores[lang] += 1
-    
-    # Find language with highest score
-    max_lang = max(scores, key=scores.get)
-    max_score = scores[max_lang]
-    
-    # Calculate confidence (simple heuristic)
-    total_words = len(text.split())
-    confidence = min(max_score / max(total_words, 1), 1.0)
-    
-    # Default to English if confidence is too low
-    if confidence < 0.2:
-        return "en", confidence
-    
-    return max_lang, confidence
+    # Script share for Hindi/Odia letters, n-gram posterior for Latin text
+    return confident_language(detect_script(text))
 
 def detect_language(text: str) -> str:
     """
@@ -0,0 +1,124 @@
+"""
+Lexical retrieval
+BM25 over an inverted index, plus reciprocal-rank fusion with vector hits
+"""
+from __future__ import annotations
+
+import bisect
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.query_normalizer import STOP_WORDS, tokenize
+
+Hit = Tuple[int, float]
+
+# Shorter terms are not expanded by prefix: too many false friends.
+MIN_PREFIX_CHARS = 3
+# Prefix (partial) matches count for less than exact ones.
+PREFIX_WEIGHT = 0.5
+
+
+def analyze(text: str) -> List[str]:
+    """Index/query terms: ``tokenize`` keeps matras and viramas attached to
+    their consonants, so Devanagari and Odia words survive intact."""
+    return [token for token in tokenize(text) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """Okapi BM25 with postings lists; a query only touches documents that
+    share at least one term with it.
+
+    Query terms missing from the vocabulary fall back to terms they are a
+    prefix of (or that are a prefix of them), so "headaches", "feverish" or
+    "बुखारों" still reach their documents at ``PREFIX_WEIGHT``.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_lengths: List[int] = []
+        self.langs: List[str] = []
+        self.avg_length = 0.0
+        self.vocabulary: List[str] = []
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Iterable[str]],
+        langs: Sequence[str],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """``documents`` are pre-analyzed term sequences (repeat a term to
+        boost it); ``langs`` tags each document for filtered search."""
+        index = cls(k1, b)
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc_id, terms in enumerate(documents):
+            counts = Counter(terms)
+            index.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((doc_id, tf))
+        index.postings = dict(postings)
+        index.langs = list(langs)
+        count = len(index.doc_lengths)
+        index.avg_length = sum(index.doc_lengths) / count if count else 0.0
+        index.idf = {
+            term: math.log(1 + (count - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in index.postings.items()
+        }
+        index.vocabulary = sorted(index.postings)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        if term in self.postings:
+            return [(term, 1.0)]
+        if len(term) < MIN_PREFIX_CHARS:
+            return []
+        matches = []
+        # Longer vocabulary terms starting with the query term.
+        start = bisect.bisect_left(self.vocabulary, term)
+        for candidate in self.vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append((candidate, PREFIX_WEIGHT))
+        # Shorter vocabulary terms the query term starts with.
+        for size in range(MIN_PREFIX_CHARS, len(term)):
+            if term[:size] in self.postings:
+                matches.append((term[:size], PREFIX_WEIGHT))
+        return matches
+
+    def search(self, terms: Iterable[str], k: int, lang: Optional[str] = None) -> List[Hit]:
+        """Top-``k`` ``(doc, score)`` pairs, best first, optionally restricted
+        to one language's documents."""
+        scores: Dict[int, float] = defaultdict(float)
+        for query_term in set(terms):
+            for term, weight in self._expand(query_term):
+                idf = self.idf[term]
+                for doc_id, tf in self.postings[term]:
+                    if lang is not None and self.langs[doc_id] != lang:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                    scores[doc_id] += weight * idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Merge ranked id lists: each id scores ``sum(1 / (k + rank))``.
+
+    Rank-based, so BM25 scores and cosine similarities never need to be
+    put on a common scale.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 try:
     from openai import AsyncAzureOpenAI
@@ -10,16 +10,31 @@ except Exception:  # pragma: no cover - openai optional in tests
     AsyncAzureOpenAI = None
 
 from app.core.config import settings
-from app.services.cache_service import TTLCache
+from app.core.deadline import Deadline
+from app.services.cache_service import make_cache
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Below this, an Azure attempt cannot realistically finish; fall back instead.
+MIN_ATTEMPT_SECONDS = 1.0
+
+SYSTEM_PROMPT = (
+    "You are a concise, safe rural healthcare assistant. Answer in the user's language "
+    "with brief steps and caution. Avoid diagnostics; encourage professional consultation."
+)
+
+
+class StreamInterrupted(RuntimeError):
+    """Raised when a completion stream fails after tokens were already sent."""
+
 
 class LLMService:
     """Azure OpenAI wrapper with cache, retry, and timeout safeguards."""
 
     def __init__(self):
-        self.cache = TTLCache(ttl_seconds=settings.cache_ttl_seconds)
+        self.cache = make_cache("llm")
+        self.flights = SingleFlight("llm")
         self.client = None
         if AsyncAzureOpenAI and settings.azure_api_key and settings.azure_endpoint:
             try:
@@ -34,35 +49,131 @@ class LLMService:
         else:
             logger.warning("Azure OpenAI not configured; using fallback responses.")
 
-    async def generate(self, prompt: str, language: str) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        language: str,
+        deadline: Optional[Deadline] = None,
+        allow_stale: bool = True,
+    ) -> str:
+        """Completion for ``prompt``, cached per language. ``allow_stale=False``
+        (for callers revalidating their own stale answers) skips stale cache
+        entries and waits for a fresh completion."""
+        deadline = deadline or Deadline(None)
         cache_key = f"{language}:{prompt}"
-        cached = self.cache.get(cache_key)
+        cached, stale = self.cache.lookup(cache_key, allow_stale)
+        if cached and stale and self.client:
+            # Background refreshes are not tied to this request's budget.
+            self.flights.refresh(
+                cache_key, lambda: self._complete(prompt, cache_key, Deadline(None))
+            )
         if cached:
             return cached
 
         if not self.client or not settings.azure_deployment:
             return ""
 
+        return await self.flights.do(
+            cache_key, lambda: self._complete(prompt, cache_key, deadline)
+        )
+
+    async def stream(
+        self, prompt: str, language: str, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """Yield completion tokens as Azure produces them.
+
+        A cached answer is yielded as one chunk. Yields nothing when the LLM
+        is unavailable or fails before the first token (callers fall back);
+        raises ``StreamInterrupted`` if it fails mid-answer. Only complete
+        answers are cached.
+        """
+        deadline = deadline or Deadline(None)
+        cache_key = f"{language}:{prompt}"
+        cached = self.cache.get(cache_key)
+        if cached:
+            yield cached
+            return
+
+        if not self.client or not settings.azure_deployment:
+            return
+
+        parts = []
+        stream = None
+        try:
+            stream = await asyncio.wait_for(
+                self.client.chat.completions.create(**self._request(prompt), stream=True),
+                timeout=deadline.cap(
+                    settings.llm_timeout_seconds, settings.deadline_reserve_seconds
+                ),
+            )
+            chunks = stream.__aiter__()
+            while True:
+                # Each gap between chunks gets the per-call timeout, capped
+                # by what is left of the request budget.
+                timeout = deadline.cap(
+                    settings.llm_timeout_seconds, settings.deadline_reserve_seconds
+                )
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                # Azure sends content-filter chunks without choices.
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    parts.append(token)
+                    yield token
+        except Exception as e:
+            logger.error(f"LLM stream failed after {len(parts)} chunks: {e!r}")
+            if parts:
+                raise StreamInterrupted(str(e)) from e
+            return
+        finally:
+            # Timeouts, failures and consumers that stop early would
+            # otherwise leave the HTTP connection open.
+            if stream is not None:
+                try:
+                    await stream.close()
+                except Exception as e:
+                    logger.warning(f"Could not close LLM stream: {e!r}")
+
+        if parts:
+            self.cache.set(cache_key, "".join(parts))
+
+    def _request(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": settings.azure_deployment,
+            "temperature": 0.2,
+            "max_tokens": 350,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+        }
+
+    async def _complete(self, prompt: str, cache_key: str, deadline: Deadline) -> str:
         attempts = settings.retry_attempts
         delays = [0, 2, 5]
 
         for attempt in range(attempts):
+            # Shrink backoff and per-attempt timeout to the remaining budget,
+            # and stop once there is no time left for a useful attempt.
+            remaining = deadline.cap(None, settings.deadline_reserve_seconds)
+            delay = delays[min(attempt, len(delays) - 1)]
+            if remaining is not None:
+                if remaining < MIN_ATTEMPT_SECONDS:
+                    logger.warning("LLM budget exhausted; skipping remaining attempts")
+                    break
+                delay = min(delay, remaining - MIN_ATTEMPT_SECONDS)
             try:
-                await asyncio.sleep(delays[attempt])
+                await asyncio.sleep(delay)
+                timeout = deadline.cap(
+                    settings.llm_timeout_seconds, settings.deadline_reserve_seconds
+                )
                 response = await asyncio.wait_for(
-                    self.client.chat.completions.create(
-                        model=settings.azure_deployment,
-                        temperature=0.2,
-                        max_tokens=350,
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a concise, safe rural healthcare assistant. Answer in the user's language with brief steps and caution. Avoid diagnostics; encourage professional consultation.",
-                            },
-                            {"role": "user", "content": prompt},
-                        ],
-                    ),
-                    timeout=settings.llm_timeout_seconds,
+                    self.client.chat.completions.create(**self._request(prompt)),
+                    timeout=timeout,
                 )
                 text = response.choices[0].message.content
                 self.cache.set(cache_key, text)
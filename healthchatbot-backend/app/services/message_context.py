@@ -0,0 +1,78 @@
+"""
+Message context
+Per-message analysis computed once at ingress and shared by every stage
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.tracing import RequestTrace
+from app.services.emergency_service import emergency_engine
+from app.services.keyword_matcher import KeywordMatches, keyword_matcher
+from app.services.language_detector import confident_language
+from app.services.query_normalizer import query_normalizer, tokenize
+from app.services.script_detector import ScriptDetection, detect_script
+from app.services.task_router import task_router
+
+
+@dataclass(frozen=True)
+class MessageContext:
+    """What the pipeline and persistence need to know about one message.
+
+    Built once (webhook, reply worker or API entry point) and passed
+    along, so language detection, the keyword scan, routing, emergency
+    scoring and cache-key normalisation each run exactly once.
+    """
+
+    text: str
+    # Tokens after NFC + casefold, space-joined.
+    normalized: str
+    script: ScriptDetection
+    # Pipeline language code: the caller's override or the detected one.
+    language: str
+    matches: KeywordMatches
+    route: str
+    emergency: Dict[str, Any]
+    canonical_key: str
+
+    @classmethod
+    def build(
+        cls,
+        message: str,
+        language: Optional[str] = None,
+        trace: Optional[RequestTrace] = None,
+    ) -> "MessageContext":
+        def span(name: str):
+            return trace.span(name) if trace else nullcontext()
+
+        text = message.strip()
+        with span("language_detection"):
+            script = detect_script(text)
+            lang = language or confident_language(script)[0]
+        # Triage runs on the raw text: canonical keys merge phrasings, and an
+        # emergency must never be answered from a cached non-emergency payload.
+        # One keyword scan feeds both routing and emergency scoring.
+        with span("routing"):
+            matches = keyword_matcher.scan(text)
+            route = task_router.route(text, matches)
+        with span("emergency_assess"):
+            emergency = emergency_engine.assess(text, matches)
+        with span("normalize"):
+            normalized = " ".join(tokenize(text))
+            canonical_key = query_normalizer.canonical_key(text)
+        return cls(text, normalized, script, lang, matches, route, emergency, canonical_key)
+
+    @property
+    def cache_key(self) -> str:
+        """Orchestrator answer-cache key."""
+        return f"{self.language}:{self.canonical_key}"
+
+    @property
+    def emergency_score(self) -> int:
+        return self.emergency["score"]
+
+    @property
+    def is_emergency(self) -> bool:
+        return bool(self.emergency["triggered"]) or self.route == "emergency"
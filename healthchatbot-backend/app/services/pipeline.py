@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.constants import WELCOME_MESSAGES
+from app.core.deadline import Deadline
 from app.core.session_manager import session_manager
-from app.services.cache_service import TTLCache
+from app.core.tracing import LatencyRecorder, RequestTrace, log_if_slow
+from app.services.cache_service import make_cache
 from app.services.emergency_service import emergency_engine, escalate_to_asha
-from app.services.health_data_loader import health_data
-from app.services.language_detector import detect_language
-from app.services.llm_service import llm_service
+from app.services.keyword_matcher import KeywordMatches
+from app.services.llm_service import StreamInterrupted, llm_service
+from app.services.message_context import MessageContext
 from app.services.retrieval_service import retrieval_service
-from app.services.task_router import task_router
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -40,11 +45,35 @@ HOSPITAL_DIRECTORY = [
 ]
 
 
+@dataclass
+class Triage:
+    """Outcome of the pre-LLM stages; ``payload`` is set when already answered."""
+
+    context: MessageContext
+    cache_key: str
+    payload: Optional[Dict[str, Any]] = None
+
+    @property
+    def lang(self) -> str:
+        return self.context.language
+
+    @property
+    def route(self) -> str:
+        return self.context.route
+
+    @property
+    def emergency_score(self) -> int:
+        return self.context.emergency_score
+
+
 class AssistantOrchestrator:
     """End-to-end orchestration for a single-turn query."""
 
     def __init__(self):
-        self.cache = TTLCache(ttl_seconds=settings.cache_ttl_seconds)
+        self.cache = make_cache("orchestrator")
+        self.flights = SingleFlight("orchestrator")
+        # Time from request start to the first streamed LLM token.
+        self.ttft = LatencyRecorder()
 
     async def handle_query(
         self,
@@ -52,37 +81,253 @@ class AssistantOrchestrator:
         user_id: str,
         language: Optional[str] = None,
         history: Optional[List[Dict[str, str]]] = None,
+        debug: bool = False,
+        deadline: Optional[Deadline] = None,
+        context: Optional[MessageContext] = None,
     ) -> Dict[str, Any]:
-        lang = language or detect_language(message)
-        session = session_manager.get_session(user_id)
-        session_manager.update_activity(user_id)
-        if lang:
-            session_manager.set_language(user_id, lang)
-
-        cache_key = f"{lang}:{message.strip().lower()}"
-        cached = self.cache.get(cache_key)
-        if cached:
-            cached_copy = dict(cached)
-            cached_copy["cached"] = True
-            return cached_copy
+        """Answer one message. ``context`` is the analysis the caller built
+        at ingress (language, keyword scan, route, emergency score, cache
+        key); it is built here when absent."""
+        trace = RequestTrace()
+        deadline = deadline or Deadline(None)
+        payload = await self._handle(
+            message, user_id, language, history, trace, deadline, context
+        )
+        log_if_slow(
+            trace,
+            user_id=user_id,
+            intent=payload.get("intent"),
+            cached=payload.get("cached"),
+        )
+        if debug or settings.trace_debug:
+            payload = {**payload, "meta": {**payload.get("meta", {}), "trace": trace.as_dict()}}
+        return payload
+
+    async def stream_query(
+        self,
+        message: str,
+        user_id: str,
+        language: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        debug: bool = False,
+        deadline: Optional[Deadline] = None,
+        context: Optional[MessageContext] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``("token", {"text": ...})`` events while the LLM streams,
+        then one ``("done", payload)``. Emergency, template and cached
+        answers arrive as the single ``done`` event.
+
+        Streams are not coalesced through single-flight; the finished answer
+        is cached like a regular one, so followers still hit the cache.
+        """
+        trace = RequestTrace()
+        deadline = deadline or Deadline(None)
+        triage = await self._triage(message, user_id, language, trace, context)
+        payload = triage.payload
+        ttft_ms = None
+
+        if payload is None:
+            lang = triage.lang
+            turns = (history or [])[-settings.max_history :]
+            with trace.span("retrieval"):
+                contexts, source = await retrieval_service.get_context(
+                    message, lang, deadline, triage.context.canonical_key
+                )
+            with trace.span("prompt_build"):
+                prompt = self._build_prompt(message, lang, contexts, turns)
+
+            parts: List[str] = []
+            truncated = False
+            try:
+                with trace.span("llm_generate"):
+                    async for token in llm_service.stream(prompt, lang, deadline):
+                        if ttft_ms is None:
+                            ttft_ms = trace.total_ms
+                            self.ttft.record(ttft_ms)
+                        parts.append(token)
+                        yield "token", {"text": token}
+            except StreamInterrupted:
+                truncated = True
+
+            if parts:
+                answer = "".join(parts)
+            else:
+                with trace.span("kb_fallback"):
+                    answer = self._knowledge_base_fallback(message, lang, triage.context.matches)
+            payload = self._build_response(
+                answer,
+                intent="medical",
+                severity="medium",
+                emergency=False,
+                meta={
+                    "route": triage.route,
+                    "context_source": source,
+                    "context_used": bool(contexts),
+                    "emergency_score": triage.emergency_score,
+                },
+            )
+            if truncated:
+                # A partial answer must not be served to later users.
+                payload["meta"]["truncated"] = True
+            else:
+                self.cache.set(triage.cache_key, payload)
+            session_manager.add_to_history(user_id, message, answer)
+
+        log_if_slow(
+            trace,
+            user_id=user_id,
+            intent=payload.get("intent"),
+            cached=payload.get("cached"),
+            streamed=True,
+        )
+        meta = {**payload.get("meta", {}), "ttft_ms": round(ttft_ms or trace.total_ms, 2)}
+        if debug or settings.trace_debug:
+            meta["trace"] = trace.as_dict()
+        yield "done", {**payload, "meta": meta}
+
+    async def warm(self, message: str, lang: str) -> str:
+        """Pre-answer a past query into the cache without touching sessions
+        or escalation. Returns "cached", "warmed" or "skipped"."""
+        context = MessageContext.build(message, lang)
+        cache_key = context.cache_key
+        if self.cache.get(cache_key):
+            return "cached"
+        # Emergencies are never cached; template routes are cheap on demand.
+        if context.is_emergency or context.route != "medical":
+            return "skipped"
+        payload = await self.flights.do(
+            cache_key,
+            lambda: self._answer_medical(
+                cache_key,
+                message,
+                context,
+                [],
+                Deadline(settings.request_budget_seconds),
+                # Only a real LLM answer is worth caching ahead of time.
+                revalidating=True,
+            ),
+        )
+        return "skipped" if payload["meta"].get("kb_fallback") else "warmed"
+
+    async def _handle(
+        self,
+        message: str,
+        user_id: str,
+        language: Optional[str],
+        history: Optional[List[Dict[str, str]]],
+        trace: RequestTrace,
+        deadline: Deadline,
+        context: Optional[MessageContext] = None,
+    ) -> Dict[str, Any]:
+        triage = await self._triage(message, user_id, language, trace, context)
+        if triage.payload is not None:
+            return triage.payload
+        lang, route, cache_key = triage.lang, triage.route, triage.cache_key
+
+        turns = (history or [])[-settings.max_history :]
+        shared: Dict[str, Any] = {}
+        try:
+            # Identical concurrent misses share one retrieval + LLM round trip;
+            # only the leader's trace sees the inner stages. The wait is capped
+            # so the knowledge-base fallback still answers before the deadline.
+            with trace.span("answer"):
+                shared = await self.flights.do(
+                    cache_key,
+                    lambda: self._answer_medical(
+                        cache_key,
+                        message,
+                        triage.context,
+                        turns,
+                        deadline,
+                        trace=trace,
+                    ),
+                    timeout=deadline.cap(
+                        settings.single_flight_timeout_seconds,
+                        settings.deadline_reserve_seconds,
+                    ),
+                )
+        except asyncio.TimeoutError:
+            logger.warning("Timed out waiting for in-flight answer; using knowledge base")
 
-        route = task_router.route(message)
-        emergency_eval = emergency_engine.assess(message)
+        if shared:
+            payload = dict(shared)
+        else:
+            with trace.span("kb_fallback"):
+                fallback_text = self._knowledge_base_fallback(
+                    message, lang, triage.context.matches
+                )
+            payload = self._build_response(
+                fallback_text,
+                intent="medical",
+                severity="medium",
+                emergency=False,
+                meta={"route": route, "context_source": "fallback", "timed_out": True},
+            )
+
+        session_manager.add_to_history(user_id, message, payload["response"])
+        return payload
+
+    async def _triage(
+        self,
+        message: str,
+        user_id: str,
+        language: Optional[str],
+        trace: RequestTrace,
+        context: Optional[MessageContext] = None,
+    ) -> Triage:
+        """Everything before the LLM: language, session, routing, emergency
+        escalation, cache and template answers. ``payload`` is set when the
+        query is already answered."""
+        if context is None:
+            context = MessageContext.build(message, language, trace)
+        elif language and language != context.language:
+            context = replace(context, language=language)
+        lang, route = context.language, context.route
+        with trace.span("session_update"):
+            session = session_manager.get_session(user_id)
+            session_manager.update_activity(user_id)
+            if lang:
+                session_manager.set_language(user_id, lang)
 
-        if emergency_eval["triggered"] or route == "emergency":
+        # Emergencies are checked before the cache so a repeat never skips
+        # escalation.
+        if context.is_emergency:
             session_manager.mark_emergency(user_id)
             response_text = emergency_engine.build_emergency_message(user_id, message)
-            await escalate_to_asha(user_id, message, "scored_emergency")
+            with trace.span("escalation"):
+                await escalate_to_asha(user_id, message, "scored_emergency")
             payload = self._build_response(
                 response_text,
                 intent="emergency",
                 severity="critical",
                 emergency=True,
-                meta={"route": route, "emergency_score": emergency_eval["score"]},
+                meta={"route": route, "emergency_score": context.emergency_score},
             )
-            self.cache.set(cache_key, payload)
             session_manager.add_to_history(user_id, message, response_text)
-            return payload
+            return Triage(context, "", payload)
+
+        with trace.span("cache_lookup"):
+            cache_key = context.cache_key
+            cached, stale = self.cache.lookup(cache_key)
+        # Template routes are cheap to rebuild, so only LLM answers are
+        # served stale while a background task refreshes them.
+        if cached and (not stale or route == "medical"):
+            cached_copy = dict(cached)
+            cached_copy["cached"] = True
+            if stale:
+                cached_copy["meta"] = {**cached_copy.get("meta", {}), "stale": True}
+                self.flights.refresh(
+                    cache_key,
+                    lambda: self._answer_medical(
+                        cache_key,
+                        message,
+                        context,
+                        [],
+                        Deadline(None),
+                        revalidating=True,
+                    ),
+                )
+            return Triage(context, cache_key, cached_copy)
 
         if route == "scheme":
             response_text = (
@@ -99,7 +344,7 @@ class AssistantOrchestrator:
             )
             self.cache.set(cache_key, payload)
             session_manager.add_to_history(user_id, message, response_text)
-            return payload
+            return Triage(context, cache_key, payload)
 
         if route == "hospital":
             response_text = (
@@ -114,22 +359,82 @@ class AssistantOrchestrator:
             )
             self.cache.set(cache_key, payload)
             session_manager.add_to_history(user_id, message, response_text)
-            return payload
+            return Triage(context, cache_key, payload)
 
-        contexts, source = await retrieval_service.get_context(message, lang)
-        turns = (history or [])[-settings.max_history :]
-        prompt = self._build_prompt(message, lang, contexts, turns)
+        if route == "greeting":
+            response_text = WELCOME_MESSAGES.get(lang, WELCOME_MESSAGES["en"])
+            payload = self._build_response(
+                response_text,
+                intent="greeting",
+                severity="low",
+                emergency=False,
+                meta={"route": route},
+            )
+            self.cache.set(cache_key, payload)
+            session_manager.add_to_history(user_id, message, response_text)
+            return Triage(context, cache_key, payload)
+
+        if route == "symptom":
+            # A plain symptom report gets the curated knowledge-base advice;
+            # anything the knowledge base does not know goes to the LLM.
+            best_match = retrieval_service.match_symptom(message, lang, context.matches)
+            if best_match:
+                response_text = best_match.get("response", settings.fallback_response)
+                payload = self._build_response(
+                    response_text,
+                    intent="medical",
+                    severity="medium",
+                    emergency=False,
+                    meta={
+                        "route": route,
+                        "context_source": "knowledge_base",
+                        "emergency_score": context.emergency_score,
+                    },
+                )
+                self.cache.set(cache_key, payload)
+                session_manager.add_to_history(user_id, message, response_text)
+                return Triage(context, cache_key, payload)
+            context = replace(context, route="medical")
 
-        llm_answer = await llm_service.generate(prompt, lang)
-        if not llm_answer:
-            llm_answer = self._knowledge_base_fallback(message, lang)
+        return Triage(context, cache_key)
+
+    async def _answer_medical(
+        self,
+        cache_key: str,
+        message: str,
+        context: MessageContext,
+        turns: List[Dict[str, str]],
+        deadline: Deadline,
+        revalidating: bool = False,
+        trace: Optional[RequestTrace] = None,
+    ) -> Dict[str, Any]:
+        trace = trace or RequestTrace()
+        lang = context.language
+        with trace.span("retrieval"):
+            contexts, source = await retrieval_service.get_context(
+                message, lang, deadline, context.canonical_key
+            )
+        with trace.span("prompt_build"):
+            prompt = self._build_prompt(message, lang, contexts, turns)
+
+        with trace.span("llm_generate"):
+            # A refresh must not be fed the LLM cache's own stale answer.
+            llm_answer = await llm_service.generate(
+                prompt, lang, deadline, allow_stale=not revalidating
+            )
+        kb_fallback = not llm_answer
+        if kb_fallback:
+            with trace.span("kb_fallback"):
+                llm_answer = self._knowledge_base_fallback(message, lang, context.matches)
 
         meta = {
-            "route": route,
+            "route": context.route,
             "context_source": source,
             "context_used": bool(contexts),
-            "emergency_score": emergency_eval["score"],
+            "emergency_score": context.emergency_score,
         }
+        if kb_fallback:
+            meta["kb_fallback"] = True
 
         payload = self._build_response(
             llm_answer,
@@ -138,8 +443,11 @@ class AssistantOrchestrator:
             emergency=False,
             meta=meta,
         )
-        self.cache.set(cache_key, payload)
-        session_manager.add_to_history(user_id, message, llm_answer)
+        # A refresh keeps serving the stale LLM answer rather than replacing
+        # it with the generic knowledge-base text; misses that joined the
+        # refresh still get this payload.
+        if not (kb_fallback and revalidating):
+            self.cache.set(cache_key, payload)
         return payload
 
     def _build_prompt(
@@ -164,15 +472,10 @@ class AssistantOrchestrator:
             f"User message: {message}"
         )
 
-    def _knowledge_base_fallback(self, message: str, language: str) -> str:
-        symptoms = health_data.get_symptoms_for_language(language)
-        text = message.lower()
-        best_match = None
-        for name, data in symptoms.items():
-            if name.lower() in text or data.get("symptom", "").lower() in text:
-                best_match = data
-                break
-
+    def _knowledge_base_fallback(
+        self, message: str, language: str, matches: Optional[KeywordMatches] = None
+    ) -> str:
+        best_match = retrieval_service.match_symptom(message, language, matches)
         if best_match:
             return best_match.get("response", settings.fallback_response)
 
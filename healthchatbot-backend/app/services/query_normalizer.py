@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import unicodedata
+from typing import Dict, List, Tuple
+
+from app.services.health_data_loader import HealthDataLoader, health_data
+
+logger = logging.getLogger(__name__)
+
+# Filler words that never change the answer. Negations ("no", "not",
+# "नहीं", "ନାହିଁ") are deliberately absent: "no fever" must not share a key
+# with "fever".
+STOP_WORDS = frozenset(
+    [
+        # English
+        "i", "me", "my", "im", "am", "is", "are", "was", "be", "have", "has",
+        "had", "having", "a", "an", "the", "and", "or", "of", "to", "for",
+        "with", "in", "on", "from", "since", "what", "do", "does", "should",
+        "can", "please", "pls", "plz", "got", "getting", "feel", "feeling",
+        "some", "very", "help", "tell", "about",
+        # Hindi
+        "मुझे", "मेरा", "मेरी", "मेरे", "है", "हैं", "था", "थी", "हो", "रहा",
+        "रही", "रहे", "को", "के", "की", "का", "में", "से", "और", "भी", "क्या",
+        "कृपया",
+        # Odia
+        "ମୋର", "ମୋତେ", "ମୁଁ", "ଅଛି", "ଅଛନ୍ତି", "ହେଉଛି", "ହୋଇଛି", "ପାଇଁ",
+        "ଓ", "ଏବଂ", "କଣ", "କ'ଣ", "ଦୟାକରି",
+        # Romanized Hindi / Odia
+        "mujhe", "mujhko", "mera", "meri", "hai", "hain", "ho", "raha", "rahi",
+        "ko", "ka", "ki", "ke", "mein", "me", "aur", "bhi", "kya", "mora",
+        "mote", "mu", "achhi", "achi", "heuchi", "paain", "o",
+    ]
+)
+
+# Romanized spellings users type on Latin keyboards, mapped to the
+# ``symptom`` ids used in the symptoms_*.json files.
+ROMANIZED_SYMPTOMS: Dict[str, str] = {
+    "bukhar": "fever",
+    "bukhaar": "fever",
+    "bukhār": "fever",
+    "jwar": "fever",
+    "jwara": "fever",
+    "jvara": "fever",
+    "jwor": "fever",
+    "khansi": "cough",
+    "khaansi": "cough",
+    "khasi": "cough",
+    "kasa": "cough",
+    "kaasa": "cough",
+    "sirdard": "headache",
+    "sir dard": "headache",
+    "sar dard": "headache",
+    "mundabindha": "headache",
+    "munda bindha": "headache",
+    "pet dard": "stomach_pain",
+    "peta jantrana": "stomach_pain",
+    "chati jantrana": "chest_pain",
+    "seene mein dard": "chest_pain",
+    "chakkar": "dizziness",
+    "ulti": "vomiting",
+    "banti": "vomiting",
+    "dast": "diarrhea",
+    "jhada": "diarrhea",
+    "sardi": "cold",
+    "zukam": "cold",
+    "jukam": "cold",
+}
+
+MAX_PHRASE_TOKENS = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """NFC-normalise, casefold and split on anything that is not a letter,
+    combining mark or digit. Matras and viramas (category M) stay attached to
+    their consonants, and format characters (ZWJ/ZWNJ) are dropped rather
+    than treated as separators.
+    """
+    text = unicodedata.normalize("NFC", text).casefold()
+    chars = []
+    for ch in text:
+        category = unicodedata.category(ch)
+        if category[0] in ("L", "M", "N"):
+            chars.append(ch)
+        elif category != "Cf":
+            chars.append(" ")
+    return "".join(chars).split()
+
+
+class QueryNormalizer:
+    """Canonical cache keys: ``"Fever!!"``, ``"i have fever 🤒"`` and
+    ``"bukhar"`` all normalise to the symptom id ``fever``."""
+
+    def __init__(self, loader: HealthDataLoader):
+        self.loader = loader
+        self.synonyms: Dict[Tuple[str, ...], str] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the synonym table from the loaded symptom files."""
+        synonyms: Dict[Tuple[str, ...], str] = {}
+        for symptom_map in self.loader.symptoms_db.values():
+            for name, payload in (symptom_map or {}).items():
+                symptom_id = (payload or {}).get("symptom") or name
+                for surface in (name, symptom_id.replace("_", " ")):
+                    tokens = tuple(tokenize(surface))
+                    if tokens:
+                        synonyms[tokens] = symptom_id
+        for surface, symptom_id in ROMANIZED_SYMPTOMS.items():
+            synonyms[tuple(tokenize(surface))] = symptom_id
+        self.synonyms = synonyms
+
+    def canonical_tokens(self, message: str) -> List[str]:
+        tokens = tokenize(message)
+        canonical: List[str] = []
+        i = 0
+        while i < len(tokens):
+            # Longest phrase first so "chest pain" wins over "pain".
+            for size in range(min(MAX_PHRASE_TOKENS, len(tokens) - i), 0, -1):
+                symptom_id = self.synonyms.get(tuple(tokens[i : i + size]))
+                if symptom_id:
+                    canonical.append(symptom_id)
+                    i += size
+                    break
+            else:
+                if tokens[i] not in STOP_WORDS:
+                    canonical.append(tokens[i])
+                i += 1
+        return sorted(set(canonical))
+
+    def canonical_key(self, message: str) -> str:
+        tokens = self.canonical_tokens(message)
+        if tokens:
+            return " ".join(tokens)
+        # Only stop words / symbols: keep them apart rather than collapsing
+        # every such message onto one empty key.
+        return " ".join(tokenize(message)) or message.strip().lower()
+
+
+query_normalizer = QueryNormalizer(health_data)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.db.db import persist_chat_history
+from app.integrations import twilio_client
+from app.integrations.twilio_client import TwilioNotConfigured, send_whatsapp_message
+from app.services.message_context import MessageContext
+from app.services.pipeline import assistant_orchestrator
+
+logger = logging.getLogger(__name__)
+
+APOLOGY_TEXT = (
+    "Sorry, I'm having technical difficulties. "
+    "Please try again later or call 108 for emergencies."
+)
+
+
+@dataclass
+class ReplyJob:
+    user_phone: str
+    message: str
+
+
+class ReplyQueue:
+    """Ack-now, deliver-later processing of inbound WhatsApp messages.
+
+    Messages are sharded onto per-worker queues by a stable hash of the
+    sender, so one user's messages are always answered by the same worker in
+    arrival order while different users proceed in parallel. Queues are
+    bounded; ``enqueue`` returns False when a shard is full, and the webhook
+    then asks Twilio to redeliver rather than answering out of order.
+    """
+
+    def __init__(self, workers: int, maxsize: int, send_retries: int):
+        self.worker_count = max(1, workers)
+        self.maxsize = maxsize
+        self.send_retries = send_retries
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.rejected = 0
+        self.delivered = 0
+        self.send_retried = 0
+        self.send_failures = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        if twilio_client.client is None:
+            # Queued answers could never be delivered; keep answering inline.
+            logger.warning("⚠️ Twilio not configured; WhatsApp replies stay synchronous")
+            return
+        self._queues = [asyncio.Queue(maxsize=self.maxsize) for _ in range(self.worker_count)]
+        self._workers = [
+            asyncio.create_task(self._worker(queue), name=f"reply-worker-{idx}")
+            for idx, queue in enumerate(self._queues)
+        ]
+        logger.info(f"📬 Reply queue started with {self.worker_count} workers")
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Give queued replies a moment to go out, then stop the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), drain_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Reply queue stopped with {self.depth()} undelivered messages")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def enqueue(self, user_phone: str, message: str) -> bool:
+        if not self.running:
+            return False
+        shard = zlib.crc32(user_phone.encode("utf-8")) % self.worker_count
+        try:
+            self._queues[shard].put_nowait(ReplyJob(user_phone, message))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            job: ReplyJob = await queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"❌ Reply job for {job.user_phone} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _process(self, job: ReplyJob):
+        deadline = Deadline(settings.request_budget_seconds)
+        context = None
+        try:
+            context = MessageContext.build(job.message)
+            orchestrated = await assistant_orchestrator.handle_query(
+                message=job.message, user_id=job.user_phone, deadline=deadline, context=context
+            )
+            response_text = orchestrated["response"]
+        except Exception as e:
+            logger.error(f"❌ Orchestrator failed for queued message: {e}")
+            response_text = APOLOGY_TEXT
+
+        if await self._send(job.user_phone, response_text):
+            self.delivered += 1
+        # Detached with its own timeout: a slow Mongo must not hold up the
+        # rest of this shard.
+        persist_chat_history(job.user_phone, job.message, response_text, context=context)
+
+    async def _send(self, user_phone: str, text: str) -> bool:
+        for attempt in range(self.send_retries + 1):
+            if attempt:
+                self.send_retried += 1
+                await asyncio.sleep(2 ** (attempt - 1))
+            try:
+                await asyncio.to_thread(send_whatsapp_message, user_phone, text)
+                return True
+            except TwilioNotConfigured:
+                break
+            except Exception as e:
+                logger.warning(f"WhatsApp send to {user_phone} failed (attempt {attempt + 1}): {e}")
+        self.send_failures += 1
+        logger.error(f"❌ Could not deliver WhatsApp reply to {user_phone}")
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.worker_count,
+            "depth": self.depth(),
+            "shard_depths": [queue.qsize() for queue in self._queues],
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "delivered": self.delivered,
+            "send_retried": self.send_retried,
+            "send_failures": self.send_failures,
+        }
+
+
+reply_queue = ReplyQueue(
+    workers=settings.reply_workers,
+    maxsize=settings.reply_queue_maxsize,
+    send_retries=settings.reply_send_retries,
+)
@@ -0,0 +1,267 @@
+"""
+Bulk re-triage
+Re-scores historical chat messages under the deployed and a candidate
+emergency configuration, and reports which ones change verdict
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from app.db.db import connect_to_mongo, db, detect_language, get_database
+from app.services.emergency_service import SYMPTOM_WEIGHTS, EmergencyEngine, emergency_engine
+from app.services.keyword_matcher import KeywordMatcher, keyword_matcher
+
+logger = logging.getLogger(__name__)
+
+CHANGES = ("newly_flagged", "unflagged")
+
+
+@dataclass(frozen=True)
+class TriageConfig:
+    """Phrase weights and flagging threshold, as in ``EmergencyEngine``."""
+
+    weights: Mapping[str, int]
+    threshold: int
+
+    @classmethod
+    def from_engine(cls, engine: EmergencyEngine = emergency_engine) -> "TriageConfig":
+        return cls(dict(SYMPTOM_WEIGHTS), engine.threshold)
+
+    def with_overrides(
+        self, weights: Optional[Mapping[str, int]] = None, threshold: Optional[int] = None
+    ) -> "TriageConfig":
+        """Candidate config: ``weights`` add or replace phrases, a weight of 0
+        removes one."""
+        merged = {**self.weights, **(weights or {})}
+        return TriageConfig(
+            {phrase: weight for phrase, weight in merged.items() if weight},
+            self.threshold if threshold is None else threshold,
+        )
+
+
+class BatchScorer:
+    """Scores message batches under several configs at once.
+
+    Each message goes through the production scan (``keyword_matcher``,
+    as in ``MessageContext.build``), which yields both the
+    ``SYMPTOM_WEIGHTS`` phrases the emergency engine scores and the
+    TaskRouter emergency keywords. The phrases go into a ``(messages,
+    phrases)`` presence matrix; one matrix product with the ``(phrases,
+    configs)`` weights then gives every config's scores, each distinct
+    phrase counted once as in ``EmergencyEngine.score``. Only phrases a
+    candidate adds, which production does not know yet, need a second
+    scan.
+    """
+
+    def __init__(self, configs: Sequence[TriageConfig]):
+        phrases = sorted({phrase.lower() for config in configs for phrase in config.weights})
+        self.columns = {phrase: i for i, phrase in enumerate(phrases)}
+        self.weights = np.zeros((len(phrases), len(configs)), dtype=np.int32)
+        for j, config in enumerate(configs):
+            for phrase, weight in config.weights.items():
+                self.weights[self.columns[phrase.lower()], j] = weight
+        self.thresholds = np.array([config.threshold for config in configs], dtype=np.int32)
+        deployed = {phrase.lower() for phrase in SYMPTOM_WEIGHTS}
+        added = [phrase for phrase in phrases if phrase not in deployed]
+        self.added_matcher: Optional[KeywordMatcher] = None
+        if added:
+            self.added_matcher = KeywordMatcher()
+            self.added_matcher.register("added", [(p, "emergency_score", 0) for p in added])
+
+    def score(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """``(len(texts), configs)`` emergency scores and a per-text flag for
+        a TaskRouter emergency keyword hit."""
+        presence = np.zeros((len(texts), len(self.columns)), dtype=np.int32)
+        router_hits = np.zeros(len(texts), dtype=bool)
+        for row, text in enumerate(texts):
+            matches = keyword_matcher.scan(text)
+            router_hits[row] = matches.has("route:emergency")
+            phrases = matches.keywords("emergency_score")
+            if self.added_matcher:
+                phrases += self.added_matcher.scan(text).keywords("emergency_score")
+            for phrase in phrases:
+                column = self.columns.get(phrase)
+                if column is not None:
+                    presence[row, column] = 1
+        return presence @ self.weights, router_hits
+
+    def flags(self, scores: np.ndarray, router_hits: np.ndarray) -> np.ndarray:
+        """Escalation verdicts as in ``MessageContext.is_emergency``: the
+        engine score reaching the threshold, or a router emergency keyword."""
+        return (scores >= self.thresholds) | router_hits[:, None]
+
+
+@dataclass
+class GroupCounts:
+    scanned: int = 0
+    flagged_before: int = 0
+    flagged_after: int = 0
+    newly_flagged: int = 0
+    unflagged: int = 0
+
+
+class RetriageRun:
+    """One pass over chat history comparing ``baseline`` with ``candidate``.
+
+    Records are consumed in batches of ``batch_size``; only per-language
+    counters, at most ``max_samples`` changed messages per direction
+    (ids and scores, without the message text) and the current batch are
+    held in memory, so the footprint does not grow with the collection.
+    Every changed message, text included, can also be streamed to a local
+    ``changes_path`` as JSON lines.
+    """
+
+    def __init__(
+        self,
+        baseline: TriageConfig,
+        candidate: TriageConfig,
+        batch_size: int = 2000,
+        max_samples: int = 20,
+        changes_path: Optional[Path] = None,
+    ):
+        self.baseline = baseline
+        self.candidate = candidate
+        self.scorer = BatchScorer([baseline, candidate])
+        self.batch_size = max(1, batch_size)
+        self.max_samples = max_samples
+        self.changes_path = changes_path
+        self.groups: Dict[str, GroupCounts] = defaultdict(GroupCounts)
+        self.samples: Dict[str, List[Dict[str, Any]]] = {change: [] for change in CHANGES}
+        self.state = "pending"
+        self.total: Optional[int] = None
+        self.processed = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def run(self, records: AsyncIterator[Dict[str, Any]], total: Optional[int] = None):
+        self.state = "running"
+        self.total = total
+        self.started_at = time.time()
+        changes = open(self.changes_path, "w", encoding="utf-8") if self.changes_path else None
+        try:
+            batch: List[Dict[str, Any]] = []
+            async for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    await self._process(batch, changes)
+                    batch = []
+            if batch:
+                await self._process(batch, changes)
+            self.state = "done"
+            logger.info(f"🩺 Re-triage finished: {self.totals()}")
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"❌ Re-triage aborted after {self.processed} records: {e}")
+        finally:
+            if changes:
+                changes.close()
+            self.finished_at = time.time()
+
+    async def _process(self, batch: List[Dict[str, Any]], changes: Optional[TextIO]):
+        texts = [record.get("user_message") or "" for record in batch]
+        # Scanning is CPU-bound; keep the event loop free for API requests.
+        scores, router_hits = await asyncio.to_thread(self.scorer.score, texts)
+        flags = self.scorer.flags(scores, router_hits)
+
+        for record, text, (before, after), (was, now) in zip(batch, texts, scores, flags):
+            # chat_history stores the language name with every message.
+            language = record.get("language") or detect_language(text)
+            counts = self.groups[language]
+            counts.scanned += 1
+            counts.flagged_before += int(was)
+            counts.flagged_after += int(now)
+            if was == now:
+                continue
+            change = "newly_flagged" if now else "unflagged"
+            setattr(counts, change, getattr(counts, change) + 1)
+            entry = {
+                "id": str(record.get("_id", "")),
+                "change": change,
+                "language": language,
+                "score_before": int(before),
+                "score_after": int(after),
+                "message": text,
+            }
+            if len(self.samples[change]) < self.max_samples:
+                # Reports are served over the API: no raw health messages.
+                self.samples[change].append({k: v for k, v in entry.items() if k != "message"})
+            if changes:
+                changes.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.processed += len(batch)
+
+    def totals(self) -> Dict[str, int]:
+        totals = GroupCounts()
+        for counts in self.groups.values():
+            for name, value in vars(counts).items():
+                setattr(totals, name, getattr(totals, name) + value)
+        return vars(totals)
+
+    def progress(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        rate = self.processed / elapsed if elapsed else 0.0
+        remaining = (self.total - self.processed) if self.total else None
+        return {
+            "state": self.state,
+            "processed": self.processed,
+            "total": self.total,
+            "percent": round(100 * self.processed / self.total, 1) if self.total else None,
+            "records_per_second": round(rate, 1),
+            "eta_seconds": round(remaining / rate, 1) if remaining and rate else None,
+            "error": self.error,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "baseline": {"threshold": self.baseline.threshold, "weights": dict(self.baseline.weights)},
+            "candidate": {"threshold": self.candidate.threshold, "weights": dict(self.candidate.weights)},
+            "progress": self.progress(),
+            "totals": self.totals(),
+            "languages": [
+                {"language": language, **vars(counts)}
+                for language, counts in sorted(self.groups.items())
+            ],
+            "samples": self.samples,
+        }
+
+
+async def _chat_history():
+    if db.client is None:
+        await connect_to_mongo()
+    return (await get_database()).chat_history
+
+
+async def chat_records(
+    query: Optional[Dict[str, Any]] = None, batch_size: int = 2000, limit: int = 0
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream chat_history through a server-side cursor, ``batch_size``
+    documents per round trip."""
+    collection = await _chat_history()
+    cursor = collection.find(
+        query or {},
+        {"user_message": 1, "language": 1},
+        batch_size=batch_size,
+        limit=limit,
+    )
+    async for doc in cursor:
+        yield doc
+
+
+async def count_records(query: Optional[Dict[str, Any]] = None, limit: int = 0) -> int:
+    collection = await _chat_history()
+    # The metadata count is instant; an exact count would scan the collection.
+    if query:
+        total = await collection.count_documents(query)
+    else:
+        total = await collection.estimated_document_count()
+    return min(total, limit) if limit else total
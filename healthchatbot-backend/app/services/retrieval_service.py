@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
-import re
-from typing import Any, Dict, List, Tuple
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 try:
     import chromadb
@@ -13,21 +19,91 @@ except Exception:  # pragma: no cover - fallback when chromadb missing
     Settings = None
 
 from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.executor import BoundedExecutor, ExecutorSaturated
+from app.services.cache_service import make_cache
+from app.services.embeddings import VectorLRU, make_embedder
 from app.services.health_data_loader import HealthDataLoader, health_data
+from app.services.index_manifest import IndexManifest, ManifestDiff, content_hash
+from app.services.keyword_matcher import KeywordMatches, keyword_matcher
+from app.services.lexical_index import BM25Index, analyze, reciprocal_rank_fusion
+from app.services.query_normalizer import ROMANIZED_SYMPTOMS, query_normalizer
+from app.services.vector_index import VectorIndex
+from app.services.vectorizer import HashingVectorizer
 
 logger = logging.getLogger(__name__)
 
+# Pipeline language codes -> symptoms_db keys (unknown codes read English,
+# as in HealthDataLoader.get_symptoms_for_language).
+LANGUAGE_KEYS = {"hi": "hindi", "or": "odia", "en": "english"}
+# Symptom names and ids count this many times in a BM25 document.
+NAME_BOOST = 3
+# Source label while the embedding provider is failing; never cached.
+DEGRADED_SOURCE = "bm25_degraded"
+# Endings a query word may add to a symptom word ("coughing", "feverish");
+# anything else ("colder") is a different word. Indic inflections vary too
+# much to list, so any non-ASCII ending counts ("बुखारों").
+INFLECTIONS = ("s", "es", "ed", "ing", "ish", "y")
+# BM25 candidates checked for a full name match by ``match_symptom``.
+SYMPTOM_CANDIDATES = 3
+
+
+def _term_matches(name_term: str, query_term: str) -> bool:
+    if not query_term.startswith(name_term):
+        return False
+    ending = query_term[len(name_term) :]
+    return not ending or ending in INFLECTIONS or not ending.isascii()
+
+
+@dataclass
+class LexicalShard:
+    """One language's BM25 indexes; document numbers index ``ids``/``payloads``."""
+
+    index: BM25Index
+    symptom_index: BM25Index
+    ids: List[str]
+    payloads: List[Dict[str, Any]]
+    # Lowercased symptom name -> document number, for exact-name matches.
+    name_rows: Dict[str, int]
+    # Per document: the term lists (id, name, romanized spellings) one of
+    # which a query must contain in full to be answered with that entry.
+    surfaces: List[List[List[str]]]
+
 
 class RetrievalService:
-    """Lightweight retrieval with Chroma + safe fallbacks."""
+    """Lightweight retrieval with Chroma or an in-process index + safe fallbacks."""
 
     def __init__(self, loader: HealthDataLoader):
         self.loader = loader
         self.top_k = settings.chroma_top_k
-        self.embedding_cache: Dict[str, List[float]] = {}
+        # Final contexts per (KB content digest, language, canonical query).
+        self.cache = make_cache("retrieval")
+        # Index lookups block, so they run here rather than on the event loop.
+        self.executor = BoundedExecutor(
+            "retrieval", settings.retrieval_workers, settings.retrieval_queue_maxsize
+        )
+        self.indexed_version = loader.version
+        self.embedding_cache = VectorLRU(settings.embedding_memory_cache_mb * 1024 * 1024)
+        self.vectorizer = HashingVectorizer(settings.hashing_vector_dim)
+        self.embedder = make_embedder(self.vectorizer)
         self.client = None
         self.collection = None
-        self._bootstrap_chroma()
+        self.vector_index: Optional[VectorIndex] = None
+        self.lexical_shards: Dict[str, LexicalShard] = {}
+        # What the last index sync changed (None until one succeeds).
+        self.last_sync: Optional[ManifestDiff] = None
+        self.documents_by_id: Dict[str, str] = {}
+        # Shared re-index after a knowledge-base reload (see _ensure_fresh).
+        self._refreshing: Optional[asyncio.Future] = None
+        self._build_lexical_index()
+        self.kb_digest = self._knowledge_digest()
+        backend = settings.retrieval_backend
+        if backend in ("chroma", "auto"):
+            self._bootstrap_chroma()
+        if backend == "numpy" or (backend == "auto" and not self.collection):
+            self.sync_vector_index()
+        elif backend not in ("chroma", "auto", "none"):
+            logger.warning(f"Unknown RETRIEVAL_BACKEND '{backend}'; using BM25 only.")
 
     def _bootstrap_chroma(self):
         if not chromadb:
@@ -35,23 +111,23 @@ class RetrievalService:
             return
         try:
             os.environ.setdefault("CHROMA_TELEMETRY", "False")
-            self.client = chromadb.Client(
-                Settings(
-                    anonymized_telemetry=False,
-                    is_persistent=False,
-                    persist_directory=str(settings.chroma_persist_dir),
-                )
+            self.client = chromadb.PersistentClient(
+                path=str(settings.chroma_persist_dir),
+                settings=Settings(anonymized_telemetry=False),
             )
+            # Vectors are always supplied by us, so Chroma never embeds.
             self.collection = self.client.get_or_create_collection(
-                "health_knowledge", embedding_function=self._embed
+                "health_knowledge",
+                embedding_function=None,
+                metadata={"hnsw:space": "cosine"},
             )
-            self._load_documents()
+            self.sync_chroma()
         except Exception as e:
             logger.error(f"Chroma init failed, using fallback retrieval: {e}")
             self.client = None
             self.collection = None
 
-    def _load_documents(self):
+    def _documents(self) -> Tuple[List[str], List[str], List[Dict[str, str]]]:
         docs = []
         ids = []
         metadatas = []
@@ -60,46 +136,438 @@ class RetrievalService:
                 ids.append(f"{lang}-{name}")
                 docs.append(payload.get("response", ""))
                 metadatas.append({"lang": lang, "name": name})
-        if docs and self.collection:
+        return ids, docs, metadatas
+
+    def _build_lexical_index(self):
+        """Per-language BM25 shards over the symptom files: ``index`` (names,
+        ids and advice text) ranks retrieval context, ``symptom_index``
+        (names, ids and romanized spellings only) picks the single entry for
+        the knowledge-base fallback answer."""
+        romanized: Dict[str, List[str]] = {}
+        for surface, symptom_id in ROMANIZED_SYMPTOMS.items():
+            romanized.setdefault(symptom_id, []).append(surface)
+
+        shards: Dict[str, LexicalShard] = {}
+        documents_by_id: Dict[str, str] = {}
+        symptom_keywords = []
+        for lang, symptom_map in self.loader.symptoms_db.items():
+            full_docs, name_docs, ids, payloads, doc_surfaces = [], [], [], [], []
+            for name, payload in (symptom_map or {}).items():
+                symptom_id = payload.get("symptom") or name
+                surfaces = [name, symptom_id.replace("_", " "), *romanized.get(symptom_id, [])]
+                name_terms = [symptom_id] + [t for s in surfaces for t in analyze(s)]
+                body_terms = analyze(
+                    f"{payload.get('response', '')} {payload.get('cultural_advice', '')}"
+                )
+                name_docs.append(name_terms)
+                doc_surfaces.append([[symptom_id]] + [analyze(s) for s in surfaces])
+                full_docs.append(name_terms * NAME_BOOST + body_terms)
+                ids.append(f"{lang}-{name}")
+                payloads.append(payload)
+                documents_by_id[ids[-1]] = payload.get("response", "")
+                symptom_keywords.append((name, f"symptom:{lang}", 1))
+            if ids:
+                shards[lang] = LexicalShard(
+                    BM25Index.build(full_docs, [lang] * len(ids)),
+                    BM25Index.build(name_docs, [lang] * len(ids)),
+                    ids,
+                    payloads,
+                    {name.lower(): row for row, name in enumerate(symptom_map)},
+                    doc_surfaces,
+                )
+        keyword_matcher.register("symptoms", symptom_keywords)
+        self.lexical_shards = shards
+        self.documents_by_id = documents_by_id
+
+    def _knowledge_digest(self) -> str:
+        """Fingerprint of everything a cached context depends on: the
+        document manifest (text, metadata, embedder) plus the symptom
+        payloads BM25 also indexes. Unlike ``loader.version`` it is stable
+        across restarts, so persisted cache entries are only reused for the
+        same knowledge base."""
+        manifest = IndexManifest(self._content_hashes(*self._documents()))
+        payloads = json.dumps(
+            self.loader.symptoms_db, ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(f"{manifest.digest()}\0{payloads}".encode("utf-8")).hexdigest()[:16]
+
+    def _query_terms(self, query: str) -> List[str]:
+        # Canonical ids map romanized/synonym phrasings onto indexed ids.
+        return analyze(query) + query_normalizer.canonical_tokens(query)
+
+    def match_symptom(
+        self, query: str, language: str, matches: Optional[KeywordMatches] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Best symptom entry for ``query`` in its language, or ``None``:
+        the longest symptom name written out in the query, else the best
+        BM25 hit over names and romanized spellings. Either way every word
+        of the name (or a spelling of it) must be in the query, so a shared
+        generic word ("ear pain" vs "body pain") is not enough. ``matches``
+        reuses a scan of ``query`` the caller already ran."""
+        lang_key = LANGUAGE_KEYS.get(language, "english")
+        shard = self.lexical_shards.get(lang_key)
+        if not shard:
+            return None
+        terms = self._query_terms(query)
+        names = [
+            name
+            for name in (matches or keyword_matcher.scan(query)).keywords(f"symptom:{lang_key}")
+            if name in shard.name_rows and self._names_symptom(shard, shard.name_rows[name], terms)
+        ]
+        if names:
+            return shard.payloads[shard.name_rows[max(names, key=len)]]
+        for row, _ in shard.symptom_index.search(terms, SYMPTOM_CANDIDATES):
+            if self._names_symptom(shard, row, terms):
+                return shard.payloads[row]
+        return None
+
+    @staticmethod
+    def _names_symptom(shard: LexicalShard, row: int, terms: List[str]) -> bool:
+        return any(
+            surface
+            and all(any(_term_matches(word, term) for term in terms) for word in surface)
+            for surface in shard.surfaces[row]
+        )
+
+    def _lexical_ranking(self, terms: List[str], lang_key: str) -> List[str]:
+        shard = self.lexical_shards.get(lang_key)
+        if not shard:
+            return []
+        return [shard.ids[doc] for doc, _ in shard.index.search(terms, self.top_k * 2)]
+
+    def _dense_rankings(
+        self, vectors: np.ndarray, lang_key: Optional[str] = None
+    ) -> Tuple[List[List[str]], Optional[str]]:
+        """Vector hits for every row of ``vectors`` from one store call,
+        restricted to one language when ``lang_key`` is set."""
+        empty: List[List[str]] = [[] for _ in range(len(vectors))]
+        if self.collection:
             try:
-                self.collection.upsert(documents=docs, ids=ids, metadatas=metadatas)
+                res = self.collection.query(
+                    query_embeddings=vectors.tolist(),
+                    n_results=self.top_k * 2,
+                    where={"lang": lang_key} if lang_key else None,
+                )
+                return res.get("ids") or empty, "chroma"
+            except Exception as e:
+                logger.error(f"Chroma query failed: {e}")
+        elif self.vector_index:
+            try:
+                hits = self.vector_index.search(vectors, self.top_k * 2, lang=lang_key)
+                ids = self.vector_index.ids
+                return [[ids[row] for row, _ in row_hits] for row_hits in hits], "vector"
             except Exception as e:
-                logger.error(f"Failed to upsert docs into Chroma: {e}")
-                self.collection = None
-
-    def _text_to_vector(self, text: str) -> List[float]:
-        tokens = re.findall(r"\w+", text.lower())
-        vector = [0.0] * 16
-        for token in tokens:
-            vector[hash(token) % 16] += 1.0
-        return vector
-
-    def _embed(self, texts: List[str]) -> List[List[float]]:
-        embeddings: List[List[float]] = []
-        for text in texts:
-            if text not in self.embedding_cache:
-                self.embedding_cache[text] = self._text_to_vector(text)
-            embeddings.append(self.embedding_cache[text])
-        return embeddings
-
-    async def get_context(self, query: str, language: str) -> Tuple[List[str], str]:
+                logger.error(f"Vector index query failed: {e}")
+        return empty, None
+
+    def _dense_ranking(
+        self, query: str, lang_key: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Vector hits for one query."""
+        if not (self.collection or self.vector_index):
+            return [], None
+        rankings, source = self._dense_rankings(self._embed([query]), lang_key)
+        return rankings[0], source
+
+    def _rank(
+        self,
+        query: str,
+        terms: List[str],
+        lang_key: str,
+        dense: Optional[Tuple[List[str], Optional[str]]] = None,
+    ) -> Tuple[List[str], str]:
+        """Ranked document ids from one language shard, and their source;
+        ``dense`` passes in vector hits already computed for a batch."""
+        dense, source = dense if dense is not None else self._dense_ranking(query, lang_key)
+        lexical = self._lexical_ranking(terms, lang_key)
+        if dense and lexical and settings.retrieval_hybrid:
+            fused = reciprocal_rank_fusion([dense, lexical], settings.rrf_k)
+            return [doc_id for doc_id, _ in fused], "hybrid"
+        if dense:
+            return dense, source
+        return lexical, "bm25"
+
+    def _content_hashes(
+        self, ids: List[str], docs: List[str], metadatas: List[Dict[str, str]]
+    ) -> Dict[str, str]:
+        signature = self.embedder.signature
+        return {
+            doc_id: content_hash(doc, meta, signature)
+            for doc_id, doc, meta in zip(ids, docs, metadatas)
+        }
+
+    def sync_chroma(self) -> ManifestDiff:
+        """Bring the persistent collection in line with the knowledge base,
+        embedding only added or changed documents."""
+        ids, docs, metadatas = self._documents()
+        current = self._content_hashes(ids, docs, metadatas)
+        directory = settings.chroma_persist_dir
+        manifest = IndexManifest.load(directory)
+        if self.collection.count() != len(manifest.hashes):
+            # Store and manifest disagree (wiped directory, crash mid-write):
+            # drop unknown ids and re-embed everything.
+            logger.warning("Chroma collection does not match its manifest; re-indexing")
+            stale = [doc_id for doc_id in self.collection.get(include=[])["ids"] if doc_id not in current]
+            if stale:
+                self.collection.delete(ids=stale)
+            manifest = IndexManifest()
+
+        diff = manifest.diff(current)
+        if diff.deleted:
+            self.collection.delete(ids=diff.deleted)
+        pending = diff.added + diff.changed
+        if pending:
+            rows = {doc_id: i for i, doc_id in enumerate(ids)}
+            texts = [docs[rows[doc_id]] for doc_id in pending]
+            self.collection.upsert(
+                ids=pending,
+                documents=texts,
+                metadatas=[metadatas[rows[doc_id]] for doc_id in pending],
+                embeddings=self.embedder.embed(texts).tolist(),
+            )
+        manifest.hashes = current
+        manifest.save(directory)
+        self.last_sync = diff
+        logger.info(f"✅ Chroma index synced: {diff.summary()}")
+        return diff
+
+    def sync_vector_index(self) -> Optional[ManifestDiff]:
+        """Load the persisted in-process index, re-embedding only documents
+        whose content hash changed; unchanged rows are copied from the
+        memory-mapped matrix. Returns ``None`` when nothing can be indexed."""
+        ids, docs, metadatas = self._documents()
+        if not docs:
+            logger.warning("No knowledge documents to index; using fallback retrieval.")
+            return None
+        try:
+            current = self._content_hashes(ids, docs, metadatas)
+            index_dir = settings.vector_index_dir
+            manifest = IndexManifest.load(index_dir)
+            # The index records which manifest it was saved with; anything
+            # else (missing, torn write) counts as no previous index.
+            previous = VectorIndex.load(index_dir, manifest.digest())
+            if previous is None:
+                manifest = IndexManifest()
+            diff = manifest.diff(current)
+            if previous is not None and not diff.dirty:
+                self.vector_index = previous
+                self.last_sync = diff
+                logger.info(f"✅ Vector index memory-mapped from {index_dir}")
+                return diff
+
+            reuse = {}
+            if previous is not None:
+                previous_rows = {doc_id: row for row, doc_id in enumerate(previous.ids)}
+                reuse = {doc_id: previous_rows[doc_id] for doc_id in diff.unchanged}
+            pending = [i for i, doc_id in enumerate(ids) if doc_id not in reuse]
+            fresh = self.embedder.embed([docs[i] for i in pending]) if pending else None
+            dim = fresh.shape[1] if fresh is not None else previous.dim
+            vectors = np.empty((len(ids), dim), dtype=np.float32)
+            if pending:
+                vectors[pending] = fresh
+            for i, doc_id in enumerate(ids):
+                if doc_id in reuse:
+                    vectors[i] = previous.matrix[reuse[doc_id]]
+
+            self.vector_index = VectorIndex.build(
+                vectors, ids, docs, [meta["lang"] for meta in metadatas]
+            )
+            manifest.hashes = current
+            logger.info(f"✅ In-process vector index built: {diff.summary()}")
+            try:
+                self.vector_index.save(index_dir, manifest.digest())
+                manifest.save(index_dir)
+            except OSError as e:
+                logger.warning(f"Could not persist vector index to {index_dir}: {e}")
+            self.last_sync = diff
+            return diff
+        except Exception as e:
+            logger.error(f"Vector index build failed, using fallback retrieval: {e}")
+            self.vector_index = None
+            return None
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Query embeddings for ``texts``; texts not seen before go to the
+        provider in a single batch."""
+        rows, missing = self.embedding_cache.get_many(texts)
+        if missing:
+            fresh = dict(zip(missing, self.embedder.embed_queries(missing)))
+            for text, vector in fresh.items():
+                self.embedding_cache.put(text, vector)
+            rows = [fresh[text] if row is None else row for text, row in zip(texts, rows)]
+        return np.vstack(rows).astype(np.float32, copy=False)
+
+    async def get_context(
+        self,
+        query: str,
+        language: str,
+        deadline: Optional[Deadline] = None,
+        canonical_key: Optional[str] = None,
+    ) -> Tuple[List[str], str]:
         """Return relevant context and source label."""
-        if self.collection:
+        canonical_keys = [canonical_key] if canonical_key is not None else None
+        return (await self.get_context_many([query], [language], deadline, canonical_keys))[0]
+
+    async def get_context_many(
+        self,
+        queries: Sequence[str],
+        languages: Sequence[str],
+        deadline: Optional[Deadline] = None,
+        canonical_keys: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[List[str], str]]:
+        """``get_context`` for many queries at once, results in input order.
+
+        Cached queries are answered directly; the rest share one embedding
+        call and one similarity search per language on the retrieval pool.
+        Deadline and overload fallbacks apply to the whole batch.
+        ``canonical_keys`` skips re-normalising queries whose key the caller
+        already holds.
+        """
+        if len(queries) != len(languages):
+            raise ValueError("queries and languages must have the same length")
+        if canonical_keys is None:
+            canonical_keys = [query_normalizer.canonical_key(query) for query in queries]
+        elif len(canonical_keys) != len(queries):
+            raise ValueError("queries and canonical_keys must have the same length")
+        if deadline and deadline.expired:
+            return [([], "deadline") for _ in queries]
+        if self.loader.version != self.indexed_version:
+            await self._ensure_fresh(deadline)
+
+        results: List[Optional[Tuple[List[str], str]]] = [None] * len(queries)
+        # cache key -> (query, lang key, positions); repeats run once.
+        pending: Dict[str, Tuple[str, str, List[int]]] = {}
+        for i, (query, language, canonical) in enumerate(
+            zip(queries, languages, canonical_keys)
+        ):
+            cache_key = f"{self.kb_digest}:{language}:{canonical}"
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                contexts, source = cached
+                results[i] = (list(contexts), source)
+            elif cache_key in pending:
+                pending[cache_key][2].append(i)
+            else:
+                pending[cache_key] = (query, LANGUAGE_KEYS.get(language, "english"), [i])
+
+        if pending:
+            batch = list(pending.values())
             try:
-                res = self.collection.query(query_texts=[query], n_results=self.top_k)
-                contexts = res.get("documents", [[]])[0]
-                return contexts, "chroma"
+                retrieved = await self.executor.run(
+                    self._retrieve_many,
+                    [query for query, _, _ in batch],
+                    [lang_key for _, lang_key, _ in batch],
+                    deadline=deadline,
+                    reserve=settings.deadline_reserve_seconds,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("⏱️ Retrieval ran past the request deadline")
+                retrieved = [([], "deadline")] * len(batch)
+            except ExecutorSaturated:
+                logger.warning("🚦 Retrieval pool saturated, answering without context")
+                retrieved = [([], "overloaded")] * len(batch)
+            else:
+                for cache_key, (contexts, source) in zip(pending, retrieved):
+                    if not source.startswith(DEGRADED_SOURCE):
+                        self.cache.set(cache_key, [contexts, source])
+            for (_, _, positions), (contexts, source) in zip(batch, retrieved):
+                for i in positions:
+                    results[i] = (list(contexts), source)
+        return results
+
+    async def _ensure_fresh(self, deadline: Optional[Deadline] = None):
+        """Run ``refresh`` on the retrieval pool after a reload. Concurrent
+        queries share one rebuild; a query whose budget runs out first
+        carries on with the previous indexes."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self.executor.run(self.refresh))
+            self._refreshing.add_done_callback(self._refresh_done)
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._refreshing),
+                (deadline or Deadline(None)).cap(None, settings.deadline_reserve_seconds),
+            )
+        except asyncio.TimeoutError:
+            logger.warning("⏱️ Re-index still running; answering from the previous indexes")
+        except Exception:
+            pass  # logged once in _refresh_done
+
+    def _refresh_done(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Re-index failed, keeping the previous indexes: {future.exception()}")
+
+    def _retrieve_many(
+        self, queries: List[str], lang_keys: List[str]
+    ) -> List[Tuple[List[str], str]]:
+        """Blocking part of ``get_context_many`` (embedding, vector store,
+        BM25); runs on ``self.executor``. If the embedding provider fails
+        the batch is answered from BM25 alone."""
+        dense: List[Optional[Tuple[List[str], Optional[str]]]] = [None] * len(queries)
+        degraded = False
+        if queries and (self.collection or self.vector_index):
+            try:
+                vectors = self._embed(queries)
             except Exception as e:
-                logger.error(f"Chroma query failed: {e}")
+                logger.error(f"Embedding provider failed, retrieving with BM25 only: {e}")
+                degraded = True
+            else:
+                by_lang: Dict[str, List[int]] = defaultdict(list)
+                for i, lang_key in enumerate(lang_keys):
+                    by_lang[lang_key].append(i)
+                for lang_key, rows in by_lang.items():
+                    rankings, source = self._dense_rankings(vectors[rows], lang_key)
+                    for i, ranking in zip(rows, rankings):
+                        dense[i] = (ranking, source)
+        return [
+            self._retrieve(query, lang_key, dense[i], degraded)
+            for i, (query, lang_key) in enumerate(zip(queries, lang_keys))
+        ]
+
+    def _retrieve(
+        self,
+        query: str,
+        lang_key: str,
+        dense: Optional[Tuple[List[str], Optional[str]]] = None,
+        degraded: bool = False,
+    ) -> Tuple[List[str], str]:
+        """Contexts for one query, topped up from the fallback languages;
+        ``degraded`` skips vector search for every language."""
+        terms = self._query_terms(query)
+        no_dense = ([], None) if degraded else None
+        ranked, source = self._rank(query, terms, lang_key, no_dense or dense)
+        if degraded:
+            source = DEGRADED_SOURCE
+        if len(ranked) < settings.retrieval_min_hits:
+            # Too little in the user's language: top up from the configured
+            # fallback languages, after the same-language hits.
+            topped_up = False
+            for other in settings.retrieval_fallback_languages:
+                if other == lang_key or len(ranked) >= settings.retrieval_min_hits:
+                    continue
+                extra, _ = self._rank(query, terms, other, no_dense)
+                ranked += [doc_id for doc_id in extra if doc_id not in ranked]
+                topped_up = topped_up or bool(extra)
+            if topped_up:
+                source = f"{source}+cross_lingual"
+        contexts = [self.documents_by_id[doc_id] for doc_id in ranked if doc_id in self.documents_by_id]
+        return contexts[: self.top_k], source
 
-        # Fallback: pick top symptom responses by simple match
-        fallback = self.loader.get_symptoms_for_language(language) or {}
-        contexts = []
-        q = query.lower()
-        for symptom, data in fallback.items():
-            if symptom.lower() in q or data.get("symptom", "").lower() in q:
-                contexts.append(data.get("response", ""))
-        return contexts[: self.top_k], "fallback"
+    def refresh(self):
+        """Re-index after ``HealthDataLoader.reload_data``; cached results of
+        previous content stop matching because the digest is in the key.
+        Blocking: the query path runs it on ``self.executor``."""
+        version = self.loader.version
+        query_normalizer.refresh()
+        self._build_lexical_index()
+        if self.collection:
+            self.sync_chroma()
+        elif self.vector_index is not None:
+            self.sync_vector_index()
+        # Switch keys last, so nothing is cached under the new digest
+        # from half-rebuilt indexes.
+        self.kb_digest = self._knowledge_digest()
+        self.indexed_version = version
+        logger.info(f"🔄 Retrieval indexes rebuilt for knowledge base v{version}")
 
 
 retrieval_service = RetrievalService(health_data)
@@ -0,0 +1,199 @@
+"""
+Script detector
+Single-pass Unicode-block counts plus a character n-gram model for romanized text
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# (first code point, last code point, script), sorted by first code point.
+SCRIPT_BLOCKS: List[Tuple[int, int, str]] = [
+    (0x0041, 0x005A, "latin"),
+    (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x024F, "latin"),  # Latin-1 letters and Extended-A/B (ā, ī, ...)
+    (0x0900, 0x097F, "devanagari"),
+    (0x0B00, 0x0B7F, "odia"),
+    (0x1E00, 0x1EFF, "latin"),  # Latin Extended Additional (IAST dots)
+    (0xA8E0, 0xA8FF, "devanagari"),  # Devanagari Extended
+]
+_BLOCK_STARTS = [start for start, _, _ in SCRIPT_BLOCKS]
+SCRIPT_LANGUAGES = {"devanagari": "hi", "odia": "or", "latin": "en"}
+
+# ``str.translate`` table replacing every block code point by one tag
+# character per script, so counting letters is a single C-level pass.
+SCRIPT_TAGS = {"latin": "\x01", "devanagari": "\x02", "odia": "\x03"}
+_TAG_TABLE: Dict[int, str] = {ord(tag): "" for tag in SCRIPT_TAGS.values()}
+for _start, _end, _script in SCRIPT_BLOCKS:
+    _TAG_TABLE.update(dict.fromkeys(range(_start, _end + 1), SCRIPT_TAGS[_script]))
+# Letters left untagged belong to some other script.
+_OTHER_LETTER = re.compile(r"[^\W\d_]")
+_LATIN_WORD = re.compile(r"[a-z\u00c0-\u024f\u1e00-\u1eff]+")
+
+# Small romanization samples the n-gram model is trained on: common
+# function words and health vocabulary as users type them on WhatsApp.
+ROMANIZED_SAMPLES: Dict[str, str] = {
+    "en": (
+        "i have fever and cough since yesterday my head hurts what should i do "
+        "there is pain in my stomach and chest please help the child is not eating "
+        "where is the nearest hospital doctor clinic appointment medicine tablet "
+        "she feels weak and dizzy with vomiting loose motion cold body pain "
+        "how many days should it take is this serious can you tell me more about it"
+    ),
+    "hi": (
+        "mujhe bukhar hai aur khansi bhi hai kal se sir dard ho raha hai kya karu "
+        "mere pet mein dard hai seene mein dard hai madad kijiye bachcha khana nahi kha raha "
+        "sabse paas aspatal kahan hai daktar dawai goli chakkar aa raha hai ulti dast "
+        "bahut kamzori hai sardi zukam badan dard kitne din lagenge kya yeh gambhir hai "
+        "mera beta bimar hai usko tez bukhaar hai hum kya karein"
+    ),
+    "or": (
+        "mora jwara heuchi au kasa bi achhi kali thu munda bindha heuchi mu kana karibi "
+        "mo peta jantrana heuchi chati jantrana heuchi sahajya karantu pila khauni "
+        "paakhare daktarkhana kouthi achhi daktar oushadha banti jhada heuchi "
+        "bahut durbala lagu achhi thanda kete dina lagiba eha gambhira ki "
+        "mo puaa ku bahut jwara achhi ame kana kariba"
+    ),
+}
+NGRAM = 3
+# Latin text is English unless the romanized evidence is clearly stronger:
+# at least MIN_ROMANIZED_WORDS words and a posterior ROMANIZED_MARGIN above
+# English. A model trained on a few sentences cannot judge "hi" or "baby rash".
+ENGLISH_PRIOR = 2.0
+MIN_ROMANIZED_WORDS = 2
+ROMANIZED_MARGIN = 0.8
+MIN_SCRIPT_SHARE = 0.3
+MEMO_SIZE = 4096
+# The n-gram model only needs the first words of a long message.
+MAX_MODEL_WORDS = 12
+
+
+def script_of(char: str) -> Optional[str]:
+    """The SCRIPT_BLOCKS script of a letter or mark, else ``None``."""
+    code = ord(char)
+    i = bisect.bisect_right(_BLOCK_STARTS, code) - 1
+    if i >= 0 and code <= SCRIPT_BLOCKS[i][1]:
+        return SCRIPT_BLOCKS[i][2]
+    return None
+
+
+def _ngrams(word: str) -> List[str]:
+    padded = f" {word} "
+    return [padded[i : i + NGRAM] for i in range(len(padded) - NGRAM + 1)]
+
+
+class RomanizedModel:
+    """Add-one smoothed character trigram model per language over Latin
+    text, to tell English from romanized Hindi and Odia."""
+
+    def __init__(self, samples: Mapping[str, str]):
+        counts = {
+            lang: Counter(gram for word in text.split() for gram in _ngrams(word))
+            for lang, text in samples.items()
+        }
+        self.languages = list(counts)
+        vocabulary = set().union(*counts.values())
+        denominators = [sum(counts[lang].values()) + len(vocabulary) + 1 for lang in self.languages]
+        # One lookup per trigram yields its log-probability in every language.
+        self.log_probs: Dict[str, Tuple[float, ...]] = {
+            gram: tuple(
+                math.log((counts[lang][gram] + 1) / denominator)
+                for lang, denominator in zip(self.languages, denominators)
+            )
+            for gram in vocabulary
+        }
+        self.unseen = tuple(math.log(1 / denominator) for denominator in denominators)
+
+    def log_likelihoods(self, words: List[str]) -> Dict[str, float]:
+        """Mean log-probability per trigram of ``words`` under each language."""
+        rows = [self.log_probs.get(gram, self.unseen) for word in words for gram in _ngrams(word)]
+        if not rows:
+            return dict.fromkeys(self.languages, 0.0)
+        return {
+            lang: sum(column) / len(rows) for lang, column in zip(self.languages, zip(*rows))
+        }
+
+    def classify(self, words: List[str]) -> Tuple[str, float]:
+        """Best language and its posterior probability; English with its
+        own posterior unless a romanized language wins clearly."""
+        scores = self.log_likelihoods(words)
+        if not words:
+            return "en", 0.0
+        # Posterior over per-trigram likelihoods scaled to the text length,
+        # with English favoured by ``ENGLISH_PRIOR`` nats.
+        n = sum(len(word) for word in words)
+        logits = {lang: score * n for lang, score in scores.items()}
+        logits["en"] = logits.get("en", 0.0) + ENGLISH_PRIOR
+        peak = max(logits.values())
+        weights = {lang: math.exp(logit - peak) for lang, logit in logits.items()}
+        total = sum(weights.values())
+        best = max(weights, key=weights.get)
+        english = weights.get("en", 0.0) / total
+        if best != "en" and (
+            len(words) < MIN_ROMANIZED_WORDS or weights[best] / total - english < ROMANIZED_MARGIN
+        ):
+            return "en", english
+        return best, weights[best] / total
+
+
+romanized_model = RomanizedModel(ROMANIZED_SAMPLES)
+
+
+@dataclass(frozen=True)
+class ScriptDetection:
+    language: str
+    confidence: float
+    # Share of letters per script ("devanagari", "odia", "latin", "other").
+    proportions: Mapping[str, float]
+    # Dominant script, or None when the text has no letters.
+    script: Optional[str]
+    romanized: bool = False
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def detect_script(text: str) -> ScriptDetection:
+    """Language of ``text`` from the share of its letters in each script.
+
+    Code points are counted by Unicode block in one ``translate`` pass.
+    Native-script letters decide directly, with the confidence equal to
+    that script's share of all letters, so code-mixed text scores lower; a
+    native script wins with at least ``MIN_SCRIPT_SHARE`` of the letters
+    ("मुझे fever है" is Hindi). Latin text goes to the n-gram model, which
+    separates English from romanized Hindi/Odia. Results are memoized per
+    text.
+    """
+    tagged = text.translate(_TAG_TABLE)
+    counts = {script: tagged.count(tag) for script, tag in SCRIPT_TAGS.items()}
+    # Block letters are now ASCII tags, so non-ASCII means another script.
+    counts["other"] = 0 if tagged.isascii() else len(_OTHER_LETTER.findall(tagged))
+    counts = {script: count for script, count in counts.items() if count}
+
+    letters = sum(counts.values())
+    if not letters:
+        return ScriptDetection("en", 0.0, MappingProxyType({}), None)
+    proportions = MappingProxyType(
+        {script: count / letters for script, count in counts.items()}
+    )
+
+    native = max(("devanagari", "odia"), key=lambda s: proportions.get(s, 0.0))
+    if proportions.get(native, 0.0) >= MIN_SCRIPT_SHARE:
+        return ScriptDetection(
+            SCRIPT_LANGUAGES[native], round(proportions[native], 3), proportions, native
+        )
+    if proportions.get("latin", 0.0) >= MIN_SCRIPT_SHARE:
+        words = _LATIN_WORD.findall(text.lower())[:MAX_MODEL_WORDS]
+        lang, posterior = romanized_model.classify(words)
+        return ScriptDetection(
+            lang,
+            round(proportions["latin"] * posterior, 3),
+            proportions,
+            "latin",
+            romanized=lang != "en",
+        )
+    return ScriptDetection("en", 0.0, proportions, "other")
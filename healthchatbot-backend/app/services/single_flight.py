@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_registry: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key onto one in-flight task.
+
+    The first caller for a key (the leader) starts the work as its own task;
+    everyone arriving before it finishes awaits that same task. Callers wait
+    through ``asyncio.shield`` so a caller timing out or disconnecting never
+    cancels the shared work, and an exception raised by the work is re-raised
+    to every waiter. The work is cancelled only when its last waiter is.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        # Refreshes not started because the key was already in flight
+        self.refreshes_skipped = 0
+        self.failures = 0
+        if name:
+            _registry[name] = self
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, fn)
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            if timeout is None:
+                return await asyncio.shield(task)
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.CancelledError:
+            # The caller went away (e.g. client disconnect). Once nobody is
+            # left waiting, stop the work; a mere timeout keeps it running so
+            # the result still lands in the cache.
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def refresh(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """Start ``fn`` in the background unless ``key`` is already in flight.
+
+        Used for stale-while-revalidate: the caller does not await the task,
+        but ``do`` calls for the same key join it and get its result;
+        failures are counted and logged. Returns whether a new refresh was
+        started.
+        """
+        if key in self._inflight:
+            self.refreshes_skipped += 1
+            return False
+        self._start(key, fn)
+        self.refreshes += 1
+        return True
+
+    def _start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return task
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so an abandoned failure is not logged as
+        # "never retrieved" when every waiter has already timed out.
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            logger.warning(f"In-flight call for '{key}' failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refreshes_skipped": self.refreshes_skipped,
+            "failures": self.failures,
+        }
+
+
+def flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every named single-flight group."""
+    return {name: group.stats() for name, group in _registry.items()}
@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+import logging
 import re
-from typing import Literal
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence
 
-Route = Literal["emergency", "medical", "scheme", "hospital"]
+from app.core.config import settings
+from app.core.tracing import LatencyRecorder
+from app.services.intent_classifier import IntentClassifier
+from app.services.keyword_matcher import KeywordMatches, keyword_matcher, keyword_table
+
+logger = logging.getLogger(__name__)
+
+Route = Literal["emergency", "medical", "scheme", "hospital", "greeting", "symptom"]
+
+# Checked in this order; the first route with a keyword hit wins.
+ROUTE_PRIORITY = ("route:emergency", "route:scheme", "route:hospital")
+# Classifier labels answered without the LLM. Emergencies stay keyword and
+# score based: the model can only move a query off the medical default.
+TEMPLATE_ROUTES = frozenset({"scheme", "hospital", "greeting", "symptom"})
 
 
 class TaskRouter:
-    """Lightweight rule-based router for incoming queries."""
+    """Lightweight rule-based router for incoming queries, with an optional
+    trained classifier for queries no keyword catches."""
 
-    def __init__(self):
+    def __init__(self, classifier: Optional[IntentClassifier] = None):
+        self.classifier = classifier
+        # How each query was routed: "keyword", "classifier" or "default".
+        self.decisions: Counter = Counter()
+        self.classifier_latency = LatencyRecorder()
         self.emergency_keywords = [
             "heart attack",
             "stroke",
@@ -41,17 +63,68 @@ class TaskRouter:
             "appointment",
             "location",
         ]
+        keyword_matcher.register(
+            "route",
+            keyword_table(
+                {
+                    "route:emergency": self.emergency_keywords,
+                    "route:scheme": self.scheme_keywords,
+                    "route:hospital": self.hospital_keywords,
+                }
+            ),
+        )
+
+    def load_classifier(self, path: Path) -> bool:
+        """Load the trained model at ``path``; keyword routing only when absent."""
+        self.classifier = IntentClassifier.load(path)
+        if self.classifier:
+            logger.info(f"✅ Intent classifier loaded from {path} ({', '.join(self.classifier.labels)})")
+        return self.classifier is not None
+
+    def route(self, text: str, matches: Optional[KeywordMatches] = None) -> Route:
+        """Pass ``matches`` when the message was already scanned."""
+        return self.route_many([text], [matches])[0]
+
+    def route_many(
+        self,
+        texts: Sequence[str],
+        matches: Optional[Sequence[Optional[KeywordMatches]]] = None,
+    ) -> List[Route]:
+        """Keyword routes, then one classifier batch over the queries that
+        would otherwise default to ``medical``."""
+        matches = matches or [None] * len(texts)
+        routes: List[Route] = []
+        pending: List[int] = []
+        for i, (text, scanned) in enumerate(zip(texts, matches)):
+            hit = (scanned or keyword_matcher.scan(text)).first(ROUTE_PRIORITY)
+            if hit:
+                self.decisions["keyword"] += 1
+                routes.append(hit.split(":", 1)[1])
+            else:
+                routes.append("medical")
+                pending.append(i)
 
-    def route(self, text: str) -> Route:
-        t = text.lower()
+        if pending and self.classifier:
+            start = time.perf_counter()
+            predictions = self.classifier.classify_many([texts[i] for i in pending])
+            self.classifier_latency.record((time.perf_counter() - start) * 1000)
+            for i, (label, confidence) in zip(pending, predictions):
+                if label in TEMPLATE_ROUTES and confidence >= settings.intent_min_confidence:
+                    routes[i] = label
+                    self.decisions["classifier"] += 1
+                else:
+                    self.decisions["default"] += 1
+        else:
+            self.decisions["default"] += len(pending)
+        return routes
 
-        if any(word in t for word in self.emergency_keywords):
-            return "emergency"
-        if any(word in t for word in self.scheme_keywords):
-            return "scheme"
-        if any(word in t for word in self.hospital_keywords):
-            return "hospital"
-        return "medical"
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "classifier_loaded": self.classifier is not None,
+            "decisions": dict(self.decisions),
+            "classifier_latency": self.classifier_latency.stats(),
+        }
 
 
 task_router = TaskRouter()
+task_router.load_classifier(settings.intent_model_path)
@@ -0,0 +1,201 @@
+"""
+In-process vector index
+Cosine top-k over a contiguous float32 matrix, with rows grouped by language
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Hit = Tuple[int, float]
+
+MATRIX_FILE = "vectors.npy"
+META_FILE = "index.json"
+# Names the live subdirectory of VERSIONS_DIR; replaced atomically on save.
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Row-normalize in float32; all-zero rows stay zero."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _current_version(directory: Path) -> Optional[str]:
+    try:
+        return (directory / POINTER_FILE).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class VectorIndex:
+    """Brute-force cosine index that beats a vector DB at knowledge-base scale.
+
+    Rows are L2-normalized, so cosine similarity is a single matrix product.
+    Documents are stored sorted by language; ``lang_ranges`` maps each
+    language to its ``[start, end)`` row slice, so a filtered search only
+    touches that contiguous block.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        lang_ranges: Dict[str, Tuple[int, int]],
+    ):
+        self.matrix = matrix
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.lang_ranges = dict(lang_ranges)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        langs: Sequence[str],
+    ) -> "VectorIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not (len(vectors) == len(ids) == len(documents) == len(langs)):
+            raise ValueError("vectors, ids, documents and langs must align")
+        # Stable sort keeps the original order within each language.
+        order = sorted(range(len(langs)), key=lambda i: langs[i])
+        lang_ranges: Dict[str, Tuple[int, int]] = {}
+        for row, i in enumerate(order):
+            start, _ = lang_ranges.get(langs[i], (row, row))
+            lang_ranges[langs[i]] = (start, row + 1)
+        matrix = np.ascontiguousarray(l2_normalize(vectors[order]))
+        return cls(
+            matrix,
+            [ids[i] for i in order],
+            [documents[i] for i in order],
+            lang_ranges,
+        )
+
+    def save(self, directory: Path, fingerprint: str):
+        """Write the matrix as ``.npy`` plus a JSON sidecar.
+
+        Both go into a fresh directory under ``versions/``; one atomic
+        replace of the ``CURRENT`` pointer then publishes them together, so
+        a reader never pairs a new matrix with old metadata. Versions of
+        other fingerprints are removed, except the one just superseded.
+        """
+        directory = Path(directory)
+        name = f"{fingerprint[:16]}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        version_dir = directory / VERSIONS_DIR / name
+        version_dir.mkdir(parents=True)
+        with open(version_dir / MATRIX_FILE, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        (version_dir / META_FILE).write_text(
+            json.dumps(
+                {
+                    "fingerprint": fingerprint,
+                    "shape": list(self.matrix.shape),
+                    "ids": self.ids,
+                    "documents": self.documents,
+                    "lang_ranges": self.lang_ranges,
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+        previous = _current_version(directory)
+        pointer_tmp = directory / f"{POINTER_FILE}.{os.getpid()}.tmp"
+        pointer_tmp.write_text(name, encoding="utf-8")
+        os.replace(pointer_tmp, directory / POINTER_FILE)
+        # Same-fingerprint versions may still be mid-write by another worker.
+        for stale in (directory / VERSIONS_DIR).iterdir():
+            if stale.name != previous and not stale.name.startswith(fingerprint[:16]):
+                shutil.rmtree(stale, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path, fingerprint: str) -> Optional["VectorIndex"]:
+        """Memory-map a saved index; ``None`` when missing or built from
+        different documents/vectorizer settings."""
+        directory = Path(directory)
+        try:
+            name = _current_version(directory)
+            if name is None:
+                return None
+            version_dir = directory / VERSIONS_DIR / name
+            meta = json.loads((version_dir / META_FILE).read_text(encoding="utf-8"))
+            if meta.get("fingerprint") != fingerprint:
+                return None
+            # Read-only mapping: pages come from the OS page cache and are
+            # shared by every worker that maps the same file.
+            matrix = np.load(version_dir / MATRIX_FILE, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.info(f"No usable vector index in {directory}: {e}")
+            return None
+        if list(matrix.shape) != meta["shape"] or matrix.dtype != np.float32:
+            return None
+        return cls(
+            matrix,
+            meta["ids"],
+            meta["documents"],
+            {lang: tuple(bounds) for lang, bounds in meta["lang_ranges"].items()},
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        lang: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[List[Hit]]:
+        """Top-``k`` ``(row, cosine)`` hits for each query row, best first.
+
+        ``queries`` is ``(n, dim)`` (or a single ``(dim,)`` vector); all of
+        them are scored with one matrix product. Hits at or below
+        ``min_score`` are dropped. With ``lang``, only that language's rows
+        are scanned; an unknown language yields no hits.
+        """
+        queries = l2_normalize(np.atleast_2d(queries))
+        if lang is None:
+            start, end = 0, len(self.ids)
+        else:
+            start, end = self.lang_ranges.get(lang, (0, 0))
+        if end <= start or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        block = self.matrix[start:end]
+        scores = queries @ block.T  # (n_queries, n_rows)
+        k = min(k, end - start)
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), (len(queries), k))
+
+        results: List[List[Hit]] = []
+        for row_scores, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row_scores[candidates], kind="stable")]
+            results.append(
+                [
+                    (start + int(col), float(row_scores[col]))
+                    for col in ranked
+                    if row_scores[col] > min_score
+                ]
+            )
+        return results
@@ -0,0 +1,92 @@
+"""
+Hashing vectorizer
+Deterministic text embeddings from hashed words and akshara n-grams
+"""
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+from typing import List, Sequence
+
+import numpy as np
+
+from app.services.query_normalizer import tokenize
+
+# Virama / halant: the following consonant belongs to the same conjunct.
+VIRAMAS = frozenset("्୍")
+CHAR_NGRAMS = (2, 3)
+
+
+def aksharas(token: str) -> List[str]:
+    """Split a token into orthographic syllables.
+
+    A cluster is a base character plus its combining marks (matras,
+    anusvara, nukta); a virama glues the next consonant on as well, so
+    "क्या" stays one unit instead of being cut between "क्" and "या".
+    Latin text degenerates to one character per cluster.
+    """
+    clusters: List[str] = []
+    for char in token:
+        joins = clusters and (
+            unicodedata.category(char).startswith("M") or clusters[-1][-1] in VIRAMAS
+        )
+        if joins:
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return clusters
+
+
+def stable_hash(feature: str) -> int:
+    """64-bit hash that is identical across processes (unlike ``hash``)."""
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class HashingVectorizer:
+    """Stateless feature-hashing embedder.
+
+    Features are whole tokens plus 2- and 3-grams of aksharas over each
+    token padded with boundary markers, so inflected Hindi/Odia forms still
+    share most features. Each feature adds ±1 to one of ``dim`` buckets
+    (the sign is a second hash bit, which keeps collisions unbiased), and
+    rows are L2-normalized.
+    """
+
+    version = "hashing-v1"
+
+    def __init__(self, dim: int = 256):
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+
+    @property
+    def signature(self) -> str:
+        """Identifies vectors this vectorizer produces; part of index fingerprints."""
+        return f"{self.version}:dim={self.dim}:ngrams={CHAR_NGRAMS[0]}-{CHAR_NGRAMS[-1]}"
+
+    def features(self, text: str) -> List[str]:
+        features = []
+        for token in tokenize(text):
+            features.append(f"w:{token}")
+            units = ["<", *aksharas(token), ">"]
+            for n in CHAR_NGRAMS:
+                for i in range(len(units) - n + 1):
+                    features.append("c:" + "".join(units[i : i + n]))
+        return features
+
+    def transform_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.features(text):
+            h = stable_hash(feature)
+            vector[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), dim)`` float32 matrix of L2-normalized rows."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.transform_one(text)
+        return matrix
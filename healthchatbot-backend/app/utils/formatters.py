@@ -7,6 +7,20 @@
 import re
 from typing import Dict, Any
 
+from app.services.keyword_matcher import keyword_matcher, keyword_table
+
+# Emoji prefix for WhatsApp replies; the first emoji with a keyword hit wins
+WHATSAPP_EMOJI_KEYWORDS = {
+    "🚨": ["emergency", "urgent", "जरूरी", "ଜରୁରୀ"],
+    "🤒": ["fever", "बुखार", "ଜ୍ୱର"],
+    "🤧": ["cold", "cough", "सर्दी", "खांसी", "ଶୀତ", "କାଶ"],
+    "🏥": ["welcome", "स्वागत", "ସ୍ୱାଗତ"],
+}
+keyword_matcher.register(
+    "whatsapp_emoji",
+    keyword_table({f"emoji:{emoji}": words for emoji, words in WHATSAPP_EMOJI_KEYWORDS.items()}),
+)
+
 def format_response_for_interface(response_text: str, interface: str, language: str) -> str:
     """
     Format responses appropriately for WhatsApp vs SMS vs Voice interfaces
@@ -25,14 +39,9 @@ def format_for_whatsapp(text: str, language: str) -> str:
     Format for WhatsApp - supports emojis, bold text, bullets
     """
     # Add health emoji based on content
-    if any(keyword in text.lower() for keyword in ["emergency", "urgent", "जरूरी", "ଜରୁରୀ"]):
-        text = "🚨 " + text
-    elif any(keyword in text.lower() for keyword in ["fever", "बुखार", "ଜ୍ୱର"]):
-        text = "🤒 " + text
-    elif any(keyword in text.lower() for keyword in ["cold", "cough", "सर्दी", "खांसी", "ଶୀତ", "କାଶ"]):
-        text = "🤧 " + text
-    elif any(keyword in text.lower() for keyword in ["welcome", "स्वागत", "ସ୍ୱାଗତ"]):
-        text = "🏥 " + text
+    hit = keyword_matcher.scan(text).first(f"emoji:{emoji}" for emoji in WHATSAPP_EMOJI_KEYWORDS)
+    if hit:
+        text = hit.split(":", 1)[1] + " " + text
     
     return text
 
@@ -0,0 +1,86 @@
+"""
+Cache backend and serialization benchmark.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_cache --items 20000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.cache_service import (
+    SERIALIZERS,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    TTLCache,
+)
+
+# Shape of a typical orchestrator payload
+SAMPLE_PAYLOAD = {
+    "response": "बुखार के दौरान अधिक तरल पदार्थ लें और आराम करें। " * 4,
+    "intent": "medical",
+    "severity": "medium",
+    "emergency": False,
+    "meta": {"route": "medical", "context_source": "chroma", "context_used": True},
+    "cached": False,
+}
+
+
+def _timed(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_serializers(rounds: int):
+    print(f"\nSerialization ({rounds} round trips, µs/op)")
+    for name, (dumps, loads) in SERIALIZERS.items():
+        raw = dumps(SAMPLE_PAYLOAD)
+        enc = _timed(lambda: [dumps(SAMPLE_PAYLOAD) for _ in range(rounds)], rounds)
+        dec = _timed(lambda: [loads(raw) for _ in range(rounds)], rounds)
+        print(f"  {name:<8} encode={enc:7.2f}  decode={dec:7.2f}  size={len(raw)}B")
+
+
+def bench_backend(label: str, cache: TTLCache, items: int):
+    keys = [f"hi:query {i}" for i in range(items)]
+    set_us = _timed(lambda: [cache.set(k, SAMPLE_PAYLOAD) for k in keys], items)
+    get_us = _timed(lambda: [cache.get(k) for k in keys], items)
+    print(f"  {label:<16} set={set_us:8.2f}  get={get_us:8.2f}  size={len(cache)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    bench_serializers(args.rounds)
+
+    print(f"\nBackends ({args.items} keys, µs/op)")
+    bench_backend(
+        "memory",
+        TTLCache(max_items=args.items, backend=MemoryCacheBackend(args.items, "lru")),
+        args.items,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for serializer in SERIALIZERS:
+            for policy in ("ttl", "lru"):
+                backend = SQLiteCacheBackend(
+                    Path(tmp) / f"{serializer}-{policy}.sqlite3",
+                    namespace="bench",
+                    max_items=args.items,
+                    policy=policy,
+                    serializer=serializer,
+                )
+                bench_backend(
+                    f"sqlite/{serializer}/{policy}",
+                    TTLCache(max_items=args.items, policy=policy, backend=backend),
+                    args.items,
+                )
+
+
+if __name__ == "__main__":
+    main()
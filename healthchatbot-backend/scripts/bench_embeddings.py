@@ -0,0 +1,134 @@
+"""
+Embedding cost benchmark: embedding the knowledge base at startup, and
+embedding one query.
+
+Each provider is measured cold (empty on-disk cache) and warm (every text
+already cached). "remote" stands in for the Azure API with a fixed
+per-request latency, so the effect of batching shows up without
+credentials; pass --azure to hit the configured deployment instead.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_embeddings --latency-ms 120 --batch-size 64
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embeddings import (
+    AzureEmbeddingProvider,
+    CachedEmbeddingProvider,
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    make_embedder,
+)
+from app.services.health_data_loader import health_data
+from app.services.vectorizer import HashingVectorizer
+
+QUERIES = ["I have fever since yesterday", "मुझे सिरदर्द है", "ମୋତେ କାଶ ହେଉଛି", "stomach pain"]
+
+
+class SimulatedRemote(EmbeddingProvider):
+    """Sleeps ``latency`` per request, like a network round trip."""
+
+    signature = "simulated-remote"
+
+    def __init__(self, latency: float, dim: int):
+        self.latency = latency
+        self.vectorizer = HashingVectorizer(dim)
+
+    def embed(self, texts):
+        time.sleep(self.latency)
+        return self.vectorizer.transform(list(texts))
+
+
+class Batched(EmbeddingProvider):
+    """Splits calls into ``batch_size`` requests, as AzureEmbeddingProvider does."""
+
+    def __init__(self, inner: EmbeddingProvider, batch_size: int):
+        self.inner = inner
+        self.batch_size = batch_size
+        self.signature = inner.signature
+
+    def embed(self, texts):
+        parts = [
+            self.inner.embed(texts[i : i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return np.vstack(parts)
+
+
+def knowledge_texts() -> List[str]:
+    return [
+        payload.get("response", "")
+        for symptom_map in health_data.symptoms_db.values()
+        for payload in symptom_map.values()
+    ]
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def report(label: str, make: Callable[[str], EmbeddingProvider], docs: List[str]):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = make(cache_dir)
+        startup_cold = timed(lambda: cold.embed(docs))
+        startup_warm = timed(lambda: make(cache_dir).embed(docs))
+        query_cold = np.mean([timed(lambda q=q: cold.embed([q])) for q in QUERIES])
+        query_warm = np.mean([timed(lambda q=q: cold.embed([q])) for q in QUERIES])
+    print(
+        f"  {label:<28} startup cold {startup_cold:9.1f}ms  warm {startup_warm:7.1f}ms"
+        f"   query cold {query_cold:7.2f}ms  warm {query_warm:6.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=120.0)
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size)
+    parser.add_argument("--copies", type=int, default=20, help="knowledge base multiplier")
+    parser.add_argument("--azure", action="store_true", help="use the configured Azure deployment")
+    args = parser.parse_args()
+
+    base = knowledge_texts()
+    docs = [f"{text} ({copy})" for copy in range(args.copies) for text in base]
+    print(f"{len(docs)} documents, {len(QUERIES)} queries")
+
+    vectorizer = HashingVectorizer(settings.hashing_vector_dim)
+    report("hashing (no disk cache)", lambda _: HashingEmbeddingProvider(vectorizer), docs)
+    report(
+        "hashing + disk cache",
+        lambda d: CachedEmbeddingProvider(HashingEmbeddingProvider(vectorizer), d),
+        docs,
+    )
+    remote = SimulatedRemote(args.latency_ms / 1000, settings.hashing_vector_dim)
+    for batch_size in (1, args.batch_size):
+        report(
+            f"remote batch={batch_size} + cache",
+            lambda d, b=batch_size: CachedEmbeddingProvider(Batched(remote, b), d),
+            docs,
+        )
+
+    if args.azure:
+        provider = make_embedder(vectorizer)
+        if not isinstance(provider, CachedEmbeddingProvider) or not isinstance(
+            provider.inner, AzureEmbeddingProvider
+        ):
+            parser.error("Azure embeddings are not configured")
+        report(
+            f"azure:{settings.azure_embedding_deployment}",
+            lambda d: CachedEmbeddingProvider(provider.inner, d),
+            docs,
+        )
+
+
+if __name__ == "__main__":
+    main()
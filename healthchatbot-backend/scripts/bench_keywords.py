@@ -0,0 +1,104 @@
+"""
+Keyword scanning benchmark: the shared Aho-Corasick matcher against the
+per-table ``any(word in text ...)`` loops it replaced.
+
+The real tables (routing, emergency weights and types, chat intents,
+WhatsApp emoji, symptom names) are padded with synthetic keywords to each
+requested size. The loop baseline lowercases and scans each table
+separately, as the router, emergency engine, intent chain and formatter
+did; the matcher scans each message once for all of them.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_keywords --sizes 100 1000 5000 --rounds 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+from typing import Dict, List
+
+from app.services.keyword_matcher import KeywordMatcher, keyword_matcher
+
+MESSAGES = [
+    "I have fever and a bad cough since two days",
+    "मुझे सीने में दर्द है और सांस लेने में तकलीफ",
+    "ମୋତେ ଜ୍ୱର ହେଉଛି ଏବଂ ମୁଣ୍ଡବିନ୍ଧା",
+    "where is the nearest hospital for an appointment",
+    "is ayushman card coverage available for my mother, she is unconscious",
+]
+
+
+def padded_tables(size: int, rng: random.Random) -> Dict[str, List[str]]:
+    """The registered tables by category, grown to ``size`` keywords."""
+    tables: Dict[str, List[str]] = {}
+    for entries in keyword_matcher.groups.values():
+        for keyword, category, _ in entries:
+            tables.setdefault(category, []).append(keyword)
+    categories = list(tables)
+    total = sum(len(words) for words in tables.values())
+    for i in range(max(0, size - total)):
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        tables[categories[i % len(categories)]].append(word)
+    return tables
+
+
+def loop_scan(tables: Dict[str, List[str]], message: str) -> Dict[str, bool]:
+    # One lowercase + one pass per table, as each caller used to do.
+    return {
+        category: any(word.lower() in message.lower() for word in words)
+        for category, words in tables.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    # Importing these registers their tables with the shared matcher.
+    import app.db.db  # noqa: F401
+    import app.utils.formatters  # noqa: F401
+    from app.services.retrieval_service import retrieval_service  # noqa: F401
+    from app.services.task_router import task_router  # noqa: F401
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        tables = padded_tables(size, rng)
+        matcher = KeywordMatcher()
+        matcher.register(
+            "bench",
+            [(word, category, 1) for category, words in tables.items() for word in words],
+        )
+        start = time.perf_counter()
+        matcher.scan("warm-up")  # compile
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        for message in MESSAGES:
+            found = matcher.scan(message).categories()
+            expected = {c for c, hit in loop_scan(tables, message).items() if hit}
+            assert found == expected, (message, found ^ expected)
+
+        timings = {}
+        for label, scan in (
+            ("loops", lambda m: loop_scan(tables, m)),
+            ("automaton", matcher.scan),
+        ):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                for message in MESSAGES:
+                    scan(message)
+            timings[label] = (time.perf_counter() - start) / (args.rounds * len(MESSAGES)) * 1e6
+
+        keywords = sum(len(words) for words in tables.values())
+        print(
+            f"{keywords:>6} keywords  loops {timings['loops']:9.1f}µs/msg"
+            f"  automaton {timings['automaton']:7.1f}µs/msg"
+            f"  ({timings['loops'] / timings['automaton']:5.1f}x)  compile {compile_ms:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
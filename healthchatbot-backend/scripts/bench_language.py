@@ -0,0 +1,84 @@
+"""
+Language detection throughput: the Unicode-block script detector against
+the character-list and keyword-count detectors it replaced.
+
+Messages mix Hindi, Odia, English, romanized Hindi/Odia and code-mixed
+text, repeated to the requested length. "memoized" replays the same
+messages, as repeated webhook retries and FAQ-style questions do.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_language --rounds 2000 --repeat 1 8
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from app.services.script_detector import detect_script
+
+MESSAGES = [
+    "मुझे खांसी और बुखार है",
+    "ମୋତେ ଜ୍ୱର ହେଉଛି ଏବଂ ମୁଣ୍ଡବିନ୍ଧା",
+    "I have fever since yesterday",
+    "mujhe sir dard ho raha hai",
+    "mora peta jantrana heuchi",
+    "मुझे fever है and cough",
+]
+
+ODIA_CHARS = [chr(c) for c in range(0x0B05, 0x0B3A)] + ["ଜ୍ୱର", "ମୁଣ୍ଡବିନ୍ଧା", "କାଶ"]
+HINDI_CHARS = [chr(c) for c in range(0x0905, 0x093A)] + ["बुखार", "खांसी", "दर्द"]
+LEGACY_KEYWORDS = {
+    "hi": ["बुखार", "सिरदर्द", "खांसी", "दर्द", "आपातकाल", "नमस्ते", "मुझे", "है", "के", "में"],
+    "or": ["ଜ୍ୱର", "ମୁଣ୍ଡବିନ୍ଧା", "କାଶ", "ଦରଦ", "ଜରୁରୀକାଳୀନ", "ନମସ୍କାର", "ମୋର", "ଅଛି", "ପାଇଁ"],
+    "en": ["fever", "headache", "cough", "pain", "emergency", "hello", "have", "is", "for", "help"],
+}
+
+
+def legacy_char_lists(text: str) -> str:
+    """db.detect_language before the script detector."""
+    text = text.strip().lower()
+    if any(char in text for char in ODIA_CHARS):
+        return "odia"
+    if any(char in text for char in HINDI_CHARS):
+        return "hindi"
+    return "english" if text.isascii() else "mixed"
+
+
+def legacy_keyword_counts(text: str) -> str:
+    """language_detector.detect_language_with_confidence before it."""
+    text_lower = text.lower()
+    scores = {lang: sum(k in text_lower for k in words) for lang, words in LEGACY_KEYWORDS.items()}
+    return max(scores, key=scores.get)
+
+
+def throughput(detect: Callable[[str], object], messages: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            detect(message)
+    return rounds * len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    for repeat in args.repeat:
+        messages = [" ".join([message] * repeat) for message in MESSAGES]
+        chars = sum(map(len, messages)) // len(messages)
+        print(f"~{chars} chars per message")
+        for label, detect in (
+            ("char lists (old db)", legacy_char_lists),
+            ("keyword counts (old)", legacy_keyword_counts),
+            ("script detector", detect_script.__wrapped__),
+            ("script detector, memo", detect_script),
+        ):
+            rate = throughput(detect, messages, args.rounds)
+            print(f"  {label:<24} {rate:12,.0f} msgs/s")
+
+
+if __name__ == "__main__":
+    main()
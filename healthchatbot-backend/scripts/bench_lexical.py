@@ -0,0 +1,106 @@
+"""
+Knowledge-base retrieval benchmark: latency and recall@k per language.
+
+Compares the old substring scan with BM25, the vector index and their
+reciprocal-rank fusion. Queries are generated from the symptom files
+(bare name, name inside a sentence, an inflected/partial form, and the
+romanized spellings from query_normalizer); the entry a query was made
+from is the relevant document. Every backend scans only the query's own
+language shard.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_lexical --k 3 --rounds 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.health_data_loader import health_data
+from app.services.query_normalizer import ROMANIZED_SYMPTOMS
+
+LANG_CODES = {"english": "en", "hindi": "hi", "odia": "or"}
+TEMPLATES = {
+    "english": ["{}", "I have {} since yesterday", "{}s"],
+    "hindi": ["{}", "मुझे {} है", "{}ों से परेशान"],
+    "odia": ["{}", "ମୋତେ {} ହେଉଛି", "{}ରେ କଷ୍ଟ"],
+}
+
+
+def build_queries() -> Dict[str, List[Tuple[str, str]]]:
+    romanized = defaultdict(list)
+    for surface, symptom_id in ROMANIZED_SYMPTOMS.items():
+        romanized[symptom_id].append(surface)
+    queries: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    for lang, symptom_map in health_data.symptoms_db.items():
+        for name, payload in symptom_map.items():
+            expected = f"{lang}-{name}"
+            for template in TEMPLATES[lang]:
+                queries[lang].append((template.format(name), expected))
+            if lang != "english":
+                for surface in romanized.get(payload.get("symptom"), []):
+                    queries[lang].append((surface, expected))
+    return queries
+
+
+def substring_ranking(query: str, lang: str) -> List[str]:
+    """The pre-BM25 fallback loop, kept here for comparison."""
+    text = query.lower()
+    return [
+        f"{lang}-{name}"
+        for name, data in health_data.symptoms_db[lang].items()
+        if name.lower() in text or data.get("symptom", "").lower() in text
+    ]
+
+
+def evaluate(label: str, rank: Callable[[str, str], List[str]], queries, k: int, rounds: int):
+    for lang, items in queries.items():
+        code = LANG_CODES[lang]
+        found = sum(expected in rank(query, code)[:k] for query, expected in items)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for query, _ in items:
+                rank(query, code)
+        us = (time.perf_counter() - start) / (rounds * len(items)) * 1e6
+        print(
+            f"  {label:<10} {lang:<8} recall@{k}={found / len(items):5.2f}"
+            f"  ({found}/{len(items)})  {us:8.1f}µs/query"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    settings.retrieval_backend = "numpy"
+    from app.services.retrieval_service import LANGUAGE_KEYS, RetrievalService
+
+    service = RetrievalService(health_data)
+    queries = build_queries()
+
+    def substring(query, code):
+        return substring_ranking(query, LANGUAGE_KEYS[code])
+
+    def bm25(query, code):
+        return service._lexical_ranking(service._query_terms(query), LANGUAGE_KEYS[code])
+
+    def vector(query, code):
+        return service._dense_ranking(query, LANGUAGE_KEYS[code])[0]
+
+    def hybrid(query, code):
+        return service._rank(query, service._query_terms(query), LANGUAGE_KEYS[code])[0]
+
+    print(f"{sum(len(v) for v in queries.values())} generated queries")
+    evaluate("substring", substring, queries, args.k, args.rounds)
+    evaluate("bm25", bm25, queries, args.k, args.rounds)
+    evaluate("vector", vector, queries, args.k, args.rounds)
+    evaluate("hybrid", hybrid, queries, args.k, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Retrieval latency benchmark: in-process NumPy index vs Chroma.
+
+Synthetic float32 document vectors spread over three languages; the same
+query vectors are sent to both backends. Chroma is queried with precomputed
+embeddings, so only its client/index stack is measured, not embedding.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.bench_retrieval --sizes 100,10000,1000000 --dim 128
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from app.services.vector_index import VectorIndex
+
+try:
+    import chromadb
+except Exception:  # pragma: no cover - chroma optional for the benchmark
+    chromadb = None
+
+LANGS = ("english", "hindi", "odia")
+
+
+def _latencies_ms(fn, queries) -> list:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(timings) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return f"p50={statistics.median(ordered):8.3f}ms  p95={p95:8.3f}ms"
+
+
+def bench_numpy(vectors, langs, queries, k: int):
+    ids = [str(i) for i in range(len(vectors))]
+    start = time.perf_counter()
+    index = VectorIndex.build(vectors, ids, ids, langs)
+    build_s = time.perf_counter() - start
+    print(f"  numpy   build={build_s:8.2f}s")
+    print(f"  numpy   single      {_summary(_latencies_ms(lambda q: index.search(q, k), queries))}")
+    print(
+        "  numpy   lang-slice  "
+        + _summary(_latencies_ms(lambda q: index.search(q, k, lang="hindi"), queries))
+    )
+    start = time.perf_counter()
+    index.search(queries, k)
+    per_query = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"  numpy   batched     {per_query:8.3f}ms/query ({len(queries)} per call)")
+
+
+def bench_chroma(vectors, langs, queries, k: int, batch: int):
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(
+        f"bench-{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+    )
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch):
+        chunk = vectors[offset : offset + batch]
+        collection.add(
+            ids=[str(i) for i in range(offset, offset + len(chunk))],
+            embeddings=chunk.tolist(),
+            metadatas=[{"lang": lang} for lang in langs[offset : offset + len(chunk)]],
+        )
+    build_s = time.perf_counter() - start
+    print(f"  chroma  build={build_s:8.2f}s")
+    print(
+        "  chroma  single      "
+        + _summary(
+            _latencies_ms(
+                lambda q: collection.query(query_embeddings=[q.tolist()], n_results=k),
+                queries,
+            )
+        )
+    )
+    print(
+        "  chroma  lang-filter "
+        + _summary(
+            _latencies_ms(
+                lambda q: collection.query(
+                    query_embeddings=[q.tolist()], n_results=k, where={"lang": "hindi"}
+                ),
+                queries,
+            )
+        )
+    )
+    client.delete_collection(collection.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,10000,1000000")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument(
+        "--chroma-max",
+        type=int,
+        default=1_000_000,
+        help="skip Chroma above this many documents (its HNSW build dominates)",
+    )
+    parser.add_argument("--chroma-batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    for size in (int(s) for s in args.sizes.split(",")):
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        langs = [LANGS[i % len(LANGS)] for i in range(size)]
+        print(f"\n{size} documents, dim={args.dim}, k={args.k}")
+        bench_numpy(vectors, langs, queries, args.k)
+        if chromadb is None:
+            print("  chroma  skipped (chromadb not installed)")
+        elif size > args.chroma_max:
+            print(f"  chroma  skipped (> --chroma-max {args.chroma_max})")
+        else:
+            bench_chroma(vectors, langs, queries, args.k, args.chroma_batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Build or verify the persisted knowledge index offline.
+
+``sync`` (default) embeds only documents whose content hash differs from
+the manifest, ``--rebuild`` discards the manifest first and re-embeds
+everything, and ``--verify`` only reports what a sync would change,
+exiting non-zero when the index is out of date (useful in CI/deploys).
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.build_index --backend numpy
+    python -m scripts.build_index --backend chroma --rebuild
+    python -m scripts.build_index --verify
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+
+from app.core.config import settings
+from app.services.index_manifest import MANIFEST_FILE, IndexManifest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=("numpy", "chroma"), default=None)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rebuild", action="store_true", help="re-embed every document")
+    mode.add_argument("--verify", action="store_true", help="report drift, change nothing")
+    args = parser.parse_args()
+
+    backend = args.backend or ("chroma" if settings.retrieval_backend == "chroma" else "numpy")
+    directory = settings.chroma_persist_dir if backend == "chroma" else settings.vector_index_dir
+
+    if args.rebuild:
+        (directory / MANIFEST_FILE).unlink(missing_ok=True)
+
+    # Build the service without touching the store, then sync explicitly.
+    settings.retrieval_backend = "none"
+    from app.services.health_data_loader import health_data
+    from app.services.retrieval_service import RetrievalService
+
+    service = RetrievalService(health_data)
+
+    if args.verify:
+        ids, docs, metadatas = service._documents()
+        diff = IndexManifest.load(directory).diff(service._content_hashes(ids, docs, metadatas))
+        print(json.dumps({"backend": backend, "directory": str(directory), **diff.summary()}))
+        return 1 if diff.dirty else 0
+
+    started = time.perf_counter()
+    if backend == "chroma":
+        service._bootstrap_chroma()  # connects and syncs
+    else:
+        service.sync_vector_index()
+    diff = service.last_sync
+    if diff is None:
+        print(f"{backend} index build failed; see log for details", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "backend": backend,
+                "directory": str(directory),
+                "seconds": round(elapsed, 3),
+                **diff.summary(),
+            }
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Replay chat_history through the orchestrator cache-key logic and compare
+hit rates of the legacy key (lowercased text) with the canonical key.
+
+Usage (from healthchatbot-backend/):
+    mongoexport --db swasthya_setu --collection chat_history --out chat.jsonl
+    python -m scripts.replay_cache_keys --input chat.jsonl
+    python -m scripts.replay_cache_keys --mongo mongodb://localhost:27017 --limit 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Tuple
+
+from app.core.config import settings
+from app.services.emergency_service import emergency_engine
+from app.services.language_detector import detect_language
+from app.services.query_normalizer import query_normalizer
+from app.services.task_router import task_router
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, dict) and "$date" in value:
+        value = value["$date"]
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    return 0.0
+
+
+def read_export(path: str) -> Iterator[Tuple[float, str]]:
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        f.seek(0)
+        records = json.load(f) if first == "[" else (json.loads(line) for line in f if line.strip())
+        for record in records:
+            yield _timestamp(record.get("timestamp")), record.get("user_message", "")
+
+
+def read_mongo(uri: str, limit: int) -> Iterator[Tuple[float, str]]:
+    from pymongo import MongoClient
+
+    cursor = (
+        MongoClient(uri)
+        .swasthya_setu.chat_history.find({}, {"user_message": 1, "timestamp": 1})
+        .sort("timestamp", 1)
+        .limit(limit)
+    )
+    for record in cursor:
+        yield _timestamp(record.get("timestamp")), record.get("user_message", "")
+
+
+def replay(messages: Iterable[Tuple[float, str]], ttl: float) -> Dict[str, Dict[str, int]]:
+    filled = {"legacy": {}, "canonical": {}}
+    counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for ts, message in sorted(messages, key=lambda item: item[0]):
+        if not message:
+            continue
+        # Emergencies bypass the cache in the live pipeline.
+        if task_router.route(message) == "emergency" or emergency_engine.assess(message)["triggered"]:
+            continue
+        lang = detect_language(message)
+        keys = {
+            "legacy": f"{lang}:{message.strip().lower()}",
+            "canonical": f"{lang}:{query_normalizer.canonical_key(message)}",
+        }
+        for bucket in (lang, "all"):
+            counts[bucket]["lookups"] += 1
+        for kind, key in keys.items():
+            last_fill = filled[kind].get(key)
+            if last_fill is not None and ts - last_fill < ttl:
+                for bucket in (lang, "all"):
+                    counts[bucket][f"{kind}_hits"] += 1
+            else:
+                filled[kind][key] = ts
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="chat_history export (JSON array or JSONL)")
+    source.add_argument("--mongo", help="MongoDB connection string")
+    parser.add_argument("--limit", type=int, default=100000)
+    parser.add_argument("--ttl", type=float, default=settings.cache_ttl_seconds)
+    args = parser.parse_args()
+
+    messages = read_export(args.input) if args.input else read_mongo(args.mongo, args.limit)
+    counts = replay(messages, args.ttl)
+
+    print(f"{'lang':<6} {'lookups':>8} {'legacy':>8} {'canonical':>10} {'gain':>7}")
+    for lang, row in sorted(counts.items()):
+        lookups = row["lookups"] or 1
+        legacy = row["legacy_hits"] / lookups
+        canonical = row["canonical_hits"] / lookups
+        print(
+            f"{lang:<6} {row['lookups']:>8} {legacy:>8.1%} {canonical:>10.1%} "
+            f"{canonical - legacy:>+7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Re-triage historical chat messages under a candidate emergency config.
+
+Every chat_history message is triaged as production does (engine score
+against the threshold, or a TaskRouter emergency keyword) with the
+deployed SYMPTOM_WEIGHTS and threshold and with the candidate. The report
+counts newly flagged and unflagged messages per language. Records stream
+through a Mongo cursor (or a JSONL export, read line by line) in batches,
+so memory stays flat on millions of messages. Progress is printed to
+stderr.
+
+Usage (from healthchatbot-backend/):
+    python -m scripts.retriage --threshold 5
+    python -m scripts.retriage --set "chest pain=6" --set "fits=5" --since 2024-01-01
+    python -m scripts.retriage --weights candidate.json --input chat.jsonl \\
+        --out report.json --changes changes.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict
+
+from app.core.config import settings
+from app.services.retriage import RetriageRun, TriageConfig, chat_records, count_records
+
+
+async def read_export(path: Path) -> AsyncIterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        if fh.read(1) == "[":
+            # A --jsonArray export has to be parsed whole; prefer JSONL.
+            fh.seek(0)
+            for record in json.load(fh):
+                yield record
+            return
+        fh.seek(0)
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_weight(value: str) -> Dict[str, int]:
+    phrase, _, weight = value.rpartition("=")
+    if not phrase:
+        raise argparse.ArgumentTypeError(f"expected PHRASE=WEIGHT, got {value!r}")
+    return {phrase: int(weight)}
+
+
+async def show_progress(run: RetriageRun):
+    while run.state in ("pending", "running"):
+        progress = run.progress()
+        done = f"{progress['processed']:,}"
+        if progress["total"]:
+            done += f"/{progress['total']:,} ({progress['percent']}%)"
+        print(
+            f"\r{done} records, {progress['records_per_second']:,.0f}/s",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+        await asyncio.sleep(1)
+    print(file=sys.stderr)
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    weights: Dict[str, int] = {}
+    if args.weights:
+        weights.update(json.loads(args.weights.read_text(encoding="utf-8")))
+    for override in args.set:
+        weights.update(override)
+    baseline = TriageConfig.from_engine()
+    candidate = baseline.with_overrides(weights, args.threshold)
+
+    run = RetriageRun(
+        baseline, candidate, args.batch_size, max_samples=args.samples, changes_path=args.changes
+    )
+    if args.input:
+        records, total = read_export(args.input), None
+    else:
+        query = {"timestamp": {"$gte": args.since}} if args.since else {}
+        total = await count_records(query, args.limit)
+        records = chat_records(query, args.batch_size, args.limit)
+
+    progress = asyncio.create_task(show_progress(run))
+    await run.run(records, total)
+    await progress
+
+    report = json.dumps(run.report(), ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(report, encoding="utf-8")
+    else:
+        print(report)
+    totals = run.totals()
+    print(
+        f"scanned {totals['scanned']:,}: {totals['newly_flagged']:,} newly flagged, "
+        f"{totals['unflagged']:,} unflagged",
+        file=sys.stderr,
+    )
+    return 0 if run.state == "done" else 2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=int, help="candidate flagging threshold")
+    parser.add_argument("--weights", type=Path, help='JSON {"phrase": weight}; 0 removes')
+    parser.add_argument("--set", type=parse_weight, action="append", default=[], metavar="PHRASE=WEIGHT")
+    parser.add_argument("--input", type=Path, help="chat_history export instead of Mongo")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=settings.retriage_batch_size)
+    parser.add_argument("--samples", type=int, default=20, help="changed messages kept in the report")
+    parser.add_argument("--out", type=Path, help="report file (default: stdout)")
+    parser.add_argument("--changes", type=Path, help="JSONL file of every changed message")
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Train the routing intent classifier from labelled chat_history exports.
+
+Exports are ``mongoexport`` output (one JSON document per line, or a
+``--jsonArray`` file) in which reviewers added a label field with one of
+medical, symptom, scheme, hospital or greeting; unlabelled rows are
+skipped. The bundled seed set (app/data/intent/seed_queries.jsonl) is
+added unless ``--no-seed``.
+
+Every fifth distinct message (by stable hash) is held out for the report,
+then the saved model is retrained on everything. The report covers
+held-out accuracy, the share of queries the keyword router sends to the
+LLM that the classifier answers from templates instead ("llm_avoided"),
+how many of those were labelled medical ("misrouted"), and the added
+routing latency per message.
+
+Usage (from healthchatbot-backend/):
+    mongoexport --db swasthya_setu --collection chat_history --out chat.jsonl
+    python -m scripts.train_intent chat.jsonl --label-field label
+    python -m scripts.train_intent --no-seed reviewed/*.jsonl --out /tmp/intent.npz
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.intent_classifier import LABELS, IntentClassifier
+from app.services.keyword_matcher import keyword_matcher
+from app.services.task_router import TEMPLATE_ROUTES, TaskRouter
+from app.services.vectorizer import stable_hash
+
+SEED_PATH = Path(__file__).resolve().parent.parent / "app" / "data" / "intent" / "seed_queries.jsonl"
+HOLDOUT_EVERY = 5
+
+
+def read_export(path: Path, text_field: str, label_field: str) -> List[Tuple[str, str]]:
+    raw = path.read_text(encoding="utf-8")
+    if raw.lstrip().startswith("["):
+        documents = json.loads(raw)
+    else:
+        documents = [json.loads(line) for line in raw.splitlines() if line.strip()]
+    examples = []
+    for document in documents:
+        text, label = document.get(text_field), document.get(label_field)
+        if isinstance(text, str) and text.strip() and label in LABELS:
+            examples.append((text.strip(), label))
+    return examples
+
+
+def routing_report(
+    model: IntentClassifier, examples: List[Tuple[str, str]]
+) -> Dict[str, object]:
+    """How the keyword router alone and with ``model`` route ``examples``."""
+    from app.services.language_detector import detect_language
+    from app.services.retrieval_service import retrieval_service
+
+    texts = [text for text, _ in examples]
+    keyword_only, with_model = TaskRouter(), TaskRouter(model)
+    base = keyword_only.route_many(texts)
+    routed = with_model.route_many(texts)
+
+    llm_before = llm_after = misrouted = 0
+    for (text, label), before, after in zip(examples, base, routed):
+        if before != "medical":
+            continue
+        llm_before += 1
+        # Symptom reports only skip the LLM when the knowledge base knows them.
+        answered = after in TEMPLATE_ROUTES and (
+            after != "symptom" or retrieval_service.match_symptom(text, detect_language(text))
+        )
+        if not answered:
+            llm_after += 1
+        elif label == "medical":
+            misrouted += 1
+
+    def per_message_us(router: TaskRouter, batch: int) -> float:
+        rounds = max(1, 2000 // len(texts))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for i in range(0, len(texts), batch):
+                chunk = texts[i : i + batch]
+                router.route_many(chunk, [keyword_matcher.scan(text) for text in chunk])
+        return (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+    keyword_us = per_message_us(keyword_only, 1)
+    return {
+        "messages": len(examples),
+        "llm_calls_keyword_router": llm_before,
+        "llm_calls_with_classifier": llm_after,
+        "llm_avoided": round(1 - llm_after / llm_before, 3) if llm_before else 0.0,
+        "misrouted": misrouted,
+        "route_us_keyword": round(keyword_us, 1),
+        "route_us_added": round(per_message_us(with_model, 1) - keyword_us, 1),
+        "route_us_added_batch64": round(per_message_us(with_model, 64) - keyword_us, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("exports", nargs="*", type=Path)
+    parser.add_argument("--text-field", default="user_message")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--no-seed", action="store_true", help="train on the exports only")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--out", type=Path, default=settings.intent_model_path)
+    args = parser.parse_args()
+
+    examples: List[Tuple[str, str]] = []
+    for path in args.exports:
+        examples += read_export(path, args.text_field, args.label_field)
+    if not args.no_seed:
+        examples += read_export(SEED_PATH, "user_message", "label")
+    # Exports repeat popular messages; the first label seen wins.
+    examples = list(dict(examples).items())
+    if len({label for _, label in examples}) < 2:
+        print("need labelled examples of at least two intents", file=sys.stderr)
+        return 1
+
+    held_out = [ex for ex in examples if stable_hash(ex[0]) % HOLDOUT_EVERY == 0]
+    training = [ex for ex in examples if stable_hash(ex[0]) % HOLDOUT_EVERY != 0]
+
+    def fit(rows: List[Tuple[str, str]]) -> IntentClassifier:
+        return IntentClassifier.train(
+            [text for text, _ in rows], [label for _, label in rows], args.dim, args.epochs
+        )
+
+    report: Dict[str, object] = {"examples": len(examples), "held_out": len(held_out)}
+    if held_out and len({label for _, label in training}) >= 2:
+        model = fit(training)
+        predicted = model.classify_many([text for text, _ in held_out])
+        correct = sum(p == label for (p, _), (_, label) in zip(predicted, held_out))
+        report["held_out_accuracy"] = round(correct / len(held_out), 3)
+        report["held_out_routing"] = routing_report(model, held_out)
+
+    started = time.perf_counter()
+    model = fit(examples)
+    report["train_seconds"] = round(time.perf_counter() - started, 2)
+    model.save(args.out)
+    report["model"] = str(args.out)
+    report["model_bytes"] = args.out.stat().st_size
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import pytest
+
+from app.services import retrieval_service as retrieval_module
+from app.services.health_data_loader import HealthDataLoader
+from app.services.retrieval_service import RetrievalService
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    """Retrieval over the in-process vector index, on its own loader so
+    tests may reload or edit the knowledge base."""
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_backend", "numpy")
+    monkeypatch.setattr(retrieval_module.settings, "vector_index_dir", tmp_path)
+    return RetrievalService(HealthDataLoader())
@@ -52,8 +52,17 @@ def test_language_detection_high_confidence_hindi():
 
 
 def test_language_detection_defaults_to_english_when_uncertain():
-    lang, confidence = detect_language_with_confidence("random text with no keywords")
-
-    assert lang == "en"
-    assert confidence == 0.0
+    # No letters, or only letters outside the supported scripts.
+    for text in ("123 ... ??", "வணக்கம்"):
+        lang, confidence = detect_language_with_confidence(text)
+        assert lang == "en"
+        assert confidence == 0.0
     assert detect_language("random text with no keywords") == "en"
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["Hi", "hello", "thanks", "ok", "good morning", "my baby has rash", "baby rash", "back pain"],
+)
+def test_short_english_is_not_taken_for_romanized_hindi_or_odia(text):
+    assert detect_language(text) == "en"
@@ -0,0 +1,144 @@
+from app.services import cache_service
+from app.services.cache_service import SQLiteCacheBackend, TTLCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_policy_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(cache_service.time, "time", FakeClock())
+    cache = TTLCache(ttl_seconds=60, max_items=2, policy="lru")
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_policy_evicts_earliest_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", clock)
+    cache = TTLCache(ttl_seconds=60, max_items=2, policy="ttl")
+
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    cache.get("a")  # reads do not extend lifetime under the TTL policy
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_purge_expired_drops_unread_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", clock)
+    cache = TTLCache(ttl_seconds=10, max_items=100)
+
+    for idx in range(5):
+        cache.set(f"k{idx}", idx)
+    clock.now += 5
+    cache.set("k0", "refreshed")
+    clock.now += 6
+
+    assert cache.purge_expired() == 4
+    assert len(cache) == 1
+    assert cache.get("k0") == "refreshed"
+
+
+def test_stats_track_hits_misses_and_registry():
+    cache = TTLCache(ttl_seconds=60, max_items=4, name="test-stats")
+
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache_service.cache_stats()["test-stats"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    cache_service._registry.pop("test-stats")
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    worker_a = TTLCache(
+        ttl_seconds=60, backend=SQLiteCacheBackend(path, "llm", max_items=10, policy="lru")
+    )
+    worker_b = TTLCache(
+        ttl_seconds=60, backend=SQLiteCacheBackend(path, "llm", max_items=10, policy="lru")
+    )
+
+    worker_a.set("hi:fever", {"response": "आराम करें", "cached": False})
+
+    assert worker_b.get("hi:fever") == {"response": "आराम करें", "cached": False}
+
+
+def test_sqlite_backend_bounds_size_and_purges(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", clock)
+    backend = SQLiteCacheBackend(
+        tmp_path / "cache.sqlite3", "orchestrator", max_items=3, policy="ttl"
+    )
+    cache = TTLCache(ttl_seconds=10, max_items=3, policy="ttl", backend=backend)
+
+    for idx in range(5):
+        clock.now += 1
+        cache.set(f"k{idx}", idx)
+
+    assert len(cache) == 3
+    assert cache.get("k0") is None
+    assert cache.get("k4") == 4
+    assert cache.stats()["evictions"] == 2
+
+    clock.now += 20
+    assert cache.purge_expired() == 3
+    assert len(cache) == 0
+
+
+def test_sqlite_lru_reads_only_write_stale_recency(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", clock)
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3", "llm", max_items=2, policy="lru")
+    cache = TTLCache(ttl_seconds=600, max_items=2, backend=backend)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+
+    writes = backend._conn.total_changes
+    for _ in range(10):
+        assert cache.get("a") == 1
+    assert backend._conn.total_changes == writes
+
+    # Once the stamp is old enough a read refreshes it, so "b" is evicted.
+    clock.now += cache_service.LRU_TOUCH_SECONDS
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1 and cache.get("b") is None
+
+
+def test_lookup_serves_stale_within_window(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "time", clock)
+    cache = TTLCache(ttl_seconds=10, max_items=10, stale_seconds=30)
+
+    cache.set("k", "v")
+    clock.now += 15
+
+    assert cache.get("k") is None  # plain get never returns stale data
+    assert cache.lookup("k") == ("v", True)
+    assert cache.purge_expired() == 0
+
+    clock.now += 30
+    assert cache.lookup("k") == (None, False)
+    assert cache.stats()["stale_hits"] == 1
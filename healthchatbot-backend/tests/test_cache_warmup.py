@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from app.services import cache_service
+from app.services.cache_service import TTLCache, load_snapshot, save_snapshot
+from app.services.cache_warmup import CacheWarmer, QueryTally
+
+
+def test_snapshot_round_trip_respects_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "_registry", {})
+    cache = TTLCache(ttl_seconds=60, name="snap")
+    cache.set("en:fever", {"response": "rest"})
+    cache.backend.set("en:old", {"response": "gone"}, time.time() - 1)
+
+    path = tmp_path / "snapshot.json"
+    assert save_snapshot(path) == 1
+
+    cache.clear()
+    assert load_snapshot(path) == 1
+    assert cache.get("en:fever") == {"response": "rest"}
+    assert cache.get("en:old") is None
+    assert load_snapshot(tmp_path / "missing.json") == 0
+
+
+def test_workers_merge_into_one_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot.json"
+    # Worker A shuts down first, then worker B saves to the same path.
+    monkeypatch.setattr(cache_service, "_registry", {})
+    first = TTLCache(ttl_seconds=60, name="snap")
+    first.set("en:fever", {"response": "rest"})
+    first.set("en:cough", {"response": "old"})
+    assert save_snapshot(path) == 2
+
+    monkeypatch.setattr(cache_service, "_registry", {})
+    second = TTLCache(ttl_seconds=120, name="snap")
+    second.set("en:cough", {"response": "new"})
+    assert save_snapshot(path) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+    second.clear()
+    assert load_snapshot(path) == 2
+    assert second.get("en:fever") == {"response": "rest"}
+    assert second.get("en:cough") == {"response": "new"}
+
+
+def test_restore_drops_entries_expired_while_down(monkeypatch):
+    monkeypatch.setattr(cache_service, "_registry", {})
+    cache = TTLCache(ttl_seconds=60, name="snap")
+    now = time.time()
+
+    restored = cache.restore([("en:a", now + 30, "a"), ("en:b", now - 5, "b")])
+
+    assert restored == 1
+    assert cache.get("en:a") == "a"
+
+
+def test_tally_keeps_top_queries_per_language():
+    tally = QueryTally()
+    for message in ["fever", "Fever!", "I have fever", "cough"]:
+        tally.add(message, "english")
+    tally.add("बुखार है", "hindi")
+
+    plan = tally.top(1)
+
+    assert ("en", "fever") in plan
+    assert [lang for lang, _ in plan].count("en") == 1
+    assert any(lang == "hi" for lang, _ in plan)
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.warmed = []
+
+    async def warm(self, message, lang):
+        self.warmed.append((lang, message))
+        if message == "boom":
+            raise RuntimeError("llm down")
+        return "warmed"
+
+
+@pytest.mark.asyncio
+async def test_warmer_reports_progress():
+    orchestrator = FakeOrchestrator()
+    warmer = CacheWarmer(orchestrator, top_n=5, concurrency=2)
+    assert warmer.ready is False
+
+    await warmer.run(
+        [
+            {"user_message": "fever", "language": "english"},
+            {"user_message": "boom", "language": "english"},
+        ]
+    )
+
+    progress = warmer.progress()
+    assert warmer.ready is True
+    assert progress["state"] == "done"
+    assert progress["total"] == progress["completed"] == 2
+    assert progress["outcomes"] == {"warmed": 1, "failed": 1}
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.deadline import ClientDisconnected, Deadline, run_until_disconnect
+from app.services import pipeline
+
+
+def test_cap_shrinks_to_remaining_budget():
+    deadline = Deadline(2.0)
+
+    assert deadline.cap(6.0) <= 2.0
+    assert deadline.cap(6.0, reserve=0.5) <= 1.5
+    assert deadline.cap(0.1) == 0.1
+    assert Deadline(None).cap(6.0) == 6.0
+    assert Deadline(None).expired is False
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_falls_back_before_deadline(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+
+    async def hanging_generate(prompt, language, deadline=None, allow_stale=True):
+        await asyncio.sleep(10)
+        return "too late"
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", hanging_generate)
+    monkeypatch.setattr(pipeline.settings, "deadline_reserve_seconds", 0.05)
+
+    started = time.monotonic()
+    result = await orchestrator.handle_query(
+        "what helps a fever", "u1", language="en", deadline=Deadline(0.2)
+    )
+
+    assert time.monotonic() - started < 0.5
+    assert result["meta"]["timed_out"] is True
+    assert "fluids" in result["response"]
+    for task in list(orchestrator.flights._inflight.values()):
+        task.cancel()
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_work():
+    request = FakeRequest()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    runner = asyncio.ensure_future(run_until_disconnect(request, work(), poll_seconds=0.01))
+    await asyncio.sleep(0.02)
+    request.disconnected = True
+
+    with pytest.raises(ClientDisconnected):
+        await runner
+    await asyncio.sleep(0)
+    assert cancelled.is_set()
@@ -0,0 +1,161 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import embeddings as embeddings_module
+from app.services.embeddings import (
+    AzureEmbeddingProvider,
+    CachedEmbeddingProvider,
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    VectorLRU,
+    make_embedder,
+)
+from app.services.vectorizer import HashingVectorizer
+
+
+class FakeEmbeddingsAPI:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(i)])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class CountingProvider(EmbeddingProvider):
+    signature = "counting-v1"
+
+    def __init__(self):
+        self.seen = []
+
+    def embed(self, texts):
+        self.seen.extend(texts)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_provider_without_embed_fails_at_construction():
+    class Forgetful(EmbeddingProvider):
+        signature = "forgetful"
+
+    with pytest.raises(TypeError):
+        Forgetful()
+
+
+def test_azure_provider_batches_and_keeps_order():
+    api = FakeEmbeddingsAPI()
+    provider = AzureEmbeddingProvider(SimpleNamespace(embeddings=api), "embed-small", batch_size=2)
+
+    matrix = provider.embed(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert [len(call) for call in api.calls] == [2, 2, 1]
+    assert matrix.dtype == np.float32
+    assert matrix[:, 0].tolist() == [1, 2, 3, 4, 5]
+    assert provider.stats() == {"provider": "azure:embed-small", "requests": 3, "texts": 5}
+
+
+def test_disk_cache_embeds_each_text_once(tmp_path):
+    inner = CountingProvider()
+    cached = CachedEmbeddingProvider(inner, tmp_path)
+
+    first = cached.embed(["fever", "cough", "fever"])
+    assert inner.seen == ["fever", "cough"]
+    assert np.array_equal(first[0], first[2])
+
+    # A fresh instance (new process) reads the same files.
+    again = CachedEmbeddingProvider(inner, tmp_path).embed(["cough", "rash"])
+    assert inner.seen == ["fever", "cough", "rash"]
+    assert np.array_equal(again[0], first[1])
+    assert cached.stats()["disk_misses"] == 2
+
+
+def test_queries_are_not_written_to_disk(tmp_path):
+    inner = CountingProvider()
+    cached = CachedEmbeddingProvider(inner, tmp_path)
+
+    cached.embed_queries(["is fever contagious", "is fever contagious"])
+
+    assert inner.seen == ["is fever contagious"] * 2
+    assert not any(tmp_path.iterdir())
+
+
+def test_azure_queries_use_the_query_client():
+    documents, queries = FakeEmbeddingsAPI(), FakeEmbeddingsAPI()
+    provider = AzureEmbeddingProvider(
+        SimpleNamespace(embeddings=documents),
+        "embed-small",
+        query_client=SimpleNamespace(embeddings=queries),
+    )
+
+    provider.embed(["fever advice"])
+    provider.embed_queries(["fever?"])
+
+    assert documents.calls == [["fever advice"]]
+    assert queries.calls == [["fever?"]]
+
+
+def test_cache_keys_include_provider_signature(tmp_path):
+    CachedEmbeddingProvider(CountingProvider(), tmp_path).embed(["fever"])
+    other = CountingProvider()
+    other.signature = "counting-v2"
+    CachedEmbeddingProvider(other, tmp_path).embed(["fever"])
+    assert other.seen == ["fever"]
+
+
+def test_auto_falls_back_to_hashing_without_deployment(monkeypatch):
+    monkeypatch.setattr(embeddings_module.settings, "embedding_provider", "auto")
+    monkeypatch.setattr(embeddings_module.settings, "azure_embedding_deployment", "")
+    vectorizer = HashingVectorizer(dim=32)
+
+    provider = make_embedder(vectorizer)
+
+    assert isinstance(provider, HashingEmbeddingProvider)
+    assert provider.signature == vectorizer.signature
+    assert provider.embed(["fever"]).shape == (1, 32)
+
+
+def test_retrieval_embeds_unseen_texts_in_one_batch(monkeypatch):
+    from app.services.retrieval_service import retrieval_service
+
+    provider = CountingProvider()
+    calls = []
+    original = provider.embed
+    monkeypatch.setattr(provider, "embed", lambda texts: calls.append(texts) or original(texts))
+    monkeypatch.setattr(retrieval_service, "embedder", provider)
+    monkeypatch.setattr(retrieval_service, "embedding_cache", VectorLRU(1 << 20))
+
+    retrieval_service._embed(["fever"])
+    matrix = retrieval_service._embed(["fever", "cough", "rash", "cough"])
+
+    assert calls == [["fever"], ["cough", "rash"]]
+    assert matrix.shape == (4, 2)
+
+
+def test_vector_lru_evicts_least_recent_within_memory_cap():
+    cache = VectorLRU(max_bytes=3 * 8)  # three 2-float rows
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put(text, [i, i])
+    cache.get_many(["a"])
+    cache.put("d", [9, 9])
+
+    rows, missing = cache.get_many(["a", "b", "c", "d", "b"])
+
+    assert missing == ["b"]
+    assert rows[1] is None and rows[0].tolist() == [0, 0] and rows[3].tolist() == [9, 9]
+    assert cache.capacity == 3 and len(cache) == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] >= cache.matrix.nbytes == 24
+
+
+def test_vector_lru_rows_are_copies():
+    cache = VectorLRU(max_bytes=8)
+    cache.put("a", [1, 1])
+    rows, _ = cache.get_many(["a"])
+    cache.put("b", [2, 2])
+    assert rows[0].tolist() == [1, 1]
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.deadline import Deadline
+from app.core.executor import BoundedExecutor, ExecutorSaturated
+from app.services.retrieval_service import retrieval_service
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_leaves_event_loop_free():
+    executor = BoundedExecutor("test", max_workers=2, max_queue=0)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    try:
+        assert await executor.run(lambda: time.sleep(0.2) or "done") == "done"
+    finally:
+        task.cancel()
+    executor.shutdown()
+
+    assert ticks >= 5
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["queue_wait"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_workers_and_queue_are_full():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+    first = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ExecutorSaturated):
+        await executor.run(lambda: "never")
+
+    release.set()
+    assert await first is True
+    executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_call_is_cancelled_at_deadline():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = []
+    blocker = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(started.append, "late", deadline=Deadline(0.05))
+
+    release.set()
+    await blocker
+    await asyncio.sleep(0.05)
+    executor.shutdown()
+
+    assert started == []
+    stats = executor.stats()
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0 and stats["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_context_gives_up_at_deadline(monkeypatch):
+    retrieval_service.cache.clear()
+    monkeypatch.setattr(
+        retrieval_service,
+        "_retrieve_many",
+        lambda queries, langs: time.sleep(0.3) or [(["x"], "slow")] * len(queries),
+    )
+
+    contexts, source = await retrieval_service.get_context(
+        "fever", "en", deadline=Deadline(0.05)
+    )
+
+    assert (contexts, source) == ([], "deadline")
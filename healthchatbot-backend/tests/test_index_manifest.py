@@ -0,0 +1,89 @@
+import copy
+
+import numpy as np
+import pytest
+
+from app.services import retrieval_service as retrieval_module
+from app.services.health_data_loader import HealthDataLoader
+from app.services.index_manifest import IndexManifest, content_hash
+from app.services.retrieval_service import RetrievalService
+from app.services.vectorizer import HashingVectorizer
+
+
+def test_manifest_diff_and_round_trip(tmp_path):
+    manifest = IndexManifest({"a": "1", "b": "2", "c": "3"})
+    manifest.save(tmp_path)
+
+    diff = IndexManifest.load(tmp_path).diff({"a": "1", "b": "changed", "d": "4"})
+
+    assert diff.summary() == {"added": 1, "changed": 1, "deleted": 1, "unchanged": 1}
+    assert (diff.added, diff.changed, diff.deleted) == (["d"], ["b"], ["c"])
+    assert IndexManifest.load(tmp_path / "missing").hashes == {}
+
+
+def test_content_hash_tracks_embedder():
+    meta = {"lang": "english"}
+    assert content_hash("rest", meta, "v1") == content_hash("rest", meta, "v1")
+    assert content_hash("rest", meta, "v1") != content_hash("rest", meta, "v2")
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_backend", "numpy")
+    monkeypatch.setattr(retrieval_module.settings, "vector_index_dir", tmp_path)
+    loader = HealthDataLoader()
+    loader.symptoms_db = copy.deepcopy(loader.symptoms_db)
+    return loader
+
+
+def _count_embedded(monkeypatch):
+    embedded = []
+    original = HashingVectorizer.transform
+
+    def counting_transform(self, texts):
+        embedded.extend(texts)
+        return original(self, texts)
+
+    monkeypatch.setattr(HashingVectorizer, "transform", counting_transform)
+    return embedded
+
+
+def test_restart_reembeds_only_changed_documents(numpy_backend, monkeypatch):
+    loader = numpy_backend
+    first = RetrievalService(loader)
+    total = len(first.vector_index)
+    assert first.last_sync.summary()["added"] == total
+
+    loader.symptoms_db["english"]["fever"]["response"] = "Rest, fluids and paracetamol."
+    del loader.symptoms_db["english"]["cold"]
+
+    embedded = _count_embedded(monkeypatch)
+    second = RetrievalService(loader)
+
+    assert second.last_sync.summary() == {
+        "added": 0,
+        "changed": 1,
+        "deleted": 1,
+        "unchanged": total - 2,
+    }
+    assert embedded == ["Rest, fluids and paracetamol."]
+    assert len(second.vector_index) == total - 1
+
+    embedded.clear()
+    unchanged = RetrievalService(loader)
+    assert embedded == []
+    assert isinstance(unchanged.vector_index.matrix, np.memmap)
+    assert not unchanged.last_sync.dirty
+
+
+def test_unchanged_rows_keep_their_vectors(numpy_backend):
+    loader = numpy_backend
+    first = RetrievalService(loader)
+    row = first.vector_index.ids.index("hindi-बुखार")
+    before = np.array(first.vector_index.matrix[row])
+
+    loader.symptoms_db["english"]["fever"]["response"] = "Something new."
+    second = RetrievalService(loader)
+
+    after = second.vector_index.matrix[second.vector_index.ids.index("hindi-बुखार")]
+    assert np.allclose(before, after)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from app.services import pipeline
+from app.services.intent_classifier import IntentClassifier
+from app.services.task_router import TaskRouter, task_router
+from scripts.train_intent import SEED_PATH
+
+
+@pytest.fixture(scope="module")
+def model():
+    rows = [json.loads(line) for line in SEED_PATH.read_text(encoding="utf-8").splitlines()]
+    return IntentClassifier.train(
+        [row["user_message"] for row in rows], [row["label"] for row in rows]
+    )
+
+
+def test_classifies_batches_and_round_trips(model, tmp_path):
+    texts = ["namaste", "मुझे बुखार है", "where is the nearest health centre"]
+    labels = [label for label, _ in model.classify_many(texts)]
+    assert labels == ["greeting", "symptom", "hospital"]
+
+    path = tmp_path / "intent.npz"
+    model.save(path)
+    loaded = IntentClassifier.load(path)
+    assert path.stat().st_size < 64 * 1024
+    assert [label for label, _ in loaded.classify_many(texts)] == labels
+    assert IntentClassifier.load(tmp_path / "missing.npz") is None
+
+
+def test_classifier_only_moves_queries_off_the_medical_default(model, monkeypatch):
+    monkeypatch.setattr(pipeline.settings, "intent_min_confidence", 0.5)
+    router = TaskRouter(model)
+
+    assert router.route_many(
+        ["hello", "chest pain and sweating", "nearest clinic", "ayushman card"]
+    ) == ["greeting", "emergency", "hospital", "scheme"]
+    assert router.route("can i eat mango if i have diabetes") == "medical"
+    assert router.stats()["decisions"] == {"classifier": 1, "keyword": 3, "default": 1}
+    assert TaskRouter().route("hello") == "medical"
+
+
+@pytest.mark.asyncio
+async def test_template_routes_skip_the_llm(model, monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+    monkeypatch.setattr(task_router, "classifier", model)
+    monkeypatch.setattr(pipeline.settings, "intent_min_confidence", 0.5)
+
+    async def no_llm(prompt, language, deadline=None, allow_stale=True):
+        raise AssertionError("template routes must not call the LLM")
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", no_llm)
+
+    greeting = await orchestrator.handle_query("namaste", "u1", language="hi")
+    assert greeting["intent"] == "greeting"
+    assert greeting["response"] == pipeline.WELCOME_MESSAGES["hi"]
+
+    symptom = await orchestrator.handle_query("mujhe bukhar hai", "u2", language="hi")
+    assert symptom["meta"]["route"] == "symptom"
+    assert symptom["meta"]["context_source"] == "knowledge_base"
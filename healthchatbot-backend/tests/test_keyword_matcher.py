@@ -0,0 +1,68 @@
+import random
+
+from app.db.db import detect_intent
+from app.services.emergency_service import emergency_engine
+from app.services.health_data_loader import health_data
+from app.services.keyword_matcher import KeywordMatcher, keyword_matcher
+from app.services.retrieval_service import retrieval_service
+from app.services.task_router import task_router
+from app.utils.formatters import format_for_whatsapp
+
+
+def test_single_pass_matches_naive_substring_search():
+    rng = random.Random(7)
+    alphabet = "abc सीनेଛାତି"
+    for _ in range(500):
+        keywords = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 8))
+        }
+        matcher = KeywordMatcher()
+        matcher.register("test", [(keyword, "c", 1) for keyword in keywords])
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+
+        matches = matcher.scan(text)
+
+        assert set(matches.keywords("c")) == {k for k in keywords if k.lower() in text.lower()}
+        for hit in matches.hits:
+            assert text.lower()[hit.start : hit.start + len(hit.keyword)] == hit.keyword
+
+
+def test_hits_carry_every_category_and_weight():
+    matcher = KeywordMatcher()
+    matcher.register("a", [("chest pain", "route", 1), ("pain", "score", 2)])
+    matcher.register("b", [("chest pain", "score", 5), ("PAIN", "other", 1)])
+
+    matches = matcher.scan("Chest pain, pain everywhere")
+
+    assert matches.categories() == {"route", "score", "other"}
+    assert matches.weight("score") == 7  # "pain" twice still counts once
+    assert matches.keywords("score") == ["chest pain", "pain"]
+    assert matches.first(["missing", "other", "route"]) == "other"
+
+    matcher.register("b", [])
+    assert matcher.scan("chest pain").categories() == {"route", "score"}
+
+
+def test_shared_tables_keep_routing_scoring_and_intent():
+    matches = keyword_matcher.scan("Severe chest pain, need hospital")
+
+    assert task_router.route("", matches) == "emergency"
+    assert emergency_engine.score("", matches) == (8, ["severe", "chest pain"])
+    assert task_router.route("ayushman card at the hospital") == "scheme"
+    assert task_router.route("nearest clinic") == "hospital"
+    assert task_router.route("I feel tired") == "medical"
+    assert detect_intent("बुखार और खांसी") == "symptom_fever"
+    assert detect_intent("book an appointment") == "appointment_booking"
+    assert detect_intent("hello") == "general"
+    assert format_for_whatsapp("Cough syrup helps", "en").startswith("🤧 ")
+    assert format_for_whatsapp("Take rest", "en") == "Take rest"
+
+
+def test_symptom_fallback_prefers_longest_exact_name():
+    chest = health_data.symptoms_db["english"]["chest pain"]
+
+    assert retrieval_service.match_symptom("sudden chest pain today", "en") is chest
+    assert retrieval_service.match_symptom("feverish", "en") is (
+        health_data.symptoms_db["english"]["fever"]
+    )
@@ -0,0 +1,47 @@
+import pytest
+
+from app.services import retrieval_service as retrieval_module
+from app.services.health_data_loader import health_data
+
+
+@pytest.mark.asyncio
+async def test_query_only_scans_its_own_language(service):
+    hindi_docs = {entry["response"] for entry in health_data.symptoms_db["hindi"].values()}
+
+    contexts, source = await service.get_context("मुझे बुखार है", "hi")
+
+    assert contexts
+    assert set(contexts) <= hindi_docs
+    assert "cross_lingual" not in source
+
+
+@pytest.mark.asyncio
+async def test_cross_lingual_fallback_tops_up_thin_results(service, monkeypatch):
+    # "body pain" only exists in the English file.
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_hybrid", False)
+    monkeypatch.setattr(
+        service, "_dense_rankings", lambda vectors, lang_key=None: ([[]] * len(vectors), None)
+    )
+
+    contexts, source = await service.get_context("my body aches", "hi")
+    assert source == "bm25+cross_lingual"
+    assert contexts[0] == health_data.symptoms_db["english"]["body pain"]["response"]
+
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_fallback_languages", [])
+    service.cache.clear()
+    contexts, source = await service.get_context("my body aches", "hi")
+    assert (contexts, source) == ([], "bm25")
+
+
+def test_chroma_queries_carry_the_language_filter(service):
+    calls = []
+
+    class FakeCollection:
+        def query(self, **kwargs):
+            calls.append(kwargs)
+            return {"ids": [["odia-ଜ୍ୱର"]]}
+
+    service.collection = FakeCollection()
+
+    assert service._dense_ranking("ଜ୍ୱର", "odia") == (["odia-ଜ୍ୱର"], "chroma")
+    assert calls[0]["where"] == {"lang": "odia"}
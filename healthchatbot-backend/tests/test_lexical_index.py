@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.lexical_index import BM25Index, analyze, reciprocal_rank_fusion
+from app.services.pipeline import AssistantOrchestrator
+from app.services.retrieval_service import retrieval_service
+
+
+def test_analyze_keeps_matras_and_drops_stop_words():
+    assert analyze("मुझे सिरदर्द है") == ["सिरदर्द"]
+    assert analyze("ମୋତେ ଜ୍ୱର ହେଉଛି!") == ["ଜ୍ୱର"]
+
+
+def test_bm25_ranks_filters_and_expands_prefixes():
+    index = BM25Index.build(
+        [["fever", "rest", "fluids"], ["headache", "rest"], ["fever", "fever", "chills"]],
+        ["en", "en", "hi"],
+    )
+
+    ranked = [doc for doc, _ in index.search(["fever"], k=3)]
+    assert ranked[0] == 2  # higher term frequency
+    assert [doc for doc, _ in index.search(["fever"], k=3, lang="en")] == [0]
+    assert [doc for doc, _ in index.search(["headaches"], k=3)] == [1]
+    assert [doc for doc, _ in index.search(["feverish"], k=3, lang="en")] == [0]
+    assert index.search(["weather"], k=3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    assert fused[0][0] == "b"
+    assert {doc_id for doc_id, _ in fused} == {"a", "b", "c", "d"}
+
+
+@pytest.mark.parametrize(
+    "message, language, symptom",
+    [
+        ("I have had headaches all week", "en", "headache"),
+        ("bukhar hai", "hi", "fever"),
+        ("मुझे बुखारों से परेशानी", "hi", "fever"),
+        ("ମୋତେ ଜ୍ୱର", "or", "fever"),
+    ],
+)
+def test_match_symptom_handles_partial_and_romanized(message, language, symptom):
+    assert retrieval_service.match_symptom(message, language)["symptom"] == symptom
+
+
+@pytest.mark.parametrize(
+    "message", ["ear pain", "colder weather tips", "back pain", "my knee hurts"]
+)
+def test_match_symptom_needs_the_whole_name(message):
+    # One shared word ("pain") or a longer word ("colder") is not a match.
+    assert retrieval_service.match_symptom(message, "en") is None
+    assert "detailed answer" in AssistantOrchestrator()._knowledge_base_fallback(message, "en")
+
+
+def test_match_symptom_stays_in_language():
+    assert retrieval_service.match_symptom("fever", "hi")["symptom"] == "fever"
+    assert retrieval_service.match_symptom("what is the weather", "en") is None
+
+
+@pytest.mark.asyncio
+async def test_get_context_uses_lexical_hits():
+    contexts, source = await retrieval_service.get_context("ମୋତେ ଜ୍ୱର", "or")
+
+    assert source in ("bm25", "hybrid")
+    assert "ଜ୍ୱର" in contexts[0]
+
+
+def test_knowledge_base_fallback_uses_bm25():
+    orchestrator = AssistantOrchestrator()
+
+    assert "fluids" in orchestrator._knowledge_base_fallback("feverish since monday", "en")
+    assert "detailed answer" in orchestrator._knowledge_base_fallback("hello there", "en")
@@ -1 +1,56 @@
 # 🔄 Person F - Main app tests
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.services import pipeline
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_generate(prompt, language, deadline=None, allow_stale=True):
+        return "Rest and drink fluids."
+
+    async def fake_stream(prompt, language, deadline=None, allow_stale=True):
+        for token in ("Rest and ", "drink fluids."):
+            yield token
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", fake_generate)
+    monkeypatch.setattr(pipeline.llm_service, "stream", fake_stream)
+    # No context manager: startup hooks (warm-up, reply workers) stay off.
+    return TestClient(main.app)
+
+
+def test_query_endpoint_answers(client):
+    body = {
+        "message": "what helps a sore throat",
+        "user_id": "api-test",
+        "language": "en",
+        "history": [{"role": "user", "content": "hello"}],
+    }
+    response = client.post("/api/query", json=body)
+
+    assert response.status_code == 200
+    assert response.json()["intent"] == "medical"
+    assert response.json()["response"]
+
+    assert client.post("/api/retry", json=body).status_code == 200
+
+
+def test_stream_endpoint_sends_tokens_then_done(client):
+    response = client.post(
+        "/api/query/stream",
+        json={"message": "how to treat a mild burn", "user_id": "api-stream", "language": "en"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1][6:]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["response"]
+    assert any(name == "token" for name, _ in events[:-1])
@@ -0,0 +1,35 @@
+import unicodedata
+
+from app.services.health_data_loader import health_data
+from app.services.query_normalizer import QueryNormalizer, tokenize
+
+
+def test_tokenize_keeps_matras_attached():
+    assert tokenize("मुझे खांसी है!") == ["मुझे", "खांसी", "है"]
+    assert tokenize("ମୁଣ୍ଡବିନ୍ଧା??") == ["ମୁଣ୍ଡବିନ୍ଧା"]
+
+
+def test_phrasings_share_one_canonical_key():
+    normalizer = QueryNormalizer(health_data)
+
+    keys = {
+        normalizer.canonical_key(text)
+        for text in ["Fever!!", "i have fever", "fever 🤒", "bukhar", "मुझे बुखार है", "ଜ୍ୱର"]
+    }
+
+    assert keys == {"fever"}
+
+
+def test_unicode_normalization_forms_collapse():
+    normalizer = QueryNormalizer(health_data)
+    decomposed = unicodedata.normalize("NFD", "ଝାଡ଼ା")
+
+    assert normalizer.canonical_key(decomposed) == normalizer.canonical_key("ଝାଡ଼ା")
+
+
+def test_negations_and_unknown_words_are_kept():
+    normalizer = QueryNormalizer(health_data)
+
+    assert normalizer.canonical_key("no fever") != normalizer.canonical_key("fever")
+    assert normalizer.canonical_key("Dengue symptoms?") == "dengue symptoms"
+    assert normalizer.canonical_key("I have") == "i have"
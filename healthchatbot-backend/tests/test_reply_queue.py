@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import db as db_module
+from app.routes import whatsapp as whatsapp_module
+from app.services import reply_queue as reply_module
+from app.services.reply_queue import ReplyQueue
+
+
+@pytest.fixture
+def fake_delivery(monkeypatch):
+    sent = []
+    saved = []
+
+    async def fake_handle_query(message, user_id, deadline=None, **kwargs):
+        # Later messages answer faster, so ordering bugs would show up.
+        await asyncio.sleep(0.02 if message.endswith("1") else 0)
+        return {"response": f"re: {message}"}
+
+    def fake_send(to_phone, body):
+        sent.append((to_phone, body))
+        return "SM123"
+
+    def fake_persist(user_phone, user_message, bot_response, **kwargs):
+        saved.append((user_phone, user_message))
+
+    monkeypatch.setattr(reply_module.assistant_orchestrator, "handle_query", fake_handle_query)
+    monkeypatch.setattr(reply_module, "send_whatsapp_message", fake_send)
+    monkeypatch.setattr(reply_module, "persist_chat_history", fake_persist)
+    monkeypatch.setattr(reply_module.twilio_client, "client", object())
+    return sent, saved
+
+
+@pytest.mark.asyncio
+async def test_replies_keep_per_user_order(fake_delivery):
+    sent, saved = fake_delivery
+    queue = ReplyQueue(workers=3, maxsize=10, send_retries=0)
+    await queue.start()
+
+    for idx in range(1, 4):
+        assert queue.enqueue("+911111", f"a{idx}")
+        assert queue.enqueue("+912222", f"b{idx}")
+    await queue.stop()
+
+    assert [body for phone, body in sent if phone == "+911111"] == ["re: a1", "re: a2", "re: a3"]
+    assert [body for phone, body in sent if phone == "+912222"] == ["re: b1", "re: b2", "re: b3"]
+    assert len(saved) == 6
+    assert queue.stats()["delivered"] == 6
+
+
+@pytest.mark.asyncio
+async def test_send_is_retried(fake_delivery, monkeypatch):
+    attempts = []
+
+    def flaky_send(to_phone, body):
+        attempts.append(body)
+        if len(attempts) < 2:
+            raise RuntimeError("twilio 503")
+        return "SM123"
+
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(reply_module, "send_whatsapp_message", flaky_send)
+    monkeypatch.setattr(reply_module.asyncio, "sleep", no_sleep)
+    queue = ReplyQueue(workers=1, maxsize=10, send_retries=2)
+
+    assert await queue._send("+911111", "hello") is True
+    assert len(attempts) == 2
+    assert queue.send_retried == 1
+    assert queue.send_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_full_or_stopped_queue_rejects(fake_delivery):
+    queue = ReplyQueue(workers=1, maxsize=1, send_retries=0)
+    assert queue.enqueue("+911111", "hi") is False
+
+    await queue.start()
+    for worker in queue._workers:
+        worker.cancel()
+    await asyncio.gather(*queue._workers, return_exceptions=True)
+
+    assert queue.enqueue("+911111", "first") is True
+    assert queue.enqueue("+911111", "second") is False
+    assert queue.stats()["rejected"] == 1
+    queue._workers.clear()
+
+
+@pytest.mark.asyncio
+async def test_webhook_asks_for_redelivery_when_the_shard_is_full(fake_delivery, monkeypatch):
+    queue = ReplyQueue(workers=1, maxsize=1, send_retries=0)
+    await queue.start()
+    for worker in queue._workers:
+        worker.cancel()
+    await asyncio.gather(*queue._workers, return_exceptions=True)
+    monkeypatch.setattr(whatsapp_module, "reply_queue", queue)
+    monkeypatch.setattr(whatsapp_module.settings, "whatsapp_reply_mode", "async")
+
+    queued = await whatsapp_module.whatsapp_webhook(None, From="whatsapp:+911111", Body="first")
+    full = await whatsapp_module.whatsapp_webhook(None, From="whatsapp:+911111", Body="second")
+
+    assert queued.status_code == 200
+    assert full.status_code == 503
+    assert queue.depth() == 1
+    queue._workers.clear()
+
+
+@pytest.mark.asyncio
+async def test_stays_synchronous_without_twilio(fake_delivery, monkeypatch):
+    monkeypatch.setattr(reply_module.twilio_client, "client", None)
+    queue = ReplyQueue(workers=1, maxsize=10, send_retries=0)
+
+    await queue.start()
+
+    assert not queue.running
+    assert queue.enqueue("+911111", "hi") is False
+
+
+@pytest.mark.asyncio
+async def test_hung_history_write_does_not_block_the_shard(fake_delivery, monkeypatch):
+    sent, _ = fake_delivery
+    hang = asyncio.Event()
+
+    async def hung_insert(document):
+        await hang.wait()
+
+    async def fake_database():
+        return SimpleNamespace(chat_history=SimpleNamespace(insert_one=hung_insert))
+
+    monkeypatch.setattr(db_module, "get_database", fake_database)
+    monkeypatch.setattr(reply_module, "persist_chat_history", db_module.persist_chat_history)
+    queue = ReplyQueue(workers=1, maxsize=10, send_retries=0)
+    await queue.start()
+
+    assert queue.enqueue("+911111", "a1") and queue.enqueue("+911111", "a2")
+    await asyncio.wait_for(asyncio.gather(*(q.join() for q in queue._queues)), 1.0)
+    await queue.stop()
+
+    assert [body for _, body in sent] == ["re: a1", "re: a2"]
+    assert len(db_module._pending_writes) == 2
+    hang.set()
+    await db_module.drain_chat_history(1.0)
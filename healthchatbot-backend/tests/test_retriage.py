@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app import main
+from app.dependencies import require_admin_token
+from app.services.emergency_service import emergency_engine
+from app.services.message_context import MessageContext
+from app.services.retriage import BatchScorer, RetriageRun, TriageConfig
+
+MESSAGES = [
+    "severe chest pain and sweating",
+    "heavy bleeding after a fall",
+    "severe pain in my knee",
+    "I have fever",
+    "",
+    "सीने में दर्द और सांस लेने में तकलीफ",
+    "I have chest pain",
+    "my father is unconscious",
+]
+
+
+async def records(docs):
+    for doc in docs:
+        yield doc
+
+
+def test_batch_verdicts_match_production():
+    scorer = BatchScorer([TriageConfig.from_engine()])
+    scores, router_hits = scorer.score(MESSAGES)
+
+    assert scores[:, 0].tolist() == [emergency_engine.assess(m)["score"] for m in MESSAGES]
+    # Router keywords escalate below the score threshold, as in the pipeline.
+    assert scorer.flags(scores, router_hits)[:, 0].tolist() == [
+        MessageContext.build(m).is_emergency for m in MESSAGES
+    ]
+
+
+def test_router_escalations_are_not_reported_as_changes():
+    baseline = TriageConfig.from_engine()
+    scorer = BatchScorer([baseline, baseline.with_overrides(threshold=5)])
+    scores, router_hits = scorer.score(["I have chest pain"])
+
+    assert scorer.flags(scores, router_hits).tolist() == [[True, True]]
+
+
+def test_overrides_add_replace_and_remove_phrases():
+    baseline = TriageConfig.from_engine()
+    candidate = baseline.with_overrides({"fits": 6, "bleeding": 0}, threshold=4)
+
+    assert candidate.threshold == 4
+    assert candidate.weights["fits"] == 6 and "bleeding" not in candidate.weights
+    assert baseline.weights["bleeding"] == 5
+
+
+@pytest.mark.asyncio
+async def test_run_reports_changes_per_language(tmp_path):
+    baseline = TriageConfig.from_engine()
+    # "severe pain" (3 + 3) stops flagging; "fits" starts.
+    candidate = baseline.with_overrides({"severe pain": 1, "fits": 6})
+    docs = [
+        {"_id": 1, "user_message": "severe pain in my knee", "language": "english"},
+        {"_id": 2, "user_message": "child having fits", "language": "english"},
+        {"_id": 3, "user_message": "बच्चे को fits आ रहे हैं"},
+        {"_id": 4, "user_message": "सीने में दर्द", "language": "hindi"},
+        {"_id": 5, "user_message": "I have fever", "language": "english"},
+    ]
+    changes = tmp_path / "changes.jsonl"
+    run = RetriageRun(baseline, candidate, batch_size=2, max_samples=1, changes_path=changes)
+
+    await run.run(records(docs), total=len(docs))
+
+    report = run.report()
+    assert report["progress"]["state"] == "done"
+    assert report["progress"]["percent"] == 100.0
+    languages = {g["language"]: g for g in report["languages"]}
+    assert languages["english"]["scanned"] == 3
+    assert languages["english"]["newly_flagged"] == 1
+    assert languages["english"]["unflagged"] == 1
+    # Language falls back to detection when the record has none.
+    assert languages["hindi"]["scanned"] == 2
+    assert languages["hindi"]["newly_flagged"] == 1
+    # "सीने" is a router emergency keyword: flagged before and after.
+    assert languages["hindi"]["flagged_before"] == 1
+    assert report["totals"]["newly_flagged"] == 2
+    assert len(report["samples"]["newly_flagged"]) == 1
+    assert "message" not in report["samples"]["newly_flagged"][0]
+
+    written = [json.loads(line) for line in changes.read_text(encoding="utf-8").splitlines()]
+    assert {(entry["id"], entry["change"]) for entry in written} == {
+        ("1", "unflagged"),
+        ("2", "newly_flagged"),
+        ("3", "newly_flagged"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_api_runs_one_retriage_at_a_time(monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_records(query, batch_size, limit):
+        await release.wait()
+        yield {"user_message": "child having fits", "language": "english"}
+
+    async def fake_count(query, limit):
+        return 1
+
+    monkeypatch.setattr(main, "chat_records", slow_records)
+    monkeypatch.setattr(main, "count_records", fake_count)
+    monkeypatch.setattr(main, "_retriage", None)
+
+    running = set(main._background_tasks)
+    started = await main.start_retriage(main.RetriageRequest(weights={"fits": 6}))
+    assert started["total"] == 1
+    busy = await main.start_retriage(main.RetriageRequest())
+    assert busy.status_code == 409
+
+    (task,) = main._background_tasks - running
+    release.set()
+    await task
+    report = await main.retriage_report()
+    assert report["totals"]["newly_flagged"] == 1
+    await asyncio.sleep(0)
+    assert task not in main._background_tasks
+
+
+@pytest.mark.asyncio
+async def test_admin_token_guards_retriage(monkeypatch):
+    monkeypatch.setattr(main.settings, "admin_api_token", "")
+    with pytest.raises(HTTPException) as disabled:
+        await require_admin_token("anything")
+    assert disabled.value.status_code == 403
+
+    monkeypatch.setattr(main.settings, "admin_api_token", "s3cret")
+    for token in (None, "wrong"):
+        with pytest.raises(HTTPException) as rejected:
+            await require_admin_token(token)
+        assert rejected.value.status_code == 401
+    await require_admin_token("s3cret")
@@ -0,0 +1,82 @@
+import pytest
+
+from app.core.deadline import Deadline
+from app.services import retrieval_service as retrieval_module
+from app.services.embeddings import EmbeddingProvider
+from app.services.health_data_loader import health_data
+
+QUERIES = ["I have fever", "मुझे सिरदर्द है", "ମୋତେ କାଶ ହେଉଛି", "my body aches", "I have fever"]
+LANGUAGES = ["en", "hi", "or", "hi", "en"]
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_queries_in_order(service):
+    singles = []
+    for query, language in zip(QUERIES, LANGUAGES):
+        service.cache.clear()
+        singles.append(await service.get_context(query, language))
+    service.cache.clear()
+
+    batch = await service.get_context_many(QUERIES, LANGUAGES)
+
+    assert batch == singles
+    assert batch[0] == batch[4]
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_once_and_searches_once_per_language(service, monkeypatch):
+    embeds, searches = [], []
+    original_embed = service._embed
+    original_search = service.vector_index.search
+
+    def counting_embed(texts):
+        embeds.append(list(texts))
+        return original_embed(texts)
+
+    def counting_search(queries, k, lang=None, min_score=0.0):
+        searches.append((lang, len(queries)))
+        return original_search(queries, k, lang=lang, min_score=min_score)
+
+    monkeypatch.setattr(service, "_embed", counting_embed)
+    monkeypatch.setattr(service.vector_index, "search", counting_search)
+
+    await service.get_context_many(QUERIES[:3] + ["cough"], LANGUAGES[:3] + ["en"])
+
+    assert embeds == [["I have fever", "मुझे सिरदर्द है", "ମୋତେ କାଶ ହେଉଛି", "cough"]]
+    assert sorted(searches) == [("english", 2), ("hindi", 1), ("odia", 1)]
+
+
+@pytest.mark.asyncio
+async def test_batch_serves_cached_queries_and_keeps_fallbacks(service, monkeypatch):
+    first = await service.get_context("I have fever", "en")
+    calls = []
+    monkeypatch.setattr(
+        service, "_retrieve_many", lambda queries, langs: calls.append(queries) or []
+    )
+
+    assert await service.get_context_many(["fever!!"], ["en"]) == [first]
+    assert calls == []
+
+    expired = Deadline(0)
+    assert await service.get_context_many(["cough", "rash"], ["en", "en"], expired) == [
+        ([], "deadline"),
+        ([], "deadline"),
+    ]
+    with pytest.raises(ValueError):
+        await service.get_context_many(["cough"], [])
+
+
+@pytest.mark.asyncio
+async def test_embedding_outage_degrades_to_bm25(service, monkeypatch):
+    class DownProvider(EmbeddingProvider):
+        def embed(self, texts):
+            raise ConnectionError("embedding endpoint unreachable")
+
+    monkeypatch.setattr(service, "embedder", DownProvider())
+    service.embedding_cache.clear()
+
+    [(contexts, source)] = await service.get_context_many(["I have fever"], ["en"])
+    assert contexts
+    assert source == retrieval_module.DEGRADED_SOURCE
+    # Degraded answers are not cached, so recovery is immediate.
+    assert len(service.cache) == 0
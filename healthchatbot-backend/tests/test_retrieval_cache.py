@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.cache_service import cache_stats
+from app.services.health_data_loader import HealthDataLoader
+from app.services.retrieval_service import RetrievalService
+
+
+def _count_rankings(monkeypatch, service):
+    calls = []
+    original = service._rank
+
+    def counting_rank(query, terms, lang_key, dense=None):
+        calls.append(lang_key)
+        return original(query, terms, lang_key, dense)
+
+    monkeypatch.setattr(service, "_rank", counting_rank)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_share_a_cached_result(service, monkeypatch):
+    calls = _count_rankings(monkeypatch, service)
+
+    first = await service.get_context("I have fever", "en")
+    second = await service.get_context("fever!!", "en")
+
+    assert first == second
+    assert len(calls) == 1
+    assert service.cache.stats()["hits"] == 1
+    assert "retrieval" in cache_stats()
+
+
+@pytest.mark.asyncio
+async def test_reload_reindexes_and_keys_the_cache_on_content(service, monkeypatch):
+    calls = _count_rankings(monkeypatch, service)
+    await service.get_context("fever", "en")
+    digest = service.kb_digest
+
+    # Same files reloaded: same digest, cached contexts stay valid.
+    service.loader.reload_data()
+    await service.get_context("fever", "en")
+    assert service.indexed_version == 1
+    assert service.kb_digest == digest
+    assert len(calls) == 1
+
+    service.loader.reload_data()
+    service.loader.symptoms_db["english"]["fever"]["response"] = "Updated fever advice."
+    await service.get_context("fever", "en")
+    assert service.indexed_version == 2
+    assert service.kb_digest != digest
+    assert len(calls) == 2
+
+
+def test_digest_survives_restart_for_the_same_content(service):
+    # A new process (counter back at 0) computes the same key prefix.
+    assert RetrievalService(HealthDataLoader()).kb_digest == service.kb_digest
+
+
+@pytest.mark.asyncio
+async def test_languages_are_cached_separately(service, monkeypatch):
+    calls = _count_rankings(monkeypatch, service)
+
+    await service.get_context("fever", "en")
+    await service.get_context("fever", "hi")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_reindex_runs_once_on_the_retrieval_pool(service, monkeypatch):
+    threads = []
+    original = service.refresh
+
+    def recording_refresh():
+        threads.append(threading.current_thread())
+        original()
+
+    monkeypatch.setattr(service, "refresh", recording_refresh)
+    service.loader.reload_data()
+
+    await asyncio.gather(*(service.get_context(q, "en") for q in ("fever", "cough", "rash")))
+
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
+    assert service.indexed_version == service.loader.version
@@ -0,0 +1,59 @@
+import pytest
+
+from app.db.db import detect_language as db_detect_language
+from app.services.language_detector import detect_language_with_confidence
+from app.services.script_detector import detect_script, script_of
+
+
+def test_script_blocks():
+    assert script_of("क") == "devanagari"
+    assert script_of("ୱ") == "odia"
+    assert script_of("ā") == "latin"
+    assert script_of("1") is None and script_of("த") is None
+
+
+def test_native_script_share_is_the_confidence():
+    odia = detect_script("ମୋତେ ଜ୍ୱର ହେଉଛି")
+    assert (odia.language, odia.confidence, odia.script) == ("or", 1.0, "odia")
+
+    mixed = detect_script("मुझे fever है")
+    assert mixed.language == "hi"
+    assert mixed.proportions["devanagari"] + mixed.proportions["latin"] == pytest.approx(1.0)
+    assert mixed.confidence == pytest.approx(mixed.proportions["devanagari"], abs=1e-3)
+    assert mixed.confidence < 1.0
+
+
+@pytest.mark.parametrize(
+    "text, language",
+    [
+        ("mujhe bukhar hai", "hi"),
+        ("mere pet mein dard hai", "hi"),
+        ("mora jwara heuchi", "or"),
+        ("mo peta jantrana", "or"),
+        ("I have fever since yesterday", "en"),
+        ("where is the nearest clinic", "en"),
+    ],
+)
+def test_romanized_text_uses_the_ngram_model(text, language):
+    detection = detect_script(text)
+    assert detection.script == "latin"
+    assert detection.language == language
+    assert detection.romanized == (language != "en")
+
+
+def test_results_are_memoized():
+    detect_script.cache_clear()
+    first = detect_script("kal se khansi hai")
+    assert detect_script("kal se khansi hai") is first
+    assert detect_script.cache_info().hits == 1
+
+
+def test_existing_entry_points_delegate():
+    assert detect_language_with_confidence("mujhe bukhar hai")[0] == "hi"
+    assert db_detect_language("ମୋତେ ଜ୍ୱର") == "odia"
+    assert db_detect_language("मुझे खांसी है") == "hindi"
+    assert db_detect_language("need a doctor") == "english"
+    assert db_detect_language("Hi") == "english"
+    assert db_detect_language("108 !!") == "english"
+    assert db_detect_language("வணக்கம்") == "mixed"
+    assert db_detect_language("") == "unknown"
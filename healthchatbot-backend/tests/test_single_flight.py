@@ -0,0 +1,181 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import pipeline
+from app.services.cache_service import TTLCache
+from app.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    results = await asyncio.gather(*(flights.do("hi:fever", work) for _ in range(5)))
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert flights.stats()["coalesced"] == 4
+    assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("azure down")
+
+    results = await asyncio.gather(
+        *(flights.do("k", work) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flights.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_timeout_does_not_cancel_shared_work():
+    flights = SingleFlight()
+    finished = asyncio.Event()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.set()
+        return "done"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await flights.do("k", work, timeout=0.01)
+
+    assert await flights.do("k", work) == "done"
+    assert finished.is_set()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_coalesces_identical_misses(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+    prompts = []
+
+    async def fake_generate(prompt, language, deadline=None, allow_stale=True):
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        return "Rest and drink fluids."
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", fake_generate)
+
+    results = await asyncio.gather(
+        *(
+            orchestrator.handle_query("what helps a fever", f"user-{idx}", language="en")
+            for idx in range(4)
+        )
+    )
+
+    assert len(prompts) == 1
+    assert {r["response"] for r in results} == {"Rest and drink fluids."}
+    assert orchestrator.flights.stats()["coalesced"] == 3
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_serves_stale_and_refreshes(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+    orchestrator.cache.stale_seconds = 60
+    answers = iter(["old answer", "new answer"])
+
+    async def fake_generate(prompt, language, deadline=None, allow_stale=True):
+        return next(answers)
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", fake_generate)
+
+    first = await orchestrator.handle_query("what helps a fever", "u1", language="en")
+    cache_key = "en:fever helps"
+    _, payload = orchestrator.cache.backend.get(cache_key)
+    orchestrator.cache.backend.set(cache_key, payload, time.time() - 10)
+
+    stale = await orchestrator.handle_query("what helps a fever", "u2", language="en")
+    await asyncio.gather(*orchestrator.flights._inflight.values())
+    refreshed = await orchestrator.handle_query("what helps a fever", "u3", language="en")
+
+    assert first["response"] == "old answer"
+    assert stale["response"] == "old answer" and stale["meta"]["stale"] is True
+    assert refreshed["response"] == "new answer" and refreshed["cached"] is True
+    assert "stale" not in refreshed["meta"]
+
+
+@pytest.mark.asyncio
+async def test_miss_joining_a_failed_refresh_gets_its_answer(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+    orchestrator.cache.stale_seconds = 60
+    release = asyncio.Event()
+
+    async def failing_generate(prompt, language, deadline=None, allow_stale=True):
+        await release.wait()
+        return None
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", failing_generate)
+    cache_key = "en:fever helps"
+    old = {"response": "old answer", "meta": {}}
+    orchestrator.cache.backend.set(cache_key, old, time.time() - 10)
+
+    stale = await orchestrator.handle_query("what helps a fever", "u1", language="en")
+    assert stale["meta"]["stale"] is True
+    assert orchestrator.flights.refresh(cache_key, lambda: None) is False
+
+    # The stale entry is purged while the refresh is still running.
+    orchestrator.cache.clear()
+    miss = asyncio.ensure_future(
+        orchestrator.handle_query("what helps a fever", "u2", language="en")
+    )
+    await asyncio.sleep(0)
+    release.set()
+    answer = await miss
+
+    assert "timed_out" not in answer["meta"]
+    assert answer["meta"]["kb_fallback"] is True
+    # A refresh never replaces a cached answer with the fallback text.
+    assert orchestrator.cache.backend.get(cache_key) is None
+    stats = orchestrator.flights.stats()
+    assert stats["refreshes"] == 1 and stats["refreshes_skipped"] == 1
+    assert stats["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_bypasses_the_stale_llm_cache(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+    orchestrator.cache.stale_seconds = 60
+    llm = pipeline.llm_service
+    monkeypatch.setattr(llm, "cache", TTLCache(ttl_seconds=600, stale_seconds=60))
+    monkeypatch.setattr(llm, "flights", SingleFlight())
+    monkeypatch.setattr(pipeline.settings, "azure_deployment", "gpt")
+    generations = iter(["gen-1", "gen-2", "gen-3"])
+
+    async def create(**kwargs):
+        message = SimpleNamespace(content=next(generations))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    completions = SimpleNamespace(create=create)
+    monkeypatch.setattr(llm, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    first = await orchestrator.handle_query("what helps a fever", "u1", language="en")
+    for cache in (orchestrator.cache, llm.cache):
+        for key, _, value in cache.snapshot():
+            cache.backend.set(key, value, time.time() - 10)
+
+    stale = await orchestrator.handle_query("what helps a fever", "u2", language="en")
+    await asyncio.gather(*orchestrator.flights._inflight.values())
+    refreshed = await orchestrator.handle_query("what helps a fever", "u3", language="en")
+
+    assert first["response"] == "gen-1"
+    assert stale["response"] == "gen-1" and stale["meta"]["stale"] is True
+    assert refreshed["response"] == "gen-2"
+    assert "stale" not in refreshed["meta"]
+    # One completion per generation: the refresh did not start a second one.
+    assert llm.flights.stats()["refreshes"] == 0
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_service as llm_module
+from app.services import pipeline
+from app.services.llm_service import LLMService, StreamInterrupted
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, chunks, fail_after=None, stall_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.stall_after = stall_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for idx, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and idx == self.fail_after:
+                raise ConnectionError("stream reset")
+            if self.stall_after is not None and idx == self.stall_after:
+                await asyncio.sleep(60)
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def _fake_client(stream):
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+@pytest.mark.asyncio
+async def test_llm_stream_yields_tokens_and_caches(monkeypatch):
+    monkeypatch.setattr(llm_module.settings, "azure_deployment", "gpt")
+    service = LLMService()
+    service.client = _fake_client(
+        FakeStream([SimpleNamespace(choices=[]), _chunk("Drink "), _chunk(None), _chunk("water")])
+    )
+
+    assert await _collect(service.stream("prompt", "en")) == ["Drink ", "water"]
+    # Second call is served from the cache as a single chunk.
+    assert await _collect(service.stream("prompt", "en")) == ["Drink water"]
+
+
+@pytest.mark.asyncio
+async def test_llm_stream_failure_mid_answer_is_not_cached(monkeypatch):
+    monkeypatch.setattr(llm_module.settings, "azure_deployment", "gpt")
+    service = LLMService()
+    stream = FakeStream([_chunk("Drink "), _chunk("water")], fail_after=1)
+    service.client = _fake_client(stream)
+
+    with pytest.raises(StreamInterrupted):
+        await _collect(service.stream("prompt", "en"))
+    assert service.cache.get("en:prompt") is None
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_llm_stream_is_closed_after_a_stall(monkeypatch):
+    monkeypatch.setattr(llm_module.settings, "azure_deployment", "gpt")
+    monkeypatch.setattr(llm_module.settings, "llm_timeout_seconds", 0.05)
+    service = LLMService()
+    stream = FakeStream([_chunk("Drink "), _chunk("water")], stall_after=0)
+    service.client = _fake_client(stream)
+
+    assert await _collect(service.stream("prompt", "en")) == []
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_streams_then_fills_cache(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+
+    async def fake_stream(prompt, language, deadline=None):
+        for token in ["Rest ", "and ", "hydrate."]:
+            yield token
+
+    monkeypatch.setattr(pipeline.llm_service, "stream", fake_stream)
+
+    events = await _collect(orchestrator.stream_query("what helps a fever", "u1", language="en"))
+
+    assert [event for event, _ in events] == ["token", "token", "token", "done"]
+    done = events[-1][1]
+    assert done["response"] == "Rest and hydrate."
+    assert done["meta"]["ttft_ms"] >= 0
+    assert orchestrator.ttft.stats()["count"] == 1
+
+    cached = await orchestrator.handle_query("what helps a fever", "u2", language="en")
+    assert cached["cached"] is True
+    assert cached["response"] == "Rest and hydrate."
+
+
+@pytest.mark.asyncio
+async def test_template_route_is_a_single_chunk():
+    orchestrator = pipeline.AssistantOrchestrator()
+
+    events = await _collect(orchestrator.stream_query("which scheme can I use", "u1", language="en"))
+
+    assert len(events) == 1
+    event, payload = events[0]
+    assert event == "done"
+    assert payload["intent"] == "scheme"
@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import RequestTrace, log_if_slow
+from app.services import pipeline
+
+
+def test_spans_accumulate_per_stage():
+    trace = RequestTrace()
+
+    with trace.span("llm_generate"):
+        pass
+    with trace.span("llm_generate"):
+        pass
+    with trace.span("retrieval"):
+        pass
+
+    summary = trace.as_dict()
+    assert list(summary["stages"]) == ["llm_generate", "retrieval"]
+    assert summary["total_ms"] >= summary["stages"]["llm_generate"]
+
+
+def test_slow_requests_are_logged_with_breakdown(monkeypatch, caplog):
+    monkeypatch.setattr(tracing.settings, "slow_request_threshold_ms", 0.0)
+    monkeypatch.setattr(tracing.settings, "slow_request_sample_rate", 1.0)
+    trace = RequestTrace()
+    with trace.span("retrieval"):
+        pass
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+        assert log_if_slow(trace, user_id="u1") is True
+
+    assert "retrieval" in caplog.text and "u1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_debug_flag_returns_stage_timings(monkeypatch):
+    orchestrator = pipeline.AssistantOrchestrator()
+
+    async def fake_generate(prompt, language, deadline=None, allow_stale=True):
+        return "Drink fluids."
+
+    monkeypatch.setattr(pipeline.llm_service, "generate", fake_generate)
+
+    plain = await orchestrator.handle_query("sore throat remedy", "u1", language="en")
+    debugged = await orchestrator.handle_query(
+        "tips for sore throat", "u2", language="en", debug=True
+    )
+
+    assert "trace" not in plain["meta"]
+    stages = debugged["meta"]["trace"]["stages"]
+    assert {"language_detection", "routing", "cache_lookup", "answer", "llm_generate"} <= set(stages)
+    assert "trace" not in orchestrator.cache.get("en:sore throat tips")["meta"]
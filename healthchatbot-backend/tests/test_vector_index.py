@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from app.services import retrieval_service as retrieval_module
+from app.services.health_data_loader import health_data
+from app.services.retrieval_service import RetrievalService
+from app.services.vector_index import VectorIndex
+
+
+def _index():
+    vectors = np.array(
+        [[1, 0, 0], [0, 1, 0], [1, 1, 0], [0, 0, 1], [0, 3, 1]], dtype=np.float32
+    )
+    langs = ["hi", "en", "hi", "or", "en"]
+    ids = [f"doc{i}" for i in range(5)]
+    return VectorIndex.build(vectors, ids, ids, langs)
+
+
+def test_rows_are_normalized_and_grouped_by_language():
+    index = _index()
+
+    assert index.matrix.dtype == np.float32
+    assert index.matrix.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0)
+    for lang, (start, end) in index.lang_ranges.items():
+        assert end - start == {"hi": 2, "en": 2, "or": 1}[lang]
+    start, end = index.lang_ranges["hi"]
+    assert index.ids[start:end] == ["doc0", "doc2"]
+
+
+def test_batched_top_k_is_ranked_and_filtered():
+    index = _index()
+
+    results = index.search(np.array([[0, 1, 0], [0, 0, 1]], dtype=np.float32), k=2)
+
+    assert [index.ids[row] for row, _ in results[0]] == ["doc1", "doc4"]
+    assert [index.ids[row] for row, _ in results[1]][0] == "doc3"
+    assert results[0][0][1] == pytest.approx(1.0)
+
+    hindi = index.search(np.array([0, 1, 0], dtype=np.float32), k=3, lang="hi")[0]
+    assert [index.ids[row] for row, _ in hindi] == ["doc2"]  # doc0 scores 0
+    assert index.search(np.array([1, 0, 0]), k=3, lang="ta") == [[]]
+
+
+@pytest.mark.asyncio
+async def test_numpy_backend_serves_get_context(monkeypatch, tmp_path):
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_backend", "numpy")
+    monkeypatch.setattr(retrieval_module.settings, "vector_index_dir", tmp_path)
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_hybrid", False)
+    service = RetrievalService(health_data)
+    assert service.collection is None
+    assert len(service.vector_index) > 0
+
+    document = service.vector_index.documents[0]
+    contexts, source = await service.get_context(document, "en")
+
+    assert source == "vector"
+    assert contexts[0] == document
+
+
+def test_saved_index_is_memory_mapped(tmp_path):
+    index = _index()
+    index.save(tmp_path, "fp-1")
+
+    loaded = VectorIndex.load(tmp_path, "fp-1")
+
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.ids == index.ids
+    assert loaded.lang_ranges == index.lang_ranges
+    query = np.array([0, 1, 0], dtype=np.float32)
+    assert loaded.search(query, k=2) == index.search(query, k=2)
+    assert VectorIndex.load(tmp_path, "fp-2") is None
+    assert VectorIndex.load(tmp_path / "missing", "fp-1") is None
+
+
+def test_retrieval_service_reuses_persisted_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(retrieval_module.settings, "retrieval_backend", "numpy")
+    monkeypatch.setattr(retrieval_module.settings, "vector_index_dir", tmp_path)
+
+    built = RetrievalService(health_data)
+    reloaded = RetrievalService(health_data)
+
+    assert not isinstance(built.vector_index.matrix, np.memmap)
+    assert isinstance(reloaded.vector_index.matrix, np.memmap)
+    assert np.array_equal(built.vector_index.matrix, reloaded.vector_index.matrix)
+
+
+def test_save_publishes_matrix_and_metadata_together(tmp_path):
+    index = _index()
+    index.save(tmp_path, "fp-1")
+    first = (tmp_path / "CURRENT").read_text()
+
+    # A crash before the pointer swap leaves the published version intact.
+    orphan = tmp_path / "versions" / "fp-2-orphan"
+    orphan.mkdir()
+    np.save(orphan / "vectors.npy", np.zeros((1, 3), dtype=np.float32))
+    assert VectorIndex.load(tmp_path, "fp-1").ids == index.ids
+
+    index.save(tmp_path, "fp-3")
+    assert VectorIndex.load(tmp_path, "fp-1") is None
+    assert VectorIndex.load(tmp_path, "fp-3").ids == index.ids
+    # The superseded version is kept for readers that already hold it.
+    assert sorted(p.name for p in (tmp_path / "versions").iterdir()) == sorted(
+        [first, (tmp_path / "CURRENT").read_text()]
+    )
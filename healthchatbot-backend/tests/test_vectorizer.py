@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from app.services.vectorizer import HashingVectorizer, aksharas
+
+
+def test_aksharas_keep_matras_and_conjuncts():
+    assert aksharas("बुखार") == ["बु", "खा", "र"]
+    assert aksharas("क्या") == ["क्या"]
+    assert aksharas("ଜ୍ୱର") == ["ଜ୍ୱ", "ର"]
+    assert aksharas("fever") == ["f", "e", "v", "e", "r"]
+
+
+def test_vectors_are_normalized_and_dimensioned():
+    vectorizer = HashingVectorizer(dim=64)
+    matrix = vectorizer.transform(["fever", "बुखार है", ""])
+
+    assert matrix.shape == (3, 64)
+    assert matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1.0)
+    assert not matrix[2].any()
+
+
+def test_inflected_forms_stay_close():
+    vectorizer = HashingVectorizer(dim=512)
+    a, b, c = vectorizer.transform(["बुखार", "बुखारों", "खांसी"])
+
+    assert a @ b > a @ c
+
+
+def test_vectors_are_stable_across_processes():
+    code = (
+        "from app.services.vectorizer import HashingVectorizer;"
+        "print(HashingVectorizer(32).transform_one('ମୋତେ ଜ୍ୱର').tolist())"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={"PYTHONHASHSEED": seed, "PYTHONPATH": "."},
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1